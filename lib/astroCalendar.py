@@ -0,0 +1,416 @@
+""" Maintains the precomputed astronomical event calendar required by the
+Raspberry Pi Python console for WeatherFlow Tempest and Smart Home Weather
+stations.
+Copyright (C) 2018-2021 Peter Davis
+
+This program is free software: you can redistribute it and/or modify it under
+the terms of the GNU General Public License as published by the Free Software
+Foundation, either version 3 of the License, or (at your option) any later
+version.
+
+This program is distributed in the hope that it will be useful, but WITHOUT
+ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with
+this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+# Import required modules
+from kivy.clock import mainthread
+from lib        import profiler
+from datetime   import datetime, timedelta
+import threading
+import bisect
+import ephem
+import json
+import pytz
+import os
+
+# Define global variables
+File         = 'astroCalendar.json'
+Horizon      = 14
+Margin       = 2
+Calendars    = {}
+calendarLock = threading.Lock()
+fileLock     = threading.Lock()
+
+# Define rising and setting events as (Body,Rising,Horizon,Centre,Pressure).
+# Sun events match the United States Naval Observatory Astronomical Almanac
+riseSetEvents = {'Dawn':     ('Sun', True, '-6',    True, 0),
+                 'Sunrise':  ('Sun', True, '-0:34', False,0),
+                 'Sunset':   ('Sun', False,'-0:34', False,0),
+                 'Dusk':     ('Sun', False,'-6',    True, 0),
+                 'Moonrise': ('Moon',True, '0',     False,None),
+                 'Moonset':  ('Moon',False,'0',     False,None)}
+
+# Define lunar phase events
+phaseEvents = {'FullMoon': ephem.next_full_moon,
+               'NewMoon':  ephem.next_new_moon}
+
+def get(Config):
+
+    """ Returns the astronomical event calendar for the station location,
+    loading it from disk the first time it is requested
+
+    INPUTS:
+        Config              Station configuration
+
+    OUTPUT:
+        Calendar            Astronomical event calendar for the station location
+    """
+
+    Key = '{},{}'.format(Config['Station']['Latitude'],Config['Station']['Longitude'])
+    with calendarLock:
+        if Key not in Calendars:
+            Calendars[Key] = Calendar(Key,Config)
+        return Calendars[Key]
+
+def start(astroData,Config):
+
+    """ Precomputes the astronomical event calendar on a background thread and
+    then initialises the sunrise/sunset and moonrise/moonset times on the UI
+    thread
+
+    INPUTS:
+        astroData           Dictionary holding sunrise/sunset and moonrise/moonset
+                            data
+        Config              Station configuration
+    """
+
+    def Build():
+        get(Config).refresh()
+        post(astroData,Config)
+    threading.Thread(target=Build,name='astroCalendar',daemon=True).start()
+
+@mainthread
+@profiler.timed
+def post(astroData,Config):
+
+    """ Initialises the sunrise/sunset and moonrise/moonset times from the
+    precomputed astronomical event calendar
+
+    INPUTS:
+        astroData           Dictionary holding sunrise/sunset and moonrise/moonset
+                            data
+        Config              Station configuration
+    """
+
+    from lib import astronomical as astro
+    astro.SunriseSunset(astroData,Config)
+    astro.MoonriseMoonset(astroData,Config)
+
+def midnightUTC(Time):
+
+    """ Returns midnight UTC at the start of the day containing Time
+
+    INPUTS:
+        Time                Timezone aware datetime object
+    """
+
+    Time = Time.astimezone(pytz.utc)
+    return pytz.utc.localize(datetime(Time.year,Time.month,Time.day))
+
+def ephemDate(Time):
+
+    """ Converts a timezone aware datetime object into an ephem date
+    """
+
+    return ephem.Date(Time.astimezone(pytz.utc).replace(tzinfo=None))
+
+def observer(Config,Event):
+
+    """ Returns the ephem observer used to calculate a rising or setting event
+
+    INPUTS:
+        Config              Station configuration
+        Event               Name of rising or setting event
+    """
+
+    Body,Rising,Horizon,Centre,Pressure = riseSetEvents[Event]
+    Observer     = ephem.Observer()
+    Observer.lat = str(Config['Station']['Latitude'])
+    Observer.lon = str(Config['Station']['Longitude'])
+    if Pressure is not None:
+        Observer.pressure = Pressure
+    Observer.horizon = Horizon
+    return Observer
+
+def compute(Config,Event,After):
+
+    """ Calculates the time of the next rising or setting event after the
+    specified time
+
+    INPUTS:
+        Config              Station configuration
+        Event               Name of rising or setting event
+        After               Timezone aware datetime object
+
+    OUTPUT:
+        Time                UNIX timestamp of the next event
+    """
+
+    Body,Rising,Horizon,Centre,Pressure = riseSetEvents[Event]
+    Observer      = observer(Config,Event)
+    Observer.date = ephemDate(After)
+    Body          = getattr(ephem,Body)()
+    if Rising:
+        Time = Observer.next_rising(Body,use_center=Centre)
+    else:
+        Time = Observer.next_setting(Body,use_center=Centre)
+    return pytz.utc.localize(Time.datetime()).timestamp()
+
+class Calendar(object):
+
+    """ Astronomical event calendar holding the dawn, sunrise, sunset, dusk,
+    moonrise, moonset, full moon and new moon times for the station location
+    over the next Horizon days, together with the hourly lunar illumination.
+    Event times are stored as sorted UNIX timestamps so that the next event
+    after any time can be found by bisection
+
+    INPUTS:
+        Key                 Station location as 'Latitude,Longitude'
+        Config              Station configuration
+    """
+
+    def __init__(self,Key,Config):
+        self.Key      = Key
+        self.Config   = Config
+        self.Lock     = threading.Lock()
+        self.Building = False
+        self.Start    = None
+        self.End      = None
+        self.Events   = {}
+        self.Phase    = []
+        self.load()
+
+    def load(self):
+
+        """ Loads the astronomical event calendar for the station location from
+        disk
+        """
+
+        with fileLock:
+            if not os.path.isfile(File):
+                return
+            try:
+                with open(File,'r') as f:
+                    Stored = json.load(f).get(self.Key)
+            except (OSError,ValueError):
+                return
+        if not Stored:
+            return
+        with self.Lock:
+            self.Start  = Stored['Start']
+            self.End    = Stored['End']
+            self.Events = Stored['Events']
+            self.Phase  = Stored['Phase']
+
+    def save(self):
+
+        """ Saves the astronomical event calendar for the station location to
+        disk
+        """
+
+        with self.Lock:
+            Entry = {'Start':  self.Start,
+                     'End':    self.End,
+                     'Events': self.Events,
+                     'Phase':  self.Phase}
+        with fileLock:
+            Stored = {}
+            if os.path.isfile(File):
+                try:
+                    with open(File,'r') as f:
+                        Stored = json.load(f)
+                except (OSError,ValueError):
+                    Stored = {}
+            Stored[self.Key] = Entry
+            with open(File,'w') as f:
+                json.dump(Stored,f)
+
+    def covers(self,Now):
+
+        """ Returns True if the calendar covers the day before Now and at least
+        Margin days after Now
+
+        INPUTS:
+            Now             Timezone aware datetime object
+        """
+
+        with self.Lock:
+            if self.Start is None:
+                return False
+            Start = midnightUTC(Now) - timedelta(days=1)
+            return (self.Start <= Start.timestamp()
+                    and self.End >= (Now + timedelta(days=Margin)).timestamp())
+
+    def build(self,Now):
+
+        """ Calculates all astronomical events from midnight UTC yesterday
+        until Horizon days after Now
+
+        INPUTS:
+            Now             Timezone aware datetime object
+        """
+
+        # Define start and end time of calendar
+        Start = midnightUTC(Now) - timedelta(days=1)
+        End   = midnightUTC(Now) + timedelta(days=Horizon)
+
+        # Calculate all rising and setting events between the start and end
+        # time. Events that do not occur on a given day at high latitudes are
+        # skipped
+        Events = {}
+        for Event in riseSetEvents:
+            Times, After = [], Start
+            while After < End:
+                try:
+                    Time = compute(self.Config,Event,After)
+                except ephem.CircumpolarError:
+                    After += timedelta(days=1)
+                    continue
+                Times.append(Time)
+                After = datetime.fromtimestamp(Time,pytz.utc) + timedelta(minutes=1)
+            Events[Event] = Times
+
+        # Calculate all full moon and new moon events until one lunar month
+        # after the end time, so that the next phase is always available
+        for Event,nextPhase in phaseEvents.items():
+            Times, After = [], ephemDate(Start)
+            while After < ephemDate(End + timedelta(days=31)):
+                After = nextPhase(After)
+                Times.append(pytz.utc.localize(After.datetime()).timestamp())
+                After = ephem.Date(After + ephem.minute)
+            Events[Event] = Times
+
+        # Calculate hourly lunar illumination between the start and end time
+        Phase, Moon = [], ephem.Moon()
+        Time = Start
+        while Time <= End:
+            Moon.compute(ephemDate(Time))
+            Phase.append(Moon.phase)
+            Time += timedelta(hours=1)
+
+        # Store astronomical event calendar
+        with self.Lock:
+            self.Start  = Start.timestamp()
+            self.End    = End.timestamp()
+            self.Events = Events
+            self.Phase  = Phase
+
+    def refresh(self):
+
+        """ Rebuilds the astronomical event calendar and saves it to disk if it
+        no longer covers the current time
+        """
+
+        Now = datetime.now(pytz.utc)
+        if not self.covers(Now):
+            self.build(Now)
+            self.save()
+
+    def refreshInBackground(self):
+
+        """ Rebuilds the astronomical event calendar on a background thread if
+        it is not already being rebuilt
+        """
+
+        def Build():
+            try:
+                self.refresh()
+            finally:
+                with self.Lock:
+                    self.Building = False
+        with self.Lock:
+            if self.Building:
+                return
+            self.Building = True
+        threading.Thread(target=Build,name='astroCalendar',daemon=True).start()
+
+    def next(self,Event,After):
+
+        """ Returns the time of the next event after the specified time. The
+        event is calculated directly if it is not covered by the calendar, and
+        the calendar is rebuilt in the background when it nears its end
+
+        INPUTS:
+            Event           Name of astronomical event
+            After           Timezone aware datetime object
+
+        OUTPUT:
+            Time            Timezone aware datetime object in UTC
+        """
+
+        # Find next event after the specified time in the calendar
+        Time = None
+        with self.Lock:
+            Times = self.Events.get(Event,[])
+            if self.Start is not None and After.timestamp() >= self.Start:
+                Index = bisect.bisect_right(Times,After.timestamp())
+                if Index < len(Times):
+                    Time = Times[Index]
+            Expiring = self.End is None or After.timestamp() > self.End - Margin*86400
+
+        # Rebuild calendar if it is about to expire, and calculate event
+        # directly if it is not covered by the calendar
+        if Expiring:
+            self.refreshInBackground()
+        if Time is None:
+            if Event in phaseEvents:
+                Time = pytz.utc.localize(phaseEvents[Event](ephemDate(After)).datetime()).timestamp()
+            else:
+                Time = compute(self.Config,Event,After)
+        return datetime.fromtimestamp(Time,pytz.utc)
+
+    def illumination(self,Time):
+
+        """ Returns the lunar illumination at the specified time, interpolated
+        from the hourly lunar illumination in the calendar
+
+        INPUTS:
+            Time            Timezone aware datetime object
+
+        OUTPUT:
+            Phase           Lunar illumination                           [%]
+        """
+
+        with self.Lock:
+            if self.Start is not None:
+                Hours = (Time.timestamp() - self.Start)/3600
+                Index = int(Hours)
+                if 0 <= Index < len(self.Phase) - 1:
+                    Fraction = Hours - Index
+                    return self.Phase[Index]*(1-Fraction) + self.Phase[Index+1]*Fraction
+        Moon = ephem.Moon()
+        Moon.compute(ephemDate(Time))
+        return Moon.phase
+
+    def nextStep(self,Time):
+
+        """ Returns the time at which the lunar illumination rounded to the
+        nearest percent next changes, interpolated from the hourly lunar
+        illumination in the calendar
+
+        INPUTS:
+            Time            Timezone aware datetime object
+
+        OUTPUT:
+            Step            Timezone aware datetime object in UTC, or None if
+                            the next change is not covered by the calendar
+        """
+
+        Level = round(self.illumination(Time))
+        with self.Lock:
+            if self.Start is None:
+                return None
+            Index = max(int((Time.timestamp() - self.Start)/3600),0)
+            for ii in range(Index,len(self.Phase)-1):
+                Low,High  = self.Phase[ii],self.Phase[ii+1]
+                Crossings = [self.Start + (ii + (Edge-Low)/(High-Low))*3600
+                             for Edge in (Level-0.5,Level+0.5)
+                             if Low != High and min(Low,High) <= Edge <= max(Low,High)]
+                Crossings = [Crossing for Crossing in Crossings if Crossing > Time.timestamp()]
+                if Crossings:
+                    return datetime.fromtimestamp(min(Crossings),pytz.utc)
+        return None
@@ -15,11 +15,20 @@ You should have received a copy of the GNU General Public License along with
 this program. If not, see <http://www.gnu.org/licenses/>.
 """
 
+# Import required library modules
+from lib import astroCalendar
+from lib import profiler
+
 # Import required modules
-from datetime import datetime, timedelta, date, time
-import ephem
+from kivy.clock import Clock
+from datetime   import datetime, timedelta, date, time
+from functools  import partial
+import time     as UNIX
 import pytz
 
+# Define global variables
+maxDelay = 3600
+
 def SunriseSunset(astroData,Config):
 
     """ Calculate sunrise and sunset times for the current day or tomorrow
@@ -33,50 +42,25 @@ def SunriseSunset(astroData,Config):
         astroData           Dictionary holding sunrise and sunset data
     """
 
-    # Define Sunrise/Sunset observer properties to match the United States Naval
-    # Observatory Astronomical Almanac
+    # Get astronomical event calendar for station location
     Tz = pytz.timezone(Config['Station']['Timezone'])
-    Observer          = ephem.Observer()
-    Observer.pressure = 0
-    Observer.lat      = str(Config['Station']['Latitude'])
-    Observer.lon      = str(Config['Station']['Longitude'])
+    Calendar = astroCalendar.get(Config)
 
     # The code is initialising. Calculate sunset/sunrise times for current day
     # starting at midnight today in UTC
     if astroData['Sunset'][0] == '-':
-
-        # Set Observer time to midnight today in UTC
-        UTC = datetime.now(pytz.utc)
-        Midnight = datetime(UTC.year,UTC.month,UTC.day,0,0,0)
-        Observer.date = Midnight.strftime('%Y/%m/%d %H:%M:%S')
+        After = astroCalendar.midnightUTC(datetime.now(pytz.utc))
 
     # Dusk has passed. Calculate sunset/sunrise times for tomorrow starting at
     # time of last Dusk in UTC
     else:
+        After = astroData['Dusk'][0].astimezone(pytz.utc) + timedelta(minutes=1)
 
-        # Set Observer time to last Sunset time in UTC
-        Dusk = astroData['Dusk'][0].astimezone(pytz.utc) + timedelta(minutes=1)
-        Observer.date = Dusk.strftime('%Y/%m/%d %H:%M:%S')
-
-    # Calculate Dawn time in UTC
-    Observer.horizon = '-6'
-    Dawn             = Observer.next_rising(ephem.Sun(), use_center=True)
-    Dawn             = pytz.utc.localize(Dawn.datetime().replace(second=0,microsecond=0))
-
-    # Calculate Sunrise time in UTC
-    Observer.horizon = '-0:34'
-    Sunrise          = Observer.next_rising(ephem.Sun())
-    Sunrise          = pytz.utc.localize(Sunrise.datetime().replace(second=0,microsecond=0))
-
-    # Calculate Sunset time in UTC
-    Observer.horizon = '-0:34'
-    Sunset           = Observer.next_setting(ephem.Sun())
-    Sunset           = pytz.utc.localize(Sunset.datetime().replace(second=0,microsecond=0))
-
-    # Calculate Dusk time in UTC
-    Observer.horizon = '-6'
-    Dusk             = Observer.next_setting(ephem.Sun(), use_center=True)
-    Dusk             = pytz.utc.localize(Dusk.datetime().replace(second=0,microsecond=0))
+    # Look up Dawn, Sunrise, Sunset and Dusk times in UTC
+    Dawn    = Calendar.next('Dawn',   After).replace(second=0,microsecond=0)
+    Sunrise = Calendar.next('Sunrise',After).replace(second=0,microsecond=0)
+    Sunset  = Calendar.next('Sunset', After).replace(second=0,microsecond=0)
+    Dusk    = Calendar.next('Dusk',   After).replace(second=0,microsecond=0)
 
     # Define Dawn/Dusk and Sunrise/Sunset times in Station timezone
     astroData['Dawn'][0]    = Dawn.astimezone(Tz)
@@ -114,55 +98,33 @@ def MoonriseMoonset(astroData,Config):
         astroData           Dictionary holding moonrise and moonset data
     """
 
-    # Define Moonrise/Moonset location properties
+    # Get astronomical event calendar for station location
     Tz = pytz.timezone(Config['Station']['Timezone'])
-    Observer     = ephem.Observer()
-    Observer.lat = str(Config['Station']['Latitude'])
-    Observer.lon = str(Config['Station']['Longitude'])
+    Calendar = astroCalendar.get(Config)
 
     # The code is initialising. Calculate moonrise time for current day
     # starting at midnight today in UTC
     if astroData['Moonrise'][0] == '-':
-
-        # Set Observer time to midnight today in UTC
-        UTC = datetime.now(pytz.utc)
-        Midnight = datetime(UTC.year,UTC.month,UTC.day,0,0,0)
-        Observer.date = Midnight.strftime('%Y/%m/%d %H:%M:%S')
+        After = astroCalendar.midnightUTC(datetime.now(pytz.utc))
 
     # Moonset has passed. Calculate time of next moonrise starting at
     # time of last Moonset in UTC
     else:
+        After = astroData['Moonset'][0].astimezone(pytz.utc) + timedelta(minutes=1)
 
-        # Set Observer time to last Moonset time in UTC
-        Moonset = astroData['Moonset'][0].astimezone(pytz.utc) + timedelta(minutes=1)
-        Observer.date = Moonset.strftime('%Y/%m/%d %H:%M:%S')
-
-    # Calculate Moonrise time in UTC
-    Moonrise = Observer.next_rising(ephem.Moon())
-    Moonrise = pytz.utc.localize(Moonrise.datetime().replace(second=0,microsecond=0))
-
-    # Define Moonrise time in Station timezone
+    # Look up Moonrise time in UTC and define Moonrise time in Station timezone
+    Moonrise = Calendar.next('Moonrise',After).replace(second=0,microsecond=0)
     astroData['Moonrise'][0] = Moonrise.astimezone(Tz)
 
-    # Convert Moonrise time in Station timezone to Moonrise time in UTC
-    Moonrise = astroData['Moonrise'][0].astimezone(pytz.utc)
-    Observer.date = Moonrise.strftime('%Y/%m/%d %H:%M:%S')
-
-    # Calculate time of next Moonset starting at time of last Moonrise in UTC
-    Moonset = Observer.next_setting(ephem.Moon())
-    Moonset = pytz.utc.localize(Moonset.datetime().replace(second=0,microsecond=0))
-
-    # Define Moonset time in Station timezone
+    # Look up time of next Moonset starting at time of last Moonrise in UTC and
+    # define Moonset time in Station timezone
+    Moonset = Calendar.next('Moonset',Moonrise).replace(second=0,microsecond=0)
     astroData['Moonset'][0] = Moonset.astimezone(Tz)
 
-    # Calculate date of next full moon in UTC
-    Observer.date = datetime.now(pytz.utc).strftime('%Y/%m/%d')
-    FullMoon = ephem.next_full_moon(Observer.date)
-    FullMoon = pytz.utc.localize(FullMoon.datetime())
-
-    # Calculate date of next new moon in UTC
-    NewMoon = ephem.next_new_moon(Observer.date)
-    NewMoon = pytz.utc.localize(NewMoon.datetime())
+    # Look up date of next full moon and next new moon in UTC
+    Midnight = astroCalendar.midnightUTC(datetime.now(pytz.utc))
+    FullMoon = Calendar.next('FullMoon',Midnight)
+    NewMoon  = Calendar.next('NewMoon', Midnight)
 
     # Define next new/full moon in station time zone
     astroData['FullMoon'] = [FullMoon.astimezone(Tz).strftime('%b %d'),FullMoon]
@@ -243,6 +205,7 @@ def Format(astroData,Config,Type):
     # Return dictionary holding sunrise/sunset and moonrise/moonset data
     return astroData
 
+@profiler.timed
 def sunTransit(astroData, Config, *largs):
 
     """ Calculate the sun transit between sunrise and sunset
@@ -255,6 +218,11 @@ def sunTransit(astroData, Config, *largs):
         astroData           Dictionary holding moonrise and moonset data
     """
 
+    # Return if sunrise/sunset times have not yet been initialised from the
+    # astronomical event calendar
+    if astroData['Dusk'][0] == '-' or astroData['Moonset'][0] == '-':
+        return astroData
+
     # Get current time in station time zone
     Tz = pytz.timezone(Config['Station']['Timezone'])
     Now = datetime.now(pytz.utc).astimezone(Tz)
@@ -328,6 +296,7 @@ def sunTransit(astroData, Config, *largs):
     # Return dictionary containing sun transit data
     return astroData
 
+@profiler.timed
 def moonPhase(astroData, Config, *largs):
 
     """ Calculate the moon phase for the current time in station timezone
@@ -340,6 +309,11 @@ def moonPhase(astroData, Config, *largs):
         astroData           Dictionary holding moonrise and moonset data
     """
 
+    # Return if new/full moon dates have not yet been initialised from the
+    # astronomical event calendar
+    if astroData['FullMoon'] == '--' or astroData['NewMoon'] == '--':
+        return astroData
+
     # Get current time in UTC
     Tz = pytz.timezone(Config['Station']['Timezone'])
     UTC = datetime.now(pytz.utc)
@@ -350,39 +324,91 @@ def moonPhase(astroData, Config, *largs):
     # Get date of next new moon in station time zone
     NewMoon = astroData['NewMoon'][1].astimezone(Tz)
 
-    # Calculate phase of moon
-    Moon = ephem.Moon()
-    Moon.compute(UTC.strftime('%Y/%m/%d %H:%M:%S'))
+    # Look up phase of moon in astronomical event calendar
+    Phase = astroCalendar.get(Config).illumination(UTC)
 
     # Define Moon phase icon
     if FullMoon < NewMoon:
-        PhaseIcon = 'Waxing_' + '{:.0f}'.format(Moon.phase)
+        PhaseIcon = 'Waxing_' + '{:.0f}'.format(Phase)
     elif NewMoon < FullMoon:
-        PhaseIcon = 'Waning_' + '{:.0f}'.format(Moon.phase)
+        PhaseIcon = 'Waning_' + '{:.0f}'.format(Phase)
 
     # Define Moon phase text
     if astroData['NewMoon'] == '[color=ff8837ff]Today[/color]':
         PhaseTxt = 'New Moon'
     elif astroData['FullMoon'] == '[color=ff8837ff]Today[/color]':
         PhaseTxt = 'Full Moon'
-    elif FullMoon < NewMoon and Moon.phase < 49:
+    elif FullMoon < NewMoon and Phase < 49:
         PhaseTxt = 'Waxing crescent'
-    elif FullMoon < NewMoon and 49 <= Moon.phase <= 51:
+    elif FullMoon < NewMoon and 49 <= Phase <= 51:
         PhaseTxt = 'First Quarter'
-    elif FullMoon < NewMoon and Moon.phase > 51:
+    elif FullMoon < NewMoon and Phase > 51:
         PhaseTxt = 'Waxing gibbous'
-    elif NewMoon < FullMoon and Moon.phase > 51:
+    elif NewMoon < FullMoon and Phase > 51:
         PhaseTxt = 'Waning gibbous'
-    elif NewMoon < FullMoon and 49 <= Moon.phase <= 51:
+    elif NewMoon < FullMoon and 49 <= Phase <= 51:
         PhaseTxt = 'Last Quarter'
-    elif NewMoon < FullMoon and Moon.phase < 49:
+    elif NewMoon < FullMoon and Phase < 49:
         PhaseTxt = 'Waning crescent'
 
     # Define Moon phase illumination
-    Illumination = '{:.0f}'.format(Moon.phase)
+    Illumination = '{:.0f}'.format(Phase)
 
     # Define Kivy Label binds
     astroData['Phase'] = [PhaseIcon,PhaseTxt,Illumination]
 
     # Return dictionary containing moon phase data
     return astroData
+
+def scheduleSunTransit(astroData,Config,*largs):
+
+    """ Updates the sun transit and schedules the next update for the start of
+    the next minute, when the displayed countdown and sunrise/sunset events
+    next change. Retries every second until the sunrise/sunset times have
+    been initialised
+
+    INPUTS:
+        astroData           Dictionary holding sunrise and sunset data
+        Config              Station configuration
+    """
+
+    # Update sun transit
+    sunTransit(astroData,Config)
+
+    # Schedule next update for the start of the next minute
+    if astroData['Dusk'][0] == '-' or astroData['Moonset'][0] == '-':
+        Delay = 1
+    else:
+        Delay = 60 - UNIX.time() % 60 + 0.05
+    Clock.schedule_once(partial(scheduleSunTransit,astroData,Config),Delay)
+
+def scheduleMoonPhase(astroData,Config,*largs):
+
+    """ Updates the moon phase and schedules the next update for when the
+    displayed lunar illumination next changes, or just after the next moonset
+    when the new/full moon dates are updated. Retries every second until the
+    new/full moon dates have been initialised
+
+    INPUTS:
+        astroData           Dictionary holding moonrise and moonset data
+        Config              Station configuration
+    """
+
+    # Update moon phase
+    moonPhase(astroData,Config)
+
+    # Schedule next update for the next change in lunar illumination or just
+    # after the next moonset, whichever comes first
+    if astroData['FullMoon'] == '--' or astroData['NewMoon'] == '--':
+        Delay = 1
+    else:
+        Now    = datetime.now(pytz.utc)
+        Delays = [maxDelay]
+        Step   = astroCalendar.get(Config).nextStep(Now)
+        if Step is not None:
+            Delays.append((Step - Now).total_seconds() + 1)
+        Moonset = (astroData['Moonset'][0] - Now).total_seconds() + 61
+        if Moonset > 0:
+            Delays.append(Moonset)
+        Delay = max(min(Delays),1)
+    Clock.schedule_once(partial(scheduleMoonPhase,astroData,Config),Delay)
@@ -0,0 +1,132 @@
+""" Calculates the solar position and clear-sky solar radiation required by the
+Raspberry Pi Python console for WeatherFlow Tempest and Smart Home Weather
+stations.
+Copyright (C) 2018-2021 Peter Davis
+
+This program is free software: you can redistribute it and/or modify it under
+the terms of the GNU General Public License as published by the Free Software
+Foundation, either version 3 of the License, or (at your option) any later
+version.
+
+This program is distributed in the hope that it will be useful, but WITHOUT
+ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with
+this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+# Import required modules
+import numpy as np
+import functools
+import math
+
+# Define global variables
+NaN          = float('NaN')
+gridStep     = 60
+gridPoints   = 86400//gridStep + 1
+minRadiation = 20
+
+def cosZenith(Time,Latitude,Longitude):
+
+    """ Calculates the cosine of the solar zenith angle for an array of times
+    using the NOAA solar position equations
+
+    INPUTS:
+        Time                Array of UNIX timestamps                          [s]
+        Latitude            Station latitude                            [degrees]
+        Longitude           Station longitude                           [degrees]
+
+    OUTPUT:
+        cosZ                Cosine of solar zenith angle
+    """
+
+    # Calculate Julian century
+    Time = np.asarray(Time,dtype=np.float64)
+    T    = (Time/86400 + 2440587.5 - 2451545)/36525
+
+    # Calculate geometric mean longitude and anomaly of the sun, and the
+    # eccentricity of the Earth's orbit
+    L0 = np.radians((280.46646 + T*(36000.76983 + T*0.0003032)) % 360)
+    M  = np.radians(357.52911 + T*(35999.05029 - T*0.0001537))
+    e  = 0.016708634 - T*(0.000042037 + T*0.0000001267)
+
+    # Calculate apparent longitude of the sun and obliquity of the ecliptic
+    C       = (np.sin(M)*(1.914602 - T*(0.004817 + T*0.000014))
+               + np.sin(2*M)*(0.019993 - T*0.000101) + np.sin(3*M)*0.000289)
+    Omega   = np.radians(125.04 - 1934.136*T)
+    Lambda  = np.radians(np.degrees(L0) + C - 0.00569 - 0.00478*np.sin(Omega))
+    Epsilon = np.radians(23 + (26 + (21.448 - T*(46.815 + T*(0.00059 - T*0.001813)))/60)/60
+                         + 0.00256*np.cos(Omega))
+
+    # Calculate solar declination and equation of time
+    Declination = np.arcsin(np.sin(Epsilon)*np.sin(Lambda))
+    y           = np.tan(Epsilon/2)**2
+    eqTime      = 4*np.degrees(y*np.sin(2*L0) - 2*e*np.sin(M) + 4*e*y*np.sin(M)*np.cos(2*L0)
+                               - 0.5*y**2*np.sin(4*L0) - 1.25*e**2*np.sin(2*M))
+
+    # Calculate solar hour angle and cosine of the solar zenith angle
+    solarTime = ((Time % 86400)/60 + eqTime + 4*Longitude) % 1440
+    hourAngle = np.radians(solarTime/4 - 180)
+    Latitude  = math.radians(Latitude)
+    return (math.sin(Latitude)*np.sin(Declination)
+            + math.cos(Latitude)*np.cos(Declination)*np.cos(hourAngle))
+
+def radiation(Time,Latitude,Longitude):
+
+    """ Calculates the clear-sky global horizontal solar radiation for an array
+    of times using the Haurwitz clear-sky model
+
+    INPUTS:
+        Time                Array of UNIX timestamps                          [s]
+        Latitude            Station latitude                            [degrees]
+        Longitude           Station longitude                           [degrees]
+
+    OUTPUT:
+        Radiation           Clear-sky solar radiation                     [W/m^2]
+    """
+
+    cosZ = np.clip(cosZenith(Time,Latitude,Longitude),0,None)
+    with np.errstate(divide='ignore'):
+        return np.where(cosZ > 0,1098*cosZ*np.exp(-0.057/cosZ),0)
+
+@functools.lru_cache(maxsize=2)
+def dayGrid(Latitude,Longitude,Day):
+
+    """ Returns the clear-sky solar radiation for every minute of the specified
+    UTC day, calculated in a single vectorised call and cached for the day
+
+    INPUTS:
+        Latitude            Station latitude                            [degrees]
+        Longitude           Station longitude                           [degrees]
+        Day                 Days since the UNIX epoch
+
+    OUTPUT:
+        Grid                Read-only array of clear-sky solar radiation  [W/m^2]
+    """
+
+    Grid = radiation(Day*86400 + np.arange(gridPoints)*gridStep,Latitude,Longitude)
+    Grid.flags.writeable = False
+    return Grid
+
+def expected(Time,Latitude,Longitude):
+
+    """ Returns the clear-sky solar radiation at the specified time, linearly
+    interpolated from the cached minute grid for the current day
+
+    INPUTS:
+        Time                UNIX timestamp                                    [s]
+        Latitude            Station latitude                            [degrees]
+        Longitude           Station longitude                           [degrees]
+
+    OUTPUT:
+        Radiation           Clear-sky solar radiation                     [W/m^2]
+    """
+
+    if math.isnan(Time):
+        return NaN
+    Day, Seconds = divmod(Time,86400)
+    Grid     = dayGrid(float(Latitude),float(Longitude),int(Day))
+    Index    = int(Seconds//gridStep)
+    Fraction = (Seconds - Index*gridStep)/gridStep
+    return float(Grid[Index]*(1-Fraction) + Grid[Index+1]*Fraction)
@@ -0,0 +1,198 @@
+""" Dependency graph used to calculate the derived weather variables required by
+the Raspberry Pi Python console for WeatherFlow Tempest and Smart Home Weather
+stations.
+Copyright (C) 2018-2021 Peter Davis
+
+This program is free software: you can redistribute it and/or modify it under
+the terms of the GNU General Public License as published by the Free Software
+Foundation, either version 3 of the License, or (at your option) any later
+version.
+
+This program is distributed in the hope that it will be useful, but WITHOUT
+ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with
+this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+# Import required library modules
+from lib.measurement import Measurement
+from lib             import observationFormat as observation
+
+# Import required Python modules
+import threading
+
+# Define global variables
+MISSING = object()
+
+def memoKey(Value):
+
+    """ Converts a raw observation or derived variable into a hashable key that
+    can be compared against the key stored when the variable was last used.
+    NaN values are mapped onto a single marker so that missing observations
+    compare as unchanged
+
+    INPUTS:
+        Value               Raw observation or derived variable
+
+    OUTPUT:
+        Key                 Hashable key representing Value
+    """
+
+    if isinstance(Value,Measurement):
+        return Value.key()
+    elif isinstance(Value,(list,tuple)):
+        return tuple(memoKey(Item) for Item in Value)
+    elif isinstance(Value,dict):
+        return tuple((Key,memoKey(Item)) for Key,Item in Value.items())
+    elif isinstance(Value,float) and Value != Value:
+        return 'NaN'
+    else:
+        return Value
+
+def configKey(Config,Required):
+
+    """ Extracts the station configuration values required by a node or output
+
+    INPUTS:
+        Config              Station configuration
+        Required            List of (Section,Key) pairs. A Key of None
+                            selects the entire configuration section
+
+    OUTPUT:
+        Key                 Hashable key representing the configuration values
+    """
+
+    Key = []
+    for Section,Option in Required:
+        if Option is None:
+            Key.append(tuple(Config[Section].items()))
+        else:
+            Key.append(Config[Section][Option])
+    return tuple(Key)
+
+class Node(object):
+
+    """ Defines a derived variable in the dependency graph
+
+    INPUTS:
+        Name                Name of the derived variable
+        Func                Function returning the derived variable, called as
+                            Func(Values,Config)
+        Inputs              Names of the raw observations and derived variables
+                            read by Func
+        Config              (Section,Key) pairs of the station configuration
+                            read by Func
+        Volatile            Derived variable depends on stored state or the
+                            current time and is recalculated on every message
+    """
+
+    def __init__(self,Name,Func,Inputs=(),Config=(),Volatile=False):
+        self.Name     = Name
+        self.Func     = Func
+        self.Inputs   = tuple(Inputs)
+        self.Config   = tuple(Config)
+        self.Volatile = Volatile
+
+class Output(object):
+
+    """ Defines a display field populated from the dependency graph
+
+    INPUTS:
+        Key                 Key of the display field in wfpiconsole.Obs
+        Source              Name of the raw observation or derived variable
+        Format              Observation type passed to observation.Format
+        Units               Key in the [Units] section of the station
+                            configuration, or None if no conversion is required
+        Index               Optional index into Source when the derived
+                            variable holds more than one value
+    """
+
+    def __init__(self,Key,Source,Format,Units=None,Index=None):
+        self.Key    = Key
+        self.Source = Source
+        self.Format = Format
+        self.Units  = Units
+        self.Index  = Index
+
+class Graph(object):
+
+    """ Dependency graph linking raw observations to derived variables and
+    display fields. Derived variables are only recalculated when one of their
+    inputs or configuration values has changed, and display fields are only
+    returned when their value has changed at the precision it is displayed
+
+    INPUTS:
+        Nodes               List of Node objects in dependency order
+        Outputs             List of Output objects
+    """
+
+    def __init__(self,Nodes,Outputs):
+        self.Nodes   = list(Nodes)
+        self.Outputs = list(Outputs)
+        self.Values  = {}
+        self.Memo    = {}
+        self.Lock    = threading.RLock()
+
+    def update(self,Inputs,Config):
+
+        """ Updates the dependency graph with the latest raw observations
+
+        INPUTS:
+            Inputs          Dictionary of raw observations and stored state
+            Config          Station configuration
+
+        OUTPUT:
+            derivedObs      Dictionary of display fields that have changed
+        """
+
+        with self.Lock:
+
+            # Store latest raw observations
+            self.Values.update(Inputs)
+
+            # Recalculate derived variables whose inputs or configuration have
+            # changed since they were last calculated
+            for node in self.Nodes:
+                Key = (tuple(memoKey(self.Values.get(Name,MISSING)) for Name in node.Inputs),
+                       configKey(Config,node.Config))
+                if node.Volatile or self.Memo.get(node.Name,MISSING) != Key:
+                    self.Values[node.Name] = node.Func(self.Values,Config)
+                    self.Memo[node.Name]   = Key
+
+            # Return display fields
+            return self.render(Config)
+
+    def render(self,Config,Force=False):
+
+        """ Converts and formats the display fields whose displayed value has
+        changed since they were last rendered. Display fields are compared by
+        the display key of the converted value, which excludes the stored state
+        of the derived variables and is rounded to the display precision
+
+        INPUTS:
+            Config          Station configuration
+            Force           Render all display fields regardless of changes
+
+        OUTPUT:
+            derivedObs      Dictionary of display fields that have changed
+        """
+
+        with self.Lock:
+            derivedObs = {}
+            for output in self.Outputs:
+                Value = self.Values.get(output.Source,MISSING)
+                if Value is MISSING:
+                    continue
+                if output.Index is not None:
+                    Value = Value[output.Index]
+                if isinstance(Value,Measurement):
+                    Value = [Value.Value,Value.Unit]
+                if output.Units:
+                    Value = observation.getPipeline(Config).convert(Value,output.Units)
+                Key = observation.displayKey(Value,output.Format)
+                if Force or self.Memo.get(('Output',output.Key),MISSING) != Key:
+                    derivedObs[output.Key] = list(observation.cachedFormat(Key,output.Format))
+                    self.Memo[('Output',output.Key)] = Key
+            return derivedObs
@@ -18,6 +18,10 @@ this program. If not, see <http://www.gnu.org/licenses/>.
 # Import required library modules
 from lib import derivedVariables as derive
 from lib import requestAPI
+from lib import rainLedger
+from lib import solarIntegrator
+from lib import clearSky
+from lib.measurement import Extreme, Running, Average, Elapsed, Solar
 
 # Import required Python modules
 from datetime import datetime, date, time, timedelta
@@ -37,6 +41,332 @@ def CircularMean(angles):
     r = np.nanmean(np.exp(1j*angles))
     return np.angle(r, deg=True) % 360
 
+# ==============================================================================
+# DEFINE STATION GEOMETRY
+# ==============================================================================
+class stationGeometry(object):
+
+    """ Holds the reduction coefficients required to convert station pressure
+    into sea level pressure. The coefficients depend only on the station
+    elevation and device height, and are calculated once when the station
+    configuration is loaded or changed
+
+    INPUTS:
+        Elevation           Station elevation                   [m]
+        Height              Height of pressure sensor           [m]
+    """
+
+    # Define required constants
+    P0     = 1013.25
+    Rd     = 287.05
+    GammaS = 0.0065
+    g      = 9.80665
+    T0     = 288.15
+
+    # Define cached station geometry and the configuration it was built from
+    Cache = (None,None)
+
+    def __init__(self,Elevation,Height):
+        self.Elev     = float(Elevation) + float(Height)
+        self.Exponent = (self.Rd*self.GammaS)/self.g
+        self.Scale    = (self.GammaS*self.Elev)/self.T0
+        self.Power    = self.g/(self.Rd*self.GammaS)
+
+    @classmethod
+    def fromConfig(cls,Config):
+
+        """ Returns the station geometry for the current station configuration,
+        rebuilding it only if the station elevation or device height has
+        changed
+
+        INPUTS:
+            Config              Station configuration
+
+        OUTPUT:
+            Geometry            Station geometry object
+        """
+
+        # Extract required configuration variables
+        Elevation = Config['Station']['Elevation']
+        if Config['Station']['OutAirHeight']:
+            Height = Config['Station']['OutAirHeight']
+        elif Config['Station']['TempestHeight']:
+            Height = Config['Station']['TempestHeight']
+        else:
+            Height = 0
+
+        # Rebuild station geometry if configuration has changed
+        Key, Geometry = cls.Cache
+        if Key != (Elevation,Height):
+            Geometry  = cls(Elevation,Height)
+            cls.Cache = ((Elevation,Height),Geometry)
+        return Geometry
+
+    def SLP(self,Pres):
+
+        """ Convert a single station pressure into sea level pressure
+
+        INPUTS:
+            Pres                Station pressure                [mb]
+
+        OUTPUT:
+            SLP                 Sea level pressure              [mb]
+        """
+
+        return Pres * (1 + ((self.P0/Pres)**self.Exponent) * self.Scale)**self.Power
+
+    def SLPArray(self,Pres):
+
+        """ Convert an array of station pressures into sea level pressure
+
+        INPUTS:
+            Pres                Station pressure                [mb]
+
+        OUTPUT:
+            SLP                 Sea level pressure              [mb]
+        """
+
+        Pres = np.asarray(Pres,dtype=np.float64)
+        return Pres * (1 + ((self.P0/Pres)**self.Exponent) * self.Scale)**self.Power
+
+# ==============================================================================
+# DEFINE CLASSIFICATION TABLES
+# ==============================================================================
+class thresholdTable(object):
+
+    """ Precompiled threshold table used to classify an observation into one of
+    a set of categories. Scalar values are classified with bisect and arrays
+    are classified with numpy.searchsorted
+
+    INPUTS:
+        Cutoffs             Sorted category cut-offs
+        Right               Values equal to a cut-off are placed in the upper
+                            category (bisect_right) if True, or the lower
+                            category (bisect_left) if False
+        Missing             Category index returned for NaN values
+    """
+
+    def __init__(self,Cutoffs,Right=True,Missing=-1):
+        self.Cutoffs = tuple(Cutoffs)
+        self.Array   = np.array(Cutoffs,dtype=np.float64)
+        self.Bisect  = bisect.bisect_right if Right else bisect.bisect_left
+        self.Side    = 'right' if Right else 'left'
+        self.Missing = Missing
+
+    def index(self,Value):
+
+        """ Returns the category index of a single value
+        """
+
+        if math.isnan(Value):
+            return self.Missing
+        return self.Bisect(self.Cutoffs,Value)
+
+    def indexArray(self,Values):
+
+        """ Returns the category index of an array of values
+        """
+
+        Values = np.asarray(Values,dtype=np.float64)
+        Index  = np.searchsorted(self.Array,Values,side=self.Side)
+        return np.where(np.isnan(Values),self.Missing,Index)
+
+# Define Beaufort scale cutoffs, Force numbers and descriptions
+beaufortTable       = thresholdTable([0.5,1.5,3.3,5.5,7.9,10.7,13.8,17.1,20.7,24.4,28.4,32.6])
+beaufortForce       = tuple(float(Force) for Force in range(13))
+beaufortDescription = ('Calm Conditions', 'Light Air' ,        'Light Breeze',  'Gentle Breeze',
+                       'Moderate Breeze', 'Fresh Breeze',      'Strong Breeze', 'Near Gale Force',
+                       'Gale Force',      'Severe Gale Force', 'Storm Force',   'Violent Storm',
+                       'Hurricane Force')
+
+# Define cardinal wind directions and formatted descriptions
+cardinalDirection   = ('N','NNE','NE','ENE','E','ESE','SE','SSE','S','SSW','SW','WSW','W','WNW','NW','NNW','N')
+cardinalDescription = tuple(Text.split()[0] + ' [color=9aba2fff]' + Text.split()[1] + '[/color]' for Text in
+                            ['Due North','North NE','North East','East NE','Due East','East SE','South East','South SE',
+                             'Due South','South SW','South West','West SW','Due West','West NW','North West','North NW',
+                             'Due North'])
+
+# Define UV index cutoffs, level descriptions and colours
+uvTable = thresholdTable([0,3,6,8,11])
+uvText  = ('None','Low','Moderate','High','Very High','Extreme')
+uvColor = ('#646464','#558B2F','#F9A825','#EF6C00','#B71C1C','#6A1B9A')
+
+# Define percent of clear-sky radiation cutoffs and cloudiness descriptions
+cloudTable = thresholdTable([20,40,70,90])
+cloudText  = ('Overcast','Mostly cloudy','Partly cloudy','Mostly clear','Clear')
+
+# Define rain rate cutoffs and descriptions. Index 0 is reserved for zero
+# rain rate and the final index for missing rain rate
+rainRateTable = thresholdTable([0.25,1.0,4.0,16.0,50.0],Missing=7)
+rainRateText  = ('Currently Dry','Very Light Rain','Light Rain','Moderate Rain','Heavy Rain',
+                 'Very Heavy Rain','Extreme Rain','-')
+
+# Define pressure trend cutoffs and descriptions. Falling trends are closed at
+# the cut-off, while rising trends are only rapid above the upper cut-off
+fallingTable = thresholdTable([-2/3,-1/3],Right=False)
+risingTable  = thresholdTable([2/3],Right=False)
+trendText    = ('[color=00a4b4ff]Falling rapidly[/color]','[color=00a4b4ff]Falling[/color]',
+                '[color=9aba2fff]Steady[/color]','[color=ff8837ff]Rising[/color]',
+                '[color=ff8837ff]Rising rapidly[/color]','-')
+
+# Define weather tendency based on pressure band (low/mid/high) and pressure
+# trend index
+tendencyTable = thresholdTable([1023])
+tendencyText  = (('Stormy conditions likely','Rainy conditions likely','Becoming clearer and cooler',
+                  'Becoming clearer and cooler','Becoming clearer and cooler','Becoming clearer and cooler'),
+                 ('Rainy conditions likely','Conditions unchanged','Conditions unchanged',
+                  'Conditions unchanged','Conditions unchanged','Conditions unchanged'),
+                 ('Becoming cloudy and warmer','Fair conditions likely','Fair conditions likely',
+                  'Fair conditions likely','Fair conditions likely','Fair conditions likely'))
+
+# Define 'FeelsLike' temperature text and icon
+feelsLikeDescription = ('Feeling extremely cold', 'Feeling freezing cold', 'Feeling very cold',
+                        'Feeling cold', 'Feeling mild', 'Feeling warm', 'Feeling hot',
+                        'Feeling very hot', 'Feeling extremely hot', '-')
+feelsLikeIcon        = ('ExtremelyCold', 'FreezingCold', 'VeryCold', 'Cold', 'Mild', 'Warm',
+                        'Hot', 'VeryHot', 'ExtremelyHot', '-')
+feelsLikeCache       = (None,None)
+
+def feelsLikeTable(Config):
+
+    """ Returns the 'FeelsLike' threshold table for the current station
+    configuration, rebuilding it only if the [FeelsLike] cut-offs or the
+    temperature units have changed
+
+    INPUTS:
+        Config              Station configuration
+
+    OUTPUT:
+        Table               'FeelsLike' threshold table and Fahrenheit flag
+    """
+
+    global feelsLikeCache
+    Key, Table = feelsLikeCache
+    if Key != (tuple(Config['FeelsLike'].values()),Config['Units']['Temp']):
+        Key   = (tuple(Config['FeelsLike'].values()),Config['Units']['Temp'])
+        Table = (thresholdTable([float(item) for item in Key[0]],Missing=9),Key[1] == 'f')
+        feelsLikeCache = (Key,Table)
+    return Table
+
+def trendIndex(Trend):
+
+    """ Returns the pressure trend index of a single pressure trend
+    """
+
+    if math.isnan(Trend):
+        return 5
+    elif Trend < 1/3:
+        return fallingTable.index(Trend)
+    else:
+        return 3 + risingTable.index(Trend)
+
+def tendencyIndex(Pres):
+
+    """ Returns the pressure band index of a single sea level pressure
+    """
+
+    return 0 if Pres <= 1009 else 1 + tendencyTable.index(Pres)
+
+# ==============================================================================
+# DEFINE VECTORISED CLASSIFICATION FUNCTIONS
+# ==============================================================================
+def BeaufortForceArray(windSpd):
+
+    """ Returns the Beaufort Force number for an array of wind speeds
+
+    INPUTS:
+        windSpd             Wind speed                                     [m/s]
+
+    OUTPUT:
+        Force               Beaufort Force number (NaN if wind speed missing)
+    """
+
+    Index = beaufortTable.indexArray(windSpd)
+    return np.where(Index < 0,NaN,Index).astype(np.float64)
+
+def CardinalWindDirectionArray(windDir):
+
+    """ Returns the cardinal wind direction for an array of wind directions
+
+    INPUTS:
+        windDir             Wind direction                             [degrees]
+
+    OUTPUT:
+        Direction           Cardinal wind direction ('-' if missing)
+    """
+
+    windDir = np.asarray(windDir,dtype=np.float64)
+    Missing = np.isnan(windDir)
+    Index   = np.rint(np.where(Missing,0,windDir)/22.5).astype(np.int64)
+    return np.where(Missing,'-',np.array(cardinalDirection)[Index])
+
+def UVIndexArray(uvLevel):
+
+    """ Returns the UV index level for an array of UV levels
+
+    INPUTS:
+        uvLevel             UV level                                     [index]
+
+    OUTPUT:
+        Level               UV index level ('-' if missing)
+    """
+
+    uvLevel = np.round(np.asarray(uvLevel,dtype=np.float64),1)
+    Index   = np.where(uvLevel > 0,uvTable.indexArray(uvLevel),0)
+    return np.where(np.isnan(uvLevel),'-',np.array(uvText)[Index])
+
+def RainRateArray(rainAccum):
+
+    """ Returns the rain rate description for an array of one minute rain
+    accumulations
+
+    INPUTS:
+        rainAccum           One minute rain accumulation                    [mm]
+
+    OUTPUT:
+        RateText            Rain rate description
+    """
+
+    Rate  = np.asarray(rainAccum,dtype=np.float64)*60
+    Index = np.where(Rate == 0,0,rainRateTable.indexArray(Rate) + 1)
+    Index = np.where(np.isnan(Rate),rainRateTable.Missing,Index)
+    return np.array(rainRateText)[Index]
+
+def SLPTrendArray(Trend):
+
+    """ Returns the pressure trend description for an array of pressure trends
+
+    INPUTS:
+        Trend               Pressure trend                               [mb/hr]
+
+    OUTPUT:
+        TrendTxt            Pressure trend description
+    """
+
+    Trend = np.asarray(Trend,dtype=np.float64)
+    Index = np.where(Trend < 1/3,fallingTable.indexArray(Trend),3 + risingTable.indexArray(Trend))
+    Index = np.where(np.isnan(Trend),5,Index)
+    return np.array(trendText)[Index]
+
+def FeelsLikeArray(FeelsLike,Config):
+
+    """ Returns the 'FeelsLike' description for an array of 'FeelsLike'
+    temperatures
+
+    INPUTS:
+        FeelsLike           'FeelsLike' temperature                          [C]
+        Config              Station configuration
+
+    OUTPUT:
+        Description         'FeelsLike' description
+    """
+
+    Table, Fahrenheit = feelsLikeTable(Config)
+    FeelsLike = np.asarray(FeelsLike,dtype=np.float64)
+    if Fahrenheit:
+        FeelsLike = FeelsLike * 9/5 + 32
+    return np.array(feelsLikeDescription)[Table.indexArray(FeelsLike)]
+
 # ==============================================================================
 # DEFINE DERIVED VARIABLE FUNCTIONS
 # ==============================================================================
@@ -106,25 +436,15 @@ def FeelsLike(Temp,Humidity,windSpd,Config):
     else:
         FeelsLike = Temp
 
-    # Define 'FeelsLike' temperature cutoffs
-    Cutoffs = [float(item) for item in list(Config['FeelsLike'].values())]
-
     # Define 'FeelsLike temperature text and icon
-    Description = ['Feeling extremely cold', 'Feeling freezing cold', 'Feeling very cold',
-                   'Feeling cold', 'Feeling mild', 'Feeling warm', 'Feeling hot',
-                   'Feeling very hot', 'Feeling extremely hot', '-']
-    Icon =        ['ExtremelyCold', 'FreezingCold', 'VeryCold', 'Cold', 'Mild', 'Warm',
-                   'Hot', 'VeryHot', 'ExtremelyHot', '-']
-    if not math.isnan(FeelsLike[0]):
-        if Config['Units']['Temp'] == 'f':
-            Ind = bisect.bisect(Cutoffs,FeelsLike[0]* 9/5 + 32)
-        else:
-            Ind = bisect.bisect(Cutoffs,FeelsLike[0])
+    Table, Fahrenheit = feelsLikeTable(Config)
+    if Fahrenheit:
+        Ind = Table.index(FeelsLike[0]* 9/5 + 32)
     else:
-        Ind = 9
+        Ind = Table.index(FeelsLike[0])
 
     # Return 'Feels Like' temperature
-    return [FeelsLike[0],FeelsLike[1],Description[Ind],Icon[Ind]]
+    return [FeelsLike[0],FeelsLike[1],feelsLikeDescription[Ind],feelsLikeIcon[Ind]]
 
 def SLP(Pres,Config):
 
@@ -138,23 +458,8 @@ def SLP(Pres,Config):
         SLP                 Sea level pressure                  [mb]
     """
 
-    # Extract required configuration variables
-    Elevation = Config['Station']['Elevation']
-    if Config['Station']['OutAirHeight']:
-        Height = Config['Station']['OutAirHeight']
-    elif Config['Station']['TempestHeight']:
-        Height = Config['Station']['TempestHeight']
-
-    # Define required constants
-    P0 = 1013.25
-    Rd = 287.05
-    GammaS = 0.0065
-    g = 9.80665
-    T0 = 288.15
-    Elev = float(Elevation) + float(Height)
-
     # Calculate and return sea level pressure
-    SLP = Pres[0] * (1 + ((P0/Pres[0])**((Rd*GammaS)/g)) * ((GammaS*Elev)/T0))**(g/(Rd*GammaS))
+    SLP = stationGeometry.fromConfig(Config).SLP(Pres[0])
     return [SLP,'mb','-' if math.isnan(SLP) else '{:.1f}'.format(SLP)]
 
 def SLPTrend(Pres,Time,Data3h,Config):
@@ -194,39 +499,14 @@ def SLPTrend(Pres,Time,Data3h,Config):
         Trend = abs(Trend)
 
     # Define pressure trend text
-    if math.isnan(Trend):
-        TrendTxt = '-'
-    elif Trend > 2/3:
-        TrendTxt = '[color=ff8837ff]Rising rapidly[/color]'
-    elif Trend >= 1/3:
-        TrendTxt = '[color=ff8837ff]Rising[/color]'
-    elif Trend <= -2/3:
-        TrendTxt = '[color=00a4b4ff]Falling rapidly[/color]'
-    elif Trend <= -1/3:
-        TrendTxt = '[color=00a4b4ff]Falling[/color]'
-    else:
-        TrendTxt = '[color=9aba2fff]Steady[/color]'
+    Ind      = trendIndex(Trend)
+    TrendTxt = trendText[Ind]
 
     # Define weather tendency based on pressure and trend
-    if Pres[0] >= 1023:
-        if 'Falling rapidly' in TrendTxt:
-            Tendency = 'Becoming cloudy and warmer'
-        else:
-            Tendency = 'Fair conditions likely'
-    elif 1009 < Pres[0] < 1023:
-        if 'Falling rapidly' in TrendTxt:
-            Tendency = 'Rainy conditions likely'
-        else:
-            Tendency = 'Conditions unchanged'
-    elif Pres[0] <= 1009:
-        if 'Falling rapidly' in TrendTxt:
-            Tendency = 'Stormy conditions likely'
-        elif 'Falling' in TrendTxt:
-            Tendency = 'Rainy conditions likely'
-        else:
-            Tendency = 'Becoming clearer and cooler'
-    else:
+    if math.isnan(Pres[0]):
         Tendency = '-'
+    else:
+        Tendency = tendencyText[tendencyIndex(Pres[0])][Ind]
 
     # Return pressure trend
     return [Trend,'mb/hr',TrendTxt,Tendency]
@@ -267,7 +547,7 @@ def SLPMaxMin(Time,Pres,maxPres,minPres,Device,Config,flagAPI):
 
     # If console is initialising, download all data for current day using
     # Weatherflow API and calculate daily maximum and minimum pressure
-    if maxPres[0] == '-' or flagAPI:
+    if maxPres is None or flagAPI:
 
         # Download pressure data from the current day
         Data = requestAPI.weatherflow.Today(Device,Config)
@@ -279,45 +559,47 @@ def SLPMaxMin(Time,Pres,maxPres,minPres,Device,Config,flagAPI):
             Data = Data.json()['obs']
             Time = [item[0] for item in Data if item[0] != None]
             if Config['Station']['OutAirID']:
-                Pres = [[item[1],'mb'] for item in Data if item[1] != None]
+                Pres = [item[1] for item in Data if item[1] != None]
             elif Config['Station']['TempestID']:
-                Pres = [[item[6],'mb'] for item in Data if item[6] != None]
+                Pres = [item[6] for item in Data if item[6] != None]
 
             # Calculate sea level pressure
-            SLP = [derive.SLP(P,Config) for P in Pres]
+            SLP = stationGeometry.fromConfig(Config).SLPArray(Pres)
 
             # Define maximum and minimum pressure
             if len(SLP) > 0:
-                MaxPres = [max(SLP)[0],'mb',datetime.fromtimestamp(Time[SLP.index(max(SLP))],Tz).strftime(Format),max(SLP)[0],Now]
-                MinPres = [min(SLP)[0],'mb',datetime.fromtimestamp(Time[SLP.index(min(SLP))],Tz).strftime(Format),min(SLP)[0],Now]
+                iMax = int(np.argmax(SLP))
+                iMin = int(np.argmin(SLP))
+                MaxPres = Extreme([SLP[iMax].item(),'mb',datetime.fromtimestamp(Time[iMax],Tz).strftime(Format),SLP[iMax].item(),Now])
+                MinPres = Extreme([SLP[iMin].item(),'mb',datetime.fromtimestamp(Time[iMin],Tz).strftime(Format),SLP[iMin].item(),Now])
             else:
-                MaxPres = [NaN,'mb','-',NaN,Now]
-                MinPres = [NaN,'mb','-',NaN,Now]
+                MaxPres = Extreme([NaN,'mb','-',NaN,Now])
+                MinPres = Extreme([NaN,'mb','-',NaN,Now])
         else:
-            MaxPres = [NaN,'mb','-',NaN,Now]
-            MinPres = [NaN,'mb','-',NaN,Now]
+            MaxPres = Extreme([NaN,'mb','-',NaN,Now])
+            MinPres = Extreme([NaN,'mb','-',NaN,Now])
 
     # Else if midnight has passed, reset maximum and minimum pressure
-    elif Now.date() > maxPres[4].date():
-        MaxPres = [SLP[0],'mb',datetime.fromtimestamp(Time[0],Tz).strftime(Format),SLP[0],Now]
-        MinPres = [SLP[0],'mb',datetime.fromtimestamp(Time[0],Tz).strftime(Format),SLP[0],Now]
+    elif Now.date() > maxPres.Updated.date():
+        MaxPres = Extreme([SLP[0],'mb',datetime.fromtimestamp(Time[0],Tz).strftime(Format),SLP[0],Now])
+        MinPres = Extreme([SLP[0],'mb',datetime.fromtimestamp(Time[0],Tz).strftime(Format),SLP[0],Now])
 
     # Else if current pressure is greater than maximum recorded pressure, update
     # maximum pressure
-    elif SLP[0] > maxPres[3]:
-        MaxPres = [SLP[0],'mb',datetime.fromtimestamp(Time[0],Tz).strftime(Format),SLP[0],Now]
-        MinPres = [minPres[3],'mb',minPres[2],minPres[3],Now]
+    elif SLP[0] > maxPres.Raw:
+        MaxPres = Extreme([SLP[0],'mb',datetime.fromtimestamp(Time[0],Tz).strftime(Format),SLP[0],Now])
+        MinPres = Extreme([minPres.Raw,'mb',minPres.Clock,minPres.Raw,Now])
 
     # Else if current pressure is less than minimum recorded pressure, update
     # minimum pressure and time
-    elif SLP[0] < minPres[3]:
-        MaxPres = [maxPres[3],'mb',maxPres[2],maxPres[3],Now]
-        MinPres = [SLP[0],'mb',datetime.fromtimestamp(Time[0],Tz).strftime(Format),SLP[0],Now]
+    elif SLP[0] < minPres.Raw:
+        MaxPres = Extreme([maxPres.Raw,'mb',maxPres.Clock,maxPres.Raw,Now])
+        MinPres = Extreme([SLP[0],'mb',datetime.fromtimestamp(Time[0],Tz).strftime(Format),SLP[0],Now])
 
     # Else maximum and minimum pressure unchanged, return existing values
     else:
-        MaxPres = [maxPres[3],'mb',maxPres[2],maxPres[3],Now]
-        MinPres = [minPres[3],'mb',minPres[2],minPres[3],Now]
+        MaxPres = Extreme([maxPres.Raw,'mb',maxPres.Clock,maxPres.Raw,Now])
+        MinPres = Extreme([minPres.Raw,'mb',minPres.Clock,minPres.Raw,Now])
 
     # Return required variables
     return MaxPres,MinPres
@@ -356,7 +638,7 @@ def TempMaxMin(Time,Temp,maxTemp,minTemp,Device,Config,flagAPI):
 
     # If console is initialising, download all data for current day using
     # Weatherflow API and calculate daily maximum and minimum temperature
-    if maxTemp[0] == '-' or flagAPI:
+    if maxTemp is None or flagAPI:
 
         # Download temperature data from the current day
         Data = requestAPI.weatherflow.Today(Device,Config)
@@ -374,33 +656,33 @@ def TempMaxMin(Time,Temp,maxTemp,minTemp,Device,Config,flagAPI):
                 Temp = [[item[2],'c'] for item in Data if item[2] != None]
 
             # Define maximum and minimum temperature and time
-            MaxTemp = [max(Temp)[0],'c',datetime.fromtimestamp(Time[Temp.index(max(Temp))][0],Tz).strftime(Format),max(Temp)[0],Now]
-            MinTemp = [min(Temp)[0],'c',datetime.fromtimestamp(Time[Temp.index(min(Temp))][0],Tz).strftime(Format),min(Temp)[0],Now]
+            MaxTemp = Extreme([max(Temp)[0],'c',datetime.fromtimestamp(Time[Temp.index(max(Temp))][0],Tz).strftime(Format),max(Temp)[0],Now])
+            MinTemp = Extreme([min(Temp)[0],'c',datetime.fromtimestamp(Time[Temp.index(min(Temp))][0],Tz).strftime(Format),min(Temp)[0],Now])
         else:
-            MaxTemp = [NaN,'c','-',NaN,Now]
-            MinTemp = [NaN,'c','-',NaN,Now]
+            MaxTemp = Extreme([NaN,'c','-',NaN,Now])
+            MinTemp = Extreme([NaN,'c','-',NaN,Now])
 
     # Else if midnight has passed, reset maximum and minimum temperature
-    elif Now.date() > maxTemp[4].date():
-        MaxTemp = [Temp[0],'c',datetime.fromtimestamp(Time[0],Tz).strftime(Format),Temp[0],Now]
-        MinTemp = [Temp[0],'c',datetime.fromtimestamp(Time[0],Tz).strftime(Format),Temp[0],Now]
+    elif Now.date() > maxTemp.Updated.date():
+        MaxTemp = Extreme([Temp[0],'c',datetime.fromtimestamp(Time[0],Tz).strftime(Format),Temp[0],Now])
+        MinTemp = Extreme([Temp[0],'c',datetime.fromtimestamp(Time[0],Tz).strftime(Format),Temp[0],Now])
 
     # Else if current temperature is greater than maximum recorded temperature,
     # update maximum temperature
-    elif Temp[0] > maxTemp[3]:
-        MaxTemp = [Temp[0],'c',datetime.fromtimestamp(Time[0],Tz).strftime(Format),Temp[0],Now]
-        MinTemp = [minTemp[3],'c',minTemp[2],minTemp[3],Now]
+    elif Temp[0] > maxTemp.Raw:
+        MaxTemp = Extreme([Temp[0],'c',datetime.fromtimestamp(Time[0],Tz).strftime(Format),Temp[0],Now])
+        MinTemp = Extreme([minTemp.Raw,'c',minTemp.Clock,minTemp.Raw,Now])
 
     # Else if current temperature is less than minimum recorded temperature,
     # update minimum temperature
-    elif Temp[0] < minTemp[3]:
-        MaxTemp = [maxTemp[3],'c',maxTemp[2],maxTemp[3],Now]
-        MinTemp = [Temp[0],'c',datetime.fromtimestamp(Time[0],Tz).strftime(Format),Temp[0],Now]
+    elif Temp[0] < minTemp.Raw:
+        MaxTemp = Extreme([maxTemp.Raw,'c',maxTemp.Clock,maxTemp.Raw,Now])
+        MinTemp = Extreme([Temp[0],'c',datetime.fromtimestamp(Time[0],Tz).strftime(Format),Temp[0],Now])
 
     # Else maximum and minimum temperature unchanged, return existing values
     else:
-        MaxTemp = [maxTemp[3],'c',maxTemp[2],maxTemp[3],Now]
-        MinTemp = [minTemp[3],'c',minTemp[2],minTemp[3],Now]
+        MaxTemp = Extreme([maxTemp.Raw,'c',maxTemp.Clock,maxTemp.Raw,Now])
+        MinTemp = Extreme([minTemp.Raw,'c',minTemp.Clock,minTemp.Raw,Now])
 
     # Return required variables
     return MaxTemp,MinTemp
@@ -419,7 +701,7 @@ def StrikeDeltaT(StrikeTime):
     # Calculate time since last lightning strike
     Now = int(time.time())
     deltaT = Now - StrikeTime[0]
-    deltaT = [deltaT,'s',deltaT]
+    deltaT = Elapsed([deltaT,'s',deltaT])
 
     # Return time since and distance to last lightning strike
     return deltaT
@@ -500,7 +782,7 @@ def StrikeCount(Count,strikeCount,Device,Config,flagAPI):
 
     # If console is initialising, download all data for current day using
     # Weatherflow API and calculate total daily lightning strikes
-    if strikeCount['Today'][0] == '-' or flagAPI:
+    if strikeCount is None or flagAPI:
 
         # Download lightning strike data from the current day
         Data = requestAPI.weatherflow.Today(Device,Config)
@@ -513,23 +795,23 @@ def StrikeCount(Count,strikeCount,Device,Config,flagAPI):
                 Strikes = [item[4] for item in Data if item[4] != None]
             elif Config['Station']['TempestID']:
                 Strikes = [item[15] for item in Data if item[15] != None]
-            todayStrikes = [sum(x for x in Strikes),'count',sum(x for x in Strikes),Now]
+            todayStrikes = Running([sum(x for x in Strikes),'count',sum(x for x in Strikes),Now])
         else:
-            todayStrikes = [NaN,'count',NaN,Now]
+            todayStrikes = Running([NaN,'count',NaN,Now])
 
     # Else if midnight has passed, reset daily lightning strike count to zero
-    elif Now.date() > strikeCount['Today'][3].date():
-        todayStrikes = [Count[0],'count',Count[0],Now]
+    elif Now.date() > strikeCount['Today'].Updated.date():
+        todayStrikes = Running([Count[0],'count',Count[0],Now])
 
     # Else, calculate current daily lightning strike count
     else:
-        currentCount = strikeCount['Today'][2]
+        currentCount = strikeCount['Today'].Raw
         updatedCount = currentCount + Count[0] if not math.isnan(Count[0]) else currentCount
-        todayStrikes = [updatedCount,'count',updatedCount,Now]
+        todayStrikes = Running([updatedCount,'count',updatedCount,Now])
 
     # If console is initialising, download all data for current month using
     # Weatherflow API and calculate total monthly lightning strikes
-    if strikeCount['Month'][0] == '-' or flagAPI:
+    if strikeCount is None or flagAPI:
 
         # Download lightning strike data from the current month
         Data = requestAPI.weatherflow.Month(Device,Config)
@@ -542,30 +824,29 @@ def StrikeCount(Count,strikeCount,Device,Config,flagAPI):
                 Strikes = [item[4] for item in Data if item[4] != None]
             elif Config['Station']['TempestID']:
                 Strikes = [item[15] for item in Data if item[15] != None]
-            monthStrikes = [sum(x for x in Strikes),'count',sum(x for x in Strikes),Now]
+            monthStrikes = Running([sum(x for x in Strikes),'count',sum(x for x in Strikes),Now])
         else:
-            monthStrikes = [NaN,'count',NaN,Now]
+            monthStrikes = Running([NaN,'count',NaN,Now])
 
         # Adjust monthly lightning strike total for strikes that have been
         # recorded today
         if not math.isnan(todayStrikes[0]):
-            monthStrikes[0] += todayStrikes[0]
-            monthStrikes[2] += todayStrikes[2]
+            monthStrikes = Running([monthStrikes.Value + todayStrikes.Value,'count',monthStrikes.Raw + todayStrikes.Raw,Now])
 
     # Else if the end of the month has passed, reset monthly lightning strike
     # count to zero
-    elif Now.month > strikeCount['Month'][3].month:
-        monthStrikes = [Count[0],'count',Count[0],Now]
+    elif Now.month > strikeCount['Month'].Updated.month:
+        monthStrikes = Running([Count[0],'count',Count[0],Now])
 
     # Else, calculate current monthly lightning strike count
     else:
-        currentCount = strikeCount['Month'][2]
+        currentCount = strikeCount['Month'].Raw
         updatedCount = currentCount + Count[0] if not math.isnan(Count[0]) else currentCount
-        monthStrikes = [updatedCount,'count',updatedCount,Now]
+        monthStrikes = Running([updatedCount,'count',updatedCount,Now])
 
     # If console is initialising, download all data for current year using
     # Weatherflow API and calculate total yearly lightning strikes
-    if strikeCount['Year'][0] == '-' or flagAPI:
+    if strikeCount is None or flagAPI:
 
         # Download lightning strike data from the current year
         Data = requestAPI.weatherflow.Year(Device,Config)
@@ -582,27 +863,26 @@ def StrikeCount(Count,strikeCount,Device,Config,flagAPI):
                     Strikes = [item[24] for item in Data if item[24] != None]
                 else:
                     Strikes = [item[15] for item in Data if item[15] != None]
-            yearStrikes = [sum(x for x in Strikes),'count',sum(x for x in Strikes),Now]
+            yearStrikes = Running([sum(x for x in Strikes),'count',sum(x for x in Strikes),Now])
         else:
-            yearStrikes = [NaN,'count',NaN,Now]
+            yearStrikes = Running([NaN,'count',NaN,Now])
 
         # Adjust yearly lightning strike total for strikes that have been
         # recorded today
         if not math.isnan(todayStrikes[0]):
-            yearStrikes[0] += todayStrikes[0]
-            yearStrikes[2] += todayStrikes[2]
+            yearStrikes = Running([yearStrikes.Value + todayStrikes.Value,'count',yearStrikes.Raw + todayStrikes.Raw,Now])
 
     # Else if the end of the year has passed, reset monthly and yearly lightning
     # strike count to zero
-    elif Now.year > strikeCount['Year'][3].year:
-        monthStrikes = [Count[0],'count',Count[0],Now]
-        yearStrikes  = [Count[0],'count',Count[0],Now]
+    elif Now.year > strikeCount['Year'].Updated.year:
+        monthStrikes = Running([Count[0],'count',Count[0],Now])
+        yearStrikes  = Running([Count[0],'count',Count[0],Now])
 
     # Else, calculate current yearly lightning strike count
     else:
-        currentCount = strikeCount['Year'][2]
+        currentCount = strikeCount['Year'].Raw
         updatedCount = currentCount + Count[0] if not math.isnan(Count[0]) else currentCount
-        yearStrikes = [updatedCount,'count',updatedCount,Now]
+        yearStrikes = Running([updatedCount,'count',updatedCount,Now])
 
     # Return Daily, Monthly, and Yearly lightning strike counts
     return {'Today':todayStrikes, 'Month':monthStrikes, 'Year':yearStrikes}
@@ -621,41 +901,23 @@ def RainRate(rainAccum):
     # Calculate instantaneous rain rate from instantaneous rain accumulation
     Rate = rainAccum[0]*60
 
-    # Define rain rate text based on calculated
-    if math.isnan(Rate):
-        RateText = '-'
-    elif Rate == 0:
-        RateText = 'Currently Dry'
-    elif Rate < 0.25:
-        RateText = 'Very Light Rain'
-    elif Rate < 1.0:
-        RateText = 'Light Rain'
-    elif Rate < 4.0:
-        RateText = 'Moderate Rain'
-    elif Rate < 16.0:
-        RateText = 'Heavy Rain'
-    elif Rate < 50.0:
-        RateText = 'Very Heavy Rain'
+    # Define rain rate text based on calculated rain rate
+    if Rate == 0:
+        RateText = rainRateText[0]
     else:
-        RateText = 'Extreme Rain'
+        RateText = rainRateText[rainRateTable.index(Rate) + 1 if not math.isnan(Rate) else rainRateTable.Missing]
 
     # Return instantaneous rain rate and text
     return [Rate,'mm/hr',RateText,Rate]
 
-def RainAccumulation(dailyRain,rainAccum,Device,Config,flagAPI):
+def RainAccumulation(dailyRain,Device,Config):
 
     """ Calculate the rain accumulation for today/yesterday/month/year
 
     INPUTS:
         dailyRain           Daily rain accumulation                         [mm]
-        rainAccum           Dictionary containing fields:
-            Today               Rain accumulation for the current day       [mm]
-            Yesterday           Rain accumulation yesterday                 [mm]
-            Month               Rain accumulation for the current month     [mm]
-            Year                Rain accumulation for the current year      [mm]
         Device              Device ID
         Config              Station configuration
-        flagAPI             Flag for required API calls
 
     OUTPUT:
         rainAccum           Dictionary containing fields:
@@ -665,141 +927,9 @@ def RainAccumulation(dailyRain,rainAccum,Device,Config,flagAPI):
             Year                Rain accumulation for the current year      [mm]
     """
 
-    # Define current time in station timezone
-    Tz = pytz.timezone(Config['Station']['Timezone'])
-    Now = datetime.now(pytz.utc).astimezone(Tz)
-
-    # Set current daily rainfall accumulation
-    TodayRain = [dailyRain[0],'mm',dailyRain[0],Now]
-
-    # If console is initialising, download all data for yesterday using
-    # Weatherflow API and calculate total daily rainfall
-    if rainAccum['Yesterday'][0] == '-' or flagAPI:
-
-        # Download rainfall data for yesterday
-        Data = requestAPI.weatherflow.Yesterday(Device,Config)
-
-        # Calculate yesterday rainfall total. Return NaN if API call has
-        # failed
-        if requestAPI.weatherflow.verifyResponse(Data,'obs'):
-            Data = Data.json()['obs']
-            if Config['Station']['SkyID']:
-                Rain = [item[3] for item in Data if item[3] != None]
-            elif Config['Station']['TempestID']:
-                Rain = [item[12] for item in Data if item[12] != None]
-            YesterdayRain = [sum(x for x in Rain),'mm',sum(x for x in Rain),Now]
-        else:
-            YesterdayRain = [NaN,'mm',NaN,Now]
-
-    # Else if midnight has passed, set yesterday rainfall accumulation equal to
-    # rainAccum['Today'] (which still contains yesterday's accumulation)
-    elif Now.date() > rainAccum['Today'][3].date():
-        YesterdayRain = [rainAccum['Today'][2],'mm',rainAccum['Today'][2],Now]
-
-    # Else, set yesterday rainfall accumulation as unchanged
-    else:
-        YesterdayRain = [rainAccum['Yesterday'][2],'mm',rainAccum['Yesterday'][2],Now]
-
-    # If console is initialising and today is the first day on the month, set
-    # monthly rainfall to current daily rainfall
-    if rainAccum['Month'][0] == '-' and Now.day == 1:
-        MonthRain = [dailyRain[0],'mm',0,Now]
-
-    # If console is initialising, download all data for current month using
-    # Weatherflow API and calculate total monthly rainfall
-    elif rainAccum['Month'][0] == '-' or flagAPI:
-
-        # Download rainfall data for last Month
-        Data = requestAPI.weatherflow.Month(Device,Config)
-
-        # Calculate monthly rainfall total. Return NaN if API call has
-        # failed
-        if requestAPI.weatherflow.verifyResponse(Data,'obs'):
-            Data = Data.json()['obs']
-            if Config['Station']['SkyID']:
-                Rain = [item[3] for item in Data if item[3] != None]
-            elif Config['Station']['TempestID']:
-                Rain = [item[12] for item in Data if item[12] != None]
-            MonthRain = [sum(x for x in Rain),'mm',sum(x for x in Rain),Now]
-        else:
-            MonthRain = [NaN,'mm',NaN,Now]
-
-        # Adjust monthly rainfall total for rain that has fallen today
-        if not math.isnan(TodayRain[0]):
-            MonthRain[0] += dailyRain[0]
-
-    # Else if the end of the month has passed, reset monthly rain accumulation
-    # to current daily rain accumulation
-    elif Now.month > rainAccum['Month'][3].month:
-        dailyAccum = dailyRain[0] if not math.isnan(dailyRain[0]) else 0
-        MonthRain  = [dailyAccum,'mm',0,Now]
-
-    # Else if midnight has passed, permanently add rainAccum['Today'] (which
-    # still contains yesterday's accumulation) and current daily rainfall to
-    # monthly rain accumulation
-    elif Now.date() > rainAccum['Month'][3].date():
-        dailyAccum = dailyRain[0] if not math.isnan(dailyRain[0]) else 0
-        MonthRain  = [rainAccum['Month'][2] + rainAccum['Today'][2] + dailyAccum,'mm',rainAccum['Month'][2] + rainAccum['Today'][2],Now]
-
-    # Else, update current monthly rainfall accumulation
-    else:
-        dailyAccum = dailyRain[0] if not math.isnan(dailyRain[0]) else 0
-        MonthRain  = [rainAccum['Month'][2] + dailyAccum,'mm',rainAccum['Month'][2],Now]
-
-    # If console is initialising and today is the first day on the year, set
-    # yearly rainfall to current daily rainfall
-    if rainAccum['Year'][0] == '-' and Now.timetuple().tm_yday == 1:
-        YearRain = [dailyRain[0],'mm',0,Now]
-
-    # If console is initialising and today is during the first month of the
-    # year, set yearly rainfall to current monthly rainfall
-    elif rainAccum['Year'][0] == '-' and Now.timetuple().tm_mon == 1:
-        YearRain = MonthRain
-
-    # If console is initialising, download all data for current year using
-    # Weatherflow API and calculate total yearly rainfall
-    elif rainAccum['Year'][0] == '-' or flagAPI:
-        print(Now.timetuple())
-        # Download rainfall data for last Month
-        Data = requestAPI.weatherflow.Year(Device,Config)
-
-        # Calculate yearly rainfall total. Return NaN if API call has failed
-        if requestAPI.weatherflow.verifyResponse(Data,'obs'):
-            Data = Data.json()['obs']
-            print(Data)
-            if Config['Station']['SkyID']:
-                Rain = [item[3] for item in Data if item[3] != None]
-            elif Config['Station']['TempestID']:
-                Rain = [item[28] for item in Data if item[28] != None]
-            YearRain = [sum(x for x in Rain),'mm',sum(x for x in Rain),Now]
-        else:
-            YearRain = [NaN,'mm',NaN,Now]
-
-        # Adjust yearly rainfall total for rain that has fallen today
-        if not math.isnan(dailyRain[0]):
-            YearRain[0] += dailyRain[0]
-
-    # Else if the end of the year has passed, reset monthly and yearly rain
-    # accumulation to current daily rain accumulation
-    elif Now.year > rainAccum['Year'][3].year:
-        dailyAccum = dailyRain[0] if not math.isnan(dailyRain[0]) else 0
-        YearRain   = [dailyAccum,'mm',0,Now]
-        MonthRain  = [dailyAccum,'mm',0,Now]
-
-    # Else if midnight has passed, permanently add rainAccum['Today'] (which
-    # still contains yesterday's accumulation) and current daily rainfall to
-    # yearly rain accumulation
-    elif Now.date() > rainAccum['Year'][3].date():
-        dailyAccum = dailyRain[0] if not math.isnan(dailyRain[0]) else 0
-        YearRain  = [rainAccum['Year'][2] + rainAccum['Today'][2] + dailyAccum,'mm',rainAccum['Year'][2] + rainAccum['Today'][2],Now]
-
-    # Else, calculate current yearly rain accumulation
-    else:
-        dailyAccum = dailyRain[0] if not math.isnan(dailyRain[0]) else 0
-        YearRain   = [rainAccum['Year'][2] + dailyAccum,'mm',rainAccum['Year'][2],Now]
-
-    # Return Daily, Monthly, and Yearly rainfall accumulation totals
-    return {'Today':TodayRain, 'Yesterday':YesterdayRain, 'Month':MonthRain, 'Year':YearRain}
+    # Update rainfall ledger with current daily rainfall accumulation and
+    # return daily, monthly, and yearly rainfall accumulation totals
+    return rainLedger.get(Device,Config).update(dailyRain)
 
 def MeanWindSpeed(windSpd,avgWind,Device,Config,flagAPI):
 
@@ -822,7 +952,7 @@ def MeanWindSpeed(windSpd,avgWind,Device,Config,flagAPI):
 
     # If console is initialising, download all data for current day using
     # Weatherflow API and calculate daily averaged windspeed
-    if avgWind[0] == '-' or flagAPI:
+    if avgWind is None or flagAPI:
 
         # Download windspeed data for current day
         Data = requestAPI.weatherflow.Today(Device,Config)
@@ -836,23 +966,23 @@ def MeanWindSpeed(windSpd,avgWind,Device,Config,flagAPI):
                 windSpd = [item[2] for item in Data if item[2] != None]
             Sum = sum(x for x in windSpd)
             Length = len(windSpd)
-            AvgWind = [Sum/Length,'mps',Sum/Length,Length,Now]
+            AvgWind = Average([Sum/Length,'mps',Sum/Length,Length,Now])
         else:
-            AvgWind = [NaN,'mps',NaN,NaN,Now]
+            AvgWind = Average([NaN,'mps',NaN,NaN,Now])
 
     # Else if midnight has passed, reset daily averaged wind speed
-    elif Now.date() > avgWind[4].date():
-        AvgWind = [windSpd[0],'mps',windSpd[0],1,Now]
+    elif Now.date() > avgWind.Updated.date():
+        AvgWind = Average([windSpd[0],'mps',windSpd[0],1,Now])
 
     # Else, calculate current daily averaged wind speed
     else:
-        Length = avgWind[3] + 1
-        currentAvg = avgWind[2]
+        Length = avgWind.Samples + 1
+        currentAvg = avgWind.Raw
         if not math.isnan(windSpd[0]):
             updatedAvg = (Length-1)/Length * currentAvg + 1/Length * windSpd[0]
-            AvgWind = [updatedAvg,'mps',updatedAvg,Length,Now]
+            AvgWind = Average([updatedAvg,'mps',updatedAvg,Length,Now])
         else:
-            AvgWind = [currentAvg,'mps',currentAvg,Length-1,Now]
+            AvgWind = Average([currentAvg,'mps',currentAvg,Length-1,Now])
 
     # Return daily averaged wind speed
     return AvgWind
@@ -878,7 +1008,7 @@ def MaxWindGust(windGust,maxGust,Device,Config,flagAPI):
 
     # If console is initialising, download all data for current day using
     # Weatherflow API and calculate daily maximum wind gust
-    if maxGust == '--' or flagAPI:
+    if maxGust is None or flagAPI:
 
         # Download windspeed data for current day
         Data = requestAPI.weatherflow.Today(Device,Config)
@@ -890,22 +1020,22 @@ def MaxWindGust(windGust,maxGust,Device,Config,flagAPI):
                 windGust = [item[6] for item in Data if item[6] != None]
             elif Config['Station']['TempestID']:
                 windGust = [item[3] for item in Data if item[3] != None]
-            maxGust  = [max(x for x in windGust),'mps',max(x for x in windGust),Now]
+            maxGust  = Running([max(x for x in windGust),'mps',max(x for x in windGust),Now])
         else:
-            maxGust = [NaN,'mps',NaN,Now]
+            maxGust = Running([NaN,'mps',NaN,Now])
 
     # Else if midnight has passed, reset maximum recorded wind gust
-    elif Now.date() > maxGust[3].date():
-        maxGust = [windGust[0],'mps',windGust[0],Now]
+    elif Now.date() > maxGust.Updated.date():
+        maxGust = Running([windGust[0],'mps',windGust[0],Now])
 
     # Else if current gust speed is greater than maximum recorded gust speed,
     # update maximum gust speed
-    elif windGust[0] > maxGust[2]:
-        maxGust = [windGust[0],'mps',windGust[0],Now]
+    elif windGust[0] > maxGust.Raw:
+        maxGust = Running([windGust[0],'mps',windGust[0],Now])
 
     # Else maximum gust speed is unchanged, return existing value
     else:
-        maxGust = [maxGust[2],'mps',maxGust[2],Now]
+        maxGust = Running([maxGust.Raw,'mps',maxGust.Raw,Now])
 
     # Return maximum wind gust
     return maxGust
@@ -923,12 +1053,6 @@ def CardinalWindDirection(windDir,windSpd=[1,'mps']):
         cardinalWind        Cardinal wind direction
     """
 
-    # Define all possible cardinal wind directions and descriptions
-    Direction = ['N','NNE','NE','ENE','E','ESE','SE','SSE','S','SSW','SW','WSW','W','WNW','NW','NNW','N']
-    Description = ['Due North','North NE','North East','East NE','Due East','East SE','South East','South SE',
-                   'Due South','South SW','South West','West SW','Due West','West NW','North West','North NW',
-                   'Due North']
-
     # Define actual cardinal wind direction and description based on current
     # wind direction in degrees
     if windSpd[0] == 0:
@@ -939,9 +1063,7 @@ def CardinalWindDirection(windDir,windSpd=[1,'mps']):
         cardinalWind = [windDir[0],windDir[1],'-','-']
     else:
         Ind = int(round(windDir[0]/22.5))
-        Direction = Direction[Ind]
-        Description = Description[Ind].split()[0] + ' [color=9aba2fff]' + Description[Ind].split()[1] + '[/color]'
-        cardinalWind = [windDir[0],windDir[1],Direction,Description]
+        cardinalWind = [windDir[0],windDir[1],cardinalDirection[Ind],cardinalDescription[Ind]]
 
     # Return cardinal wind direction and description
     return cardinalWind
@@ -957,20 +1079,12 @@ def BeaufortScale(windSpd):
         beaufortScale       Beaufort Scale speed, description, and icon
     """
 
-    # Define Beaufort scale cutoffs and Force numbers
-    Cutoffs = [0.5,1.5,3.3,5.5,7.9,10.7,13.8,17.1,20.7,24.4,28.4,32.6]
-    Force = [0,1,2,3,4,5,6,7,8,9,10,11,12]
-    Description = ['Calm Conditions', 'Light Air' ,        'Light Breeze',  'Gentle Breeze',
-                   'Moderate Breeze', 'Fresh Breeze',      'Strong Breeze', 'Near Gale Force',
-                   'Gale Force',      'Severe Gale Force', 'Storm Force',   'Violent Storm',
-                   'Hurricane Force']
-
     # Define Beaufort Scale wind speed, description, and icon
     if math.isnan(windSpd[0]):
         Beaufort = ['-','-','-']
     else:
-        Ind = bisect.bisect(Cutoffs,windSpd[0])
-        Beaufort = [float(Force[Ind]),str(Force[Ind]),Description[Ind]]
+        Ind = beaufortTable.index(windSpd[0])
+        Beaufort = [beaufortForce[Ind],str(Ind),beaufortDescription[Ind]]
 
     # Return Beaufort Scale speed, description, and icon
     beaufortScale = windSpd + Beaufort
@@ -987,43 +1101,58 @@ def UVIndex(uvLevel):
         uvIndex             UV index
     """
 
-    # Define UV Index cutoffs and level descriptions
-    Cutoffs = [0,3,6,8,11]
-    Level   = ['None','Low','Moderate','High','Very High','Extreme']
-
-    # Define UV index colours
-    Grey   = '#646464'
-    Green  = '#558B2F'
-    Yellow = '#F9A825'
-    Orange = '#EF6C00'
-    Red    = '#B71C1C'
-    Violet = '#6A1B9A'
-    Color  = [Grey,Green,Yellow,Orange,Red,Violet]
-
     # Set the UV index
     if math.isnan(uvLevel[0]):
-        uvIndex = [uvLevel[0],'index','-',Grey]
+        uvIndex = [uvLevel[0],'index','-',uvColor[0]]
     else:
         if uvLevel[0] > 0:
-            Ind = bisect.bisect(Cutoffs,round(uvLevel[0],1))
+            Ind = uvTable.index(round(uvLevel[0],1))
         else:
             Ind = 0
-        uvIndex = [round(uvLevel[0],1),'index',Level[Ind],Color[Ind]]
+        uvIndex = [round(uvLevel[0],1),'index',uvText[Ind],uvColor[Ind]]
 
     # Return UV Index icon
     return uvIndex
 
-def peakSunHours(Radiation,peakSun,Astro,Device,Config,flagAPI):
+def clearSkyIndex(Time,Radiation,Config):
+
+    """ Calculates the measured solar radiation as a percentage of the expected
+    clear-sky solar radiation, and estimates the cloudiness from this
+    percentage. The percentage is not defined when the sun is too low for the
+    clear-sky radiation to be meaningful
+
+    INPUTS:
+        Time                Current observation time                           [s]
+        Radiation           Current solar radiation                        [W/m^2]
+        Config              Station configuration
+
+    OUTPUT:
+        clearSky            Percent of clear-sky solar radiation and cloudiness
+    """
+
+    # Calculate expected clear-sky solar radiation at the observation time
+    Expected = clearSky.expected(Time[0],Config['Station']['Latitude'],Config['Station']['Longitude'])
+
+    # Calculate percent of clear-sky solar radiation and cloudiness
+    if math.isnan(Radiation[0]) or not Expected >= clearSky.minRadiation:
+        clearSkyIndex = [NaN,'%','-']
+    else:
+        Percent = 100*Radiation[0]/Expected
+        clearSkyIndex = [Percent,'%',cloudText[cloudTable.index(Percent)]]
+
+    # Return percent of clear-sky solar radiation
+    return clearSkyIndex
+
+def peakSunHours(Time,Radiation,Astro,Device,Config):
 
     """ Calculate peak sun hours since midnight and daily solar potential
 
     INPUTS:
+        Time                Current observation time                           [s]
         Radiation           Current solar radiation                        [W/m^2]
-        maxGust             Current peak sun hours since midnight          [hours]
         Astro               Dictionary containing sunrise/sunset info
         Device              Device ID
         Config              Station configuration
-        flagAPI             Flag for required API calls
 
     OUTPUT:
         peakSun             Peak sun hours since midnight and solar potential
@@ -1033,34 +1162,9 @@ def peakSunHours(Radiation,peakSun,Astro,Device,Config,flagAPI):
     Tz = pytz.timezone(Config['Station']['Timezone'])
     Now = datetime.now(pytz.utc).astimezone(Tz)
 
-    # If console is initialising, download all data for current day using
-    # Weatherflow API and calculate Peak Sun Hours
-    if peakSun[0] == '-' or flagAPI:
-
-        # Download solar radiation data for current day
-        Data = requestAPI.weatherflow.Today(Device,Config)
-
-        # Calculate Peak Sun Hours. Return NaN if API call has failed
-        if requestAPI.weatherflow.verifyResponse(Data,'obs'):
-            Data = Data.json()['obs']
-            if Config['Station']['SkyID']:
-                Radiation = [item[10] for item in Data if item[10] != None]
-            elif Config['Station']['TempestID']:
-                Radiation = [item[11] for item in Data if item[11] != None]
-            watthrs = sum([item*1/60 for item in Radiation])
-            peakSun = [watthrs/1000,'hrs',watthrs,Now]
-        else:
-            peakSun = [NaN,'hrs',NaN,Now]
-
-    # Else if midnight has passed, reset Peak Sun Hours
-    elif Now.date() > peakSun[3].date():
-        watthrs = Radiation[0] * 1/60
-        peakSun = [watthrs/1000,'hrs',watthrs,Now]
-
-    # Else calculate current Peak Sun Hours
-    else:
-        watthrs = peakSun[2] + Radiation[0]*1/60 if not math.isnan(Radiation[0]) else peakSun[2]
-        peakSun = [watthrs/1000,'hrs',watthrs,Now]
+    # Integrate solar radiation since midnight and calculate Peak Sun Hours
+    watthrs = solarIntegrator.get(Device,Config).add(Time,Radiation)
+    peakSun = [watthrs/1000,'hrs',watthrs,Now]
 
     # Calculate proportion of daylight hours that have passed
     daylightTotal  = (Astro['Sunset'][0] - Astro['Sunrise'][0]).total_seconds()
@@ -1073,7 +1177,7 @@ def peakSunHours(Radiation,peakSun,Astro,Device,Config,flagAPI):
     # Define daily solar potential
     if math.isnan(peakSun[0]):
         peakSun.append('-')
-    if peakSun[0]/daylightFactor == 0:
+    elif peakSun[0]/daylightFactor == 0:
         peakSun.append('[color=#646464ff]None[/color]')
     elif peakSun[0]/daylightFactor < 2:
         peakSun.append('[color=#4575b4ff]Limited[/color]')
@@ -1085,4 +1189,4 @@ def peakSunHours(Radiation,peakSun,Astro,Device,Config,flagAPI):
         peakSun.append('[color=#d73027ff]Excellent[/color]')
 
     # Return Peak Sun Hours
-    return peakSun
+    return Solar(peakSun)
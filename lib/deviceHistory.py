@@ -0,0 +1,191 @@
+""" Maintains the per-device observation history buffers required by the
+Raspberry Pi Python console for WeatherFlow Tempest and Smart Home Weather
+stations.
+Copyright (C) 2018-2021 Peter Davis
+
+This program is free software: you can redistribute it and/or modify it under
+the terms of the GNU General Public License as published by the Free Software
+Foundation, either version 3 of the License, or (at your option) any later
+version.
+
+This program is distributed in the hope that it will be useful, but WITHOUT
+ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with
+this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+# Import required Python modules
+import numpy as np
+import threading
+import bisect
+
+# Define global variables. Observations are retained for the six hour window
+# read by the Sager Weathercaster forecast plus a margin
+NaN        = float('NaN')
+Retention  = 6*3600 + 1800
+MaxGap     = 180
+Enabled    = False
+Buffers    = {}
+bufferLock = threading.Lock()
+
+def enable():
+
+    """ Enables the observation history buffers. Observations are only
+    buffered once a consumer of the history, such as the Sager Weathercaster
+    forecast, has been started
+    """
+
+    global Enabled
+    Enabled = True
+
+def record(Device,Row):
+
+    """ Adds a single observation to the history buffer for the specified
+    device if the history buffers are enabled
+
+    INPUTS:
+        Device              Device ID
+        Row                 Device observation with the time at index 0
+    """
+
+    if Enabled:
+        get(Device).add(Row)
+
+def get(Device):
+
+    """ Returns the observation history buffer for the specified device,
+    creating it the first time it is requested
+
+    INPUTS:
+        Device              Device ID
+
+    OUTPUT:
+        Buffer              Observation history buffer for the specified device
+    """
+
+    with bufferLock:
+        if str(Device) not in Buffers:
+            Buffers[str(Device)] = Buffer()
+        return Buffers[str(Device)]
+
+class Buffer(object):
+
+    """ Time ordered history of the raw observations received from a device.
+    Each observation is stored in the same positional layout as the device
+    observations returned by the Websocket and the WeatherFlow API, with the
+    observation time at index 0. Observations older than the retention period
+    are discarded
+
+    INPUTS:
+        Retention           Retention period of the history buffer        [s]
+    """
+
+    def __init__(self,Retention=Retention):
+        self.Retention = Retention
+        self.Lock      = threading.Lock()
+        self.Time      = []
+        self.Rows      = []
+
+    def add(self,Row):
+
+        """ Adds a single observation to the history buffer, replacing any
+        stored observation with the same time
+
+        INPUTS:
+            Row             Device observation with the time at index 0
+        """
+
+        Row = [NaN if Value is None else Value for Value in Row]
+        with self.Lock:
+            self.insert(Row)
+            self.trim()
+
+    def extend(self,Rows):
+
+        """ Adds a list of observations to the history buffer, for example to
+        fill a gap with observations downloaded from the WeatherFlow API
+
+        INPUTS:
+            Rows            List of device observations
+        """
+
+        with self.Lock:
+            for Row in Rows:
+                if Row and Row[0] is not None:
+                    self.insert([NaN if Value is None else Value for Value in Row])
+            self.trim()
+
+    def insert(self,Row):
+
+        """ Inserts an observation in time order. Must be called with the buffer
+        lock held
+        """
+
+        Index = bisect.bisect_left(self.Time,Row[0])
+        if Index < len(self.Time) and self.Time[Index] == Row[0]:
+            self.Rows[Index] = Row
+        else:
+            self.Time.insert(Index,Row[0])
+            self.Rows.insert(Index,Row)
+
+    def trim(self):
+
+        """ Discards observations older than the retention period relative to
+        the latest observation. Must be called with the buffer lock held
+        """
+
+        if self.Time:
+            Index = bisect.bisect_left(self.Time,self.Time[-1] - self.Retention)
+            if Index:
+                del self.Time[:Index]
+                del self.Rows[:Index]
+
+    def gap(self,Start,End,maxGap=MaxGap):
+
+        """ Returns the span of the time window that is not covered by the
+        history buffer, or None if the window is fully covered
+
+        INPUTS:
+            Start           Start of time window                          [s]
+            End             End of time window                            [s]
+            maxGap          Longest interval between observations that is
+                            not treated as a gap                          [s]
+
+        OUTPUT:
+            Gap             (Start,End) of the span containing every gap in
+                            the time window, or None
+        """
+
+        with self.Lock:
+            First = bisect.bisect_left(self.Time,Start)
+            Last  = bisect.bisect_right(self.Time,End)
+            Times = np.array([Start] + self.Time[First:Last] + [End],dtype=np.float64)
+        Gaps = np.flatnonzero(np.diff(Times) > maxGap)
+        if Gaps.size == 0:
+            return None
+        return Times[Gaps[0]], Times[Gaps[-1] + 1]
+
+    def window(self,Start,End):
+
+        """ Returns the observations in the time window as a two dimensional
+        array. Observations of different lengths are padded with NaN
+
+        INPUTS:
+            Start           Start of time window                          [s]
+            End             End of time window                            [s]
+
+        OUTPUT:
+            Obs             Array of observations, one row per observation
+        """
+
+        with self.Lock:
+            First = bisect.bisect_left(self.Time,Start)
+            Last  = bisect.bisect_right(self.Time,End)
+            Rows  = self.Rows[First:Last]
+        Width = max((len(Row) for Row in Rows),default=1)
+        Obs   = np.full((len(Rows),Width),NaN)
+        for ii,Row in enumerate(Rows):
+            Obs[ii,:len(Row)] = Row
+        return Obs
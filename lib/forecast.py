@@ -19,6 +19,7 @@ this program. If not, see <http://www.gnu.org/licenses/>.
 from lib        import observationFormat  as observation
 from lib        import derivedVariables   as derive
 from lib        import requestAPI
+from lib        import profiler
 
 # Import required modules
 from datetime   import datetime, date, timedelta, time
@@ -26,11 +27,95 @@ from functools  import partial
 from kivy.app   import App
 from kivy.clock import Clock
 import time     as UNIX
+import numpy    as np
 import calendar
+import hashlib
+import random
 import bisect
 import pytz
 import math
 
+# Define global variables
+rolloverEvent = None
+maxJitter     = 600
+retryDelay    = 300
+maxRetryDelay = 3600
+fetchState    = {'ETag': None, 'Modified': None, 'Hash': None, 'Failures': 0}
+
+# Define hourly and daily forecast fields extracted into the forecast model.
+# Optional hourly fields are missing from the forecast when no precipitation is
+# expected
+hourlyFields   = ('time','local_day','air_temperature','wind_avg','wind_gust',
+                  'wind_direction','icon','conditions')
+optionalFields = ('precip_type','precip_probability','precip')
+dailyFields    = ('day_num','month_num','air_temp_high','air_temp_low',
+                  'precip_probability','icon','sunrise')
+
+class forecastModel(object):
+
+    """ Columnar WeatherFlow BetterForecast model parsed once per download.
+    Hourly and daily forecasts are stored as one tuple per field, indexed by
+    the sorted hourly 'valid from' times and by the daily day number, together
+    with the index of the hour at which the expected conditions next change
+
+    INPUTS:
+        Forecast            WeatherFlow BetterForecast JSON object
+    """
+
+    __slots__ = ('Source','Hours','Hourly','Daily','dayIndex','conditionEnd')
+
+    def __init__(self,Forecast):
+
+        # Extract hourly and daily forecast fields into columns
+        hourlyForecasts = Forecast['forecast']['hourly']
+        dailyForecasts  = Forecast['forecast']['daily']
+        self.Source = Forecast
+        self.Hourly = {Field: tuple(Hour[Field] for Hour in hourlyForecasts) for Field in hourlyFields}
+        self.Hourly.update({Field: tuple(Hour.get(Field) for Hour in hourlyForecasts) for Field in optionalFields})
+        self.Daily  = {Field: tuple(Day[Field] for Day in dailyForecasts) for Field in dailyFields}
+        self.Hours  = self.Hourly['time']
+
+        # Index daily forecasts by day number, keeping the first forecast for
+        # each day
+        self.dayIndex = {}
+        for ii,Day in enumerate(self.Daily['day_num']):
+            self.dayIndex.setdefault(Day,ii)
+
+        # Find the index of the next hour at which the expected conditions
+        # change, or the index of the final hour if they do not change
+        Conditions = self.Hourly['conditions']
+        End = list(range(len(Conditions)))
+        for ii in range(len(Conditions)-2,-1,-1):
+            End[ii] = ii+1 if Conditions[ii+1] != Conditions[ii] else End[ii+1]
+        self.conditionEnd = tuple(End)
+
+    def hourIndex(self,Time):
+
+        """ Returns the index of the hourly forecast that is valid at the
+        specified time
+
+        INPUTS:
+            Time            UNIX timestamp                                    [s]
+        """
+
+        return bisect.bisect(self.Hours,Time)
+
+def getModel(metData):
+
+    """ Returns the forecast model for the cached WeatherFlow BetterForecast
+    JSON object, parsing it only when a new forecast has been downloaded
+
+    INPUTS:
+        metData             Dictionary holding weather forecast data
+    """
+
+    Model = metData.get('Model')
+    if Model is None or Model.Source is not metData['Dict']:
+        Model = forecastModel(metData['Dict'])
+        metData['Model'] = Model
+    return Model
+
+@profiler.timed
 def Download(metData,Config,dt):
 
     """ Download the latest daily and hourly weather forecast data using the
@@ -51,6 +136,80 @@ def Download(metData,Config,dt):
     Midnight   = int(Tz.localize(datetime(funcCalled.year,funcCalled.month,funcCalled.day)).timestamp())
     funcError  = 0
 
+    # Download latest forecast data. The request is conditional on the
+    # validators of the previously downloaded forecast
+    Data = requestAPI.weatherflow.Forecast(Config,fetchState['ETag'],fetchState['Modified'])
+
+    # Verify API response and extract forecast. Skip parsing and extracting the
+    # forecast if the server reports it is unchanged or the downloaded payload
+    # is identical to the cached forecast
+    Unchanged = False
+    if Data is not None and Data.status_code == 304 and metData.get('Dict'):
+        Unchanged = True
+    elif requestAPI.weatherflow.verifyResponse(Data,'forecast'):
+        Hash = hashlib.sha1(Data.content).hexdigest()
+        fetchState['ETag']     = Data.headers.get('ETag')
+        fetchState['Modified'] = Data.headers.get('Last-Modified')
+        if Hash == fetchState['Hash'] and metData.get('Dict'):
+            Unchanged = True
+        else:
+            metData['Dict']    = Data.json()
+            fetchState['Hash'] = Hash
+    else:
+        funcError = 1
+        if not 'Dict' in metData:
+            metData['Dict'] = {}
+
+    # Extract forecast variables from the downloaded forecast
+    if not Unchanged:
+        funcError = Extract(metData,Config,funcCalled) or funcError
+
+    # Schedule new forecast to be downloaded at a random time within the first
+    # minutes of the next hour so that consoles do not all download the
+    # forecast at the same time. If an error was detected, retry with an
+    # exponentially increasing, jittered delay. Note secondsSched refers to
+    # number of seconds since the function was last called.
+    Now = datetime.now(pytz.utc).astimezone(Tz)
+    downloadTime = Tz.localize(datetime.combine(Now.date(),time(Now.hour,0,0))+timedelta(hours=1))
+    if not funcError:
+        fetchState['Failures'] = 0
+        secondsSched = math.ceil((downloadTime-funcCalled).total_seconds() + random.uniform(0,maxJitter))
+    else:
+        Delay = min(retryDelay * 2**fetchState['Failures'],maxRetryDelay)
+        fetchState['Failures'] += 1
+        secondsSched = math.ceil(random.uniform(Delay/2,Delay) + (funcCalled-Now).total_seconds())
+    Clock.schedule_once(partial(Download,metData,Config), secondsSched)
+
+    # Extract daily forecasts if the forecast has changed and return metData
+    # dictionary
+    if not Unchanged:
+        ExtractDaily(App.get_running_app())
+        ExtractHourly(App.get_running_app())
+
+    return metData
+
+def Extract(metData,Config,funcCalled=None):
+
+    """ Extract the current hourly and daily forecast variables from the cached
+    WeatherFlow BetterForecast JSON object, converting them into the units
+    specified in the station configuration. No network request is made, so the
+    forecast can be re-rendered immediately when the units are changed
+
+    INPUTS:
+        metData             Dictionary holding weather forecast data
+        Config              Station configuration
+        funcCalled          Time forecast was downloaded in station timezone
+
+    OUTPUT:
+        funcError           Flag indicating forecast could not be extracted
+    """
+
+    # Get current time in station time zone
+    Tz = pytz.timezone(Config['Station']['Timezone'])
+    if funcCalled is None:
+        funcCalled = metData['Time'] if isinstance(metData.get('Time'),datetime) else datetime.now(pytz.utc).astimezone(Tz)
+    funcError = 0
+
     # Set time format based on user configuration
     if Config['Display']['TimeFormat'] == '12 hr':
         if Config['System']['Hardware'] != 'Other':
@@ -60,82 +219,56 @@ def Download(metData,Config,dt):
     else:
         TimeFormat = '%H:%M'
 
-    # Download latest forecast data
-    Data = requestAPI.weatherflow.Forecast(Config)
-
-    # Verify API response and extract forecast
-    if requestAPI.weatherflow.verifyResponse(Data,'forecast'):
-        metData['Dict'] = Data.json()
-    else:
-        funcError = 1
-        if not 'Dict' in metData:
-            metData['Dict'] = {}
-
     # Extract all forecast data from WeatherFlow JSON object
     try:
-        # Extract all hourly and daily forecasts
-        hourlyForecasts  = (metData['Dict']['forecast']['hourly'])
-        dailyForecasts   = (metData['Dict']['forecast']['daily'])
-
-        # Extract 'valid from' time of all available hourly forecasts and
-        # retrieve forecast for the current hour
-        Hours          = list(forecast['time'] for forecast in hourlyForecasts)
-        hoursInd       = bisect.bisect(Hours,int(UNIX.time()))
-        hourlyCurrent  = hourlyForecasts[hoursInd]
-        hourlyLocalDay = hourlyCurrent['local_day']
-
-        # Extract 'Valid' until time of forecast for current hour
-        Valid = Hours[bisect.bisect(Hours,int(UNIX.time()))]
-        Valid = datetime.fromtimestamp(Valid,pytz.utc).astimezone(Tz)
-
-        # Extract 'day_start_local' time of all available daily forecasts and
-        # retrieve forecast for the current day
-        dailyDayNum  = list(forecast['day_num'] for forecast in dailyForecasts)
-        dailyCurrent = dailyForecasts[dailyDayNum.index(hourlyLocalDay)]
+        # Get forecast model for the cached forecast
+        Model = getModel(metData)
+
+        # Retrieve forecast for the current hour and extract 'Valid' until time
+        # of forecast for current hour
+        hoursInd       = Model.hourIndex(int(UNIX.time()))
+        Valid          = Model.Hours[hoursInd]
+        Valid          = datetime.fromtimestamp(Valid,pytz.utc).astimezone(Tz)
+        hourlyLocalDay = Model.Hourly['local_day'][hoursInd]
+
+        # Retrieve forecast for the current day
+        dailyInd = Model.dayIndex[hourlyLocalDay]
 
         # Extract weather variables from current hourly forecast
-        Temp         = [hourlyCurrent['air_temperature'],'c']
-        WindSpd      = [hourlyCurrent['wind_avg'],'mps']
-        WindGust     = [hourlyCurrent['wind_gust'],'mps']
-        WindDir      = [hourlyCurrent['wind_direction'],'degrees']
-        Icon         =  hourlyCurrent['icon'].replace('cc-','')
+        Temp         = [Model.Hourly['air_temperature'][hoursInd],'c']
+        WindSpd      = [Model.Hourly['wind_avg'][hoursInd],'mps']
+        WindGust     = [Model.Hourly['wind_gust'][hoursInd],'mps']
+        WindDir      = [Model.Hourly['wind_direction'][hoursInd],'degrees']
+        Icon         =  Model.Hourly['icon'][hoursInd].replace('cc-','')
 
         # Extract Precipitation Type, Percent, and Amount from current hourly
         # forecast
-        if 'precip_type' in hourlyCurrent:
-            PrecipType   =  hourlyCurrent['precip_type']
-            if PrecipType not in ['rain','snow']:
-                PrecipType = 'rain'
-        else:
+        PrecipType = Model.Hourly['precip_type'][hoursInd]
+        if PrecipType not in ['rain','snow']:
             PrecipType = 'rain'
-        if 'precip_probability' in hourlyCurrent:
-            PrecipPercnt = [hourlyCurrent['precip_probability'],'%']
+        if Model.Hourly['precip_probability'][hoursInd] is not None:
+            PrecipPercnt = [Model.Hourly['precip_probability'][hoursInd],'%']
         else:
             PrecipPercnt = [0,'%']
-        if 'precip' in hourlyCurrent:
-            PrecipAmount = [hourlyCurrent['precip'],'mm']
+        if Model.Hourly['precip'][hoursInd] is not None:
+            PrecipAmount = [Model.Hourly['precip'][hoursInd],'mm']
         else:
             PrecipAmount = [0,'mm']
 
         # Extract weather variables from current daily forecast
-        highTemp  = [dailyCurrent['air_temp_high'],'c']
-        lowTemp   = [dailyCurrent['air_temp_low'],'c']
-        precipDay = [dailyCurrent['precip_probability'],'%']
+        highTemp  = [Model.Daily['air_temp_high'][dailyInd],'c']
+        lowTemp   = [Model.Daily['air_temp_low'][dailyInd],'c']
+        precipDay = [Model.Daily['precip_probability'][dailyInd],'%']
 
-        # Extract list of expected conditions and find time when expected conditions
-        # will change
-        conditionList = list(forecast['conditions'] for forecast in hourlyForecasts[hoursInd:])
-        try:
-            Ind = next(i for i,C in enumerate(conditionList) if C != hourlyCurrent['conditions'])
-        except StopIteration:
-            Ind = len(conditionList)-1
-        Time = datetime.fromtimestamp(Hours[Ind],pytz.utc).astimezone(Tz)
+        # Find time when expected conditions will change
+        Conditions = Model.Hourly['conditions'][hoursInd]
+        Time = datetime.fromtimestamp(Model.Hours[Model.conditionEnd[hoursInd]],pytz.utc).astimezone(Tz)
         if Time.date() == funcCalled.date():
-            Conditions = hourlyCurrent['conditions'].capitalize() + ' until ' + datetime.strftime(Time,TimeFormat) + ' today'
+            Conditions = Conditions.capitalize() + ' until ' + datetime.strftime(Time,TimeFormat) + ' today'
         elif Time.date() == funcCalled.date() + timedelta(days=1):
-            Conditions = hourlyCurrent['conditions'].capitalize() + ' until ' + datetime.strftime(Time,TimeFormat) + ' tomorrow'
+            Conditions = Conditions.capitalize() + ' until ' + datetime.strftime(Time,TimeFormat) + ' tomorrow'
         else:
-            Conditions = hourlyCurrent['conditions'].capitalize() + ' until ' + datetime.strftime(Time,TimeFormat) + ' on ' + Time.strftime('%A')
+            Conditions = Conditions.capitalize() + ' until ' + datetime.strftime(Time,TimeFormat) + ' on ' + Time.strftime('%A')
 
         # Calculate derived variables from forecast
         WindDir = derive.CardinalWindDirection(WindDir,WindSpd)
@@ -180,6 +313,10 @@ def Download(metData,Config,dt):
         # XXX Not included any longer metData['stationOnline'] = metData['Dict']['station']['is_station_online']
         # XXX Not included any longer metData['stationUsed'] = metData['Dict']['station']['includes_tempest']
 
+        # Roll current hour forecast over at the end of the current hour from
+        # the cached forecast model
+        scheduleRollover(metData,Config,Valid)
+
     # Unable to extract forecast data from JSON object. Set set forecast
     # variables to blank and indicate to user that forecast is unavailable
     except (IndexError, KeyError, ValueError):
@@ -203,23 +340,43 @@ def Download(metData,Config,dt):
         # XXX Not included any longer metData['stationOnline'] = False
         # XXX Not included any longer metData['stationUsed'] = False
 
-    # Schedule new forecast to be downloaded at the top of the next hour, or in
-    # 5 minutes if error was detected. Note secondsSched refers to number of
-    # seconds since the function was last called.
-    Now = datetime.now(pytz.utc).astimezone(Tz)
-    downloadTime = Tz.localize(datetime.combine(Now.date(),time(Now.hour,0,0))+timedelta(hours=1))
-    if not funcError:
-        secondsSched = math.ceil((downloadTime-funcCalled).total_seconds())
-    else:
-        secondsSched = 300 + math.ceil((funcCalled-Now).total_seconds())
-    Clock.schedule_once(partial(Download,metData,Config), secondsSched)
+    # Return error flag
+    return funcError
 
-    # Return metData dictionary
+def scheduleRollover(metData,Config,Valid):
 
-    ExtractDaily(App.get_running_app())
+    """ Schedules the current hour forecast to be extracted again from the
+    cached forecast model when it expires, so that it rolls over to the next
+    hour without a new download
 
-    return metData
+    INPUTS:
+        metData             Dictionary holding weather forecast data
+        Config              Station configuration
+        Valid               Time current hour forecast expires
+    """
+
+    global rolloverEvent
+    if rolloverEvent is not None:
+        rolloverEvent.cancel()
+    Delay = (Valid - datetime.now(pytz.utc)).total_seconds()
+    rolloverEvent = Clock.schedule_once(partial(Rollover,metData,Config),max(Delay,0) + 1)
+
+@profiler.timed
+def Rollover(metData,Config,dt):
+
+    """ Rolls the current hour forecast over to the next hour from the cached
+    forecast model
+
+    INPUTS:
+        metData             Dictionary holding weather forecast data
+        Config              Station configuration
+        dt                  Time in seconds since function last called
+    """
 
+    Tz = pytz.timezone(Config['Station']['Timezone'])
+    Extract(metData,Config,datetime.now(pytz.utc).astimezone(Tz))
+
+@profiler.timed
 def ExtractDaily(app):
     metData = app.MetData
     dailyForecast = app.DailyForecast
@@ -239,16 +396,16 @@ def ExtractDaily(app):
     for i in range(len(dailyForecast.panels)):
         d = {}
         try:
-            wfDayDict = metData['Dict']['forecast']['daily'][i]
+            Daily = getModel(metData).Daily
 
             # Extract weather variables from WeatherFlow forecast
-            date    = "%02d/%02d" % (wfDayDict['month_num'], wfDayDict['day_num'])
-            tempMax = [wfDayDict['air_temp_high'], 'c']
-            tempMin = [wfDayDict['air_temp_low'], 'c']
-            precip  = [wfDayDict['precip_probability'], '%']
-            weather =  wfDayDict['icon']
-            dt = datetime.fromtimestamp(wfDayDict['sunrise'], Tz)
-            weekday = calendar.weekday(dt.year, wfDayDict['month_num'], wfDayDict['day_num'])
+            date    = "%02d/%02d" % (Daily['month_num'][i], Daily['day_num'][i])
+            tempMax = [Daily['air_temp_high'][i], 'c']
+            tempMin = [Daily['air_temp_low'][i], 'c']
+            precip  = [Daily['precip_probability'][i], '%']
+            weather =  Daily['icon'][i]
+            dt = datetime.fromtimestamp(Daily['sunrise'][i], Tz)
+            weekday = calendar.weekday(dt.year, Daily['month_num'][i], Daily['day_num'][i])
         except IndexError:
             date    = '0/0'
             tempMax = [ 0, 'c']
@@ -286,3 +443,70 @@ def ExtractDaily(app):
         else:
             dailyForecast.panels[i].weather = '--'
 
+def hourlySeries(metData,Config):
+
+    """ Returns the hourly forecast series displayed on the hourly forecast
+    timeline as arrays, converted into the units specified in the station
+    configuration
+
+    INPUTS:
+        metData             Dictionary holding weather forecast data
+        Config              Station configuration
+
+    OUTPUT:
+        Series              Dictionary holding the hourly forecast series
+    """
+
+    # Get forecast model and current time in station time zone
+    Model = getModel(metData)
+    Tz    = pytz.timezone(Config['Station']['Timezone'])
+
+    # Set hour format based on user configuration
+    if Config['Display']['TimeFormat'] == '12 hr':
+        if Config['System']['Hardware'] != 'Other':
+            HourFormat = '%-I %P'
+        else:
+            HourFormat = '%I %p'
+    else:
+        HourFormat = '%H:%M'
+
+    # Extract hourly forecasts that have not yet expired
+    First = Model.hourIndex(int(UNIX.time()))
+    Time  = np.array(Model.Hours[First:],dtype=np.float64)
+    Local = [datetime.fromtimestamp(Hour,pytz.utc).astimezone(Tz) for Hour in Model.Hours[First:]]
+
+    # Extract temperature, precipitation probability and wind speed series and
+    # convert units as required
+    Temp, TempUnits = observation.unitsArray(np.array(Model.Hourly['air_temperature'][First:],dtype=np.float64),'c',Config['Units']['Temp'])
+    Wind, WindUnits = observation.unitsArray(np.array(Model.Hourly['wind_avg'][First:],dtype=np.float64),'mps',Config['Units']['Wind'])
+    Precip = np.array(Model.Hourly['precip_probability'][First:],dtype=np.float64)
+    Precip = np.where(np.isnan(Precip),0,Precip)
+
+    # Return hourly forecast series
+    return {'Time':      Time,
+            'Temp':      Temp,
+            'TempUnits': observation.Format([0,TempUnits],'forecastTemp')[1],
+            'Precip':    Precip,
+            'Wind':      Wind,
+            'WindUnits': WindUnits.strip(),
+            'Hour':      [Hour.strftime(HourFormat) for Hour in Local],
+            'Day':       [Hour.strftime('%a') if Hour.hour == 0 else '' for Hour in Local]}
+
+@profiler.timed
+def ExtractHourly(app):
+
+    """ Updates the hourly forecast timeline with the hourly forecast series
+    from the cached forecast model. The timeline is only redrawn when this
+    function is called, so scrolling the timeline does not redraw it
+
+    INPUTS:
+        app                 wfpiconsole object
+    """
+
+    if not hasattr(app,'HourlyForecast'):
+        return
+    try:
+        Series = hourlySeries(app.MetData,app.config)
+    except (IndexError, KeyError, ValueError):
+        Series = None
+    app.HourlyForecast.setSeries(Series)
@@ -0,0 +1,93 @@
+""" Defines the measurement value type used to pass observations between the
+Websocket handlers, derived variable functions and display of the Raspberry Pi
+Python console for WeatherFlow Tempest and Smart Home Weather stations.
+Copyright (C) 2018-2021 Peter Davis
+
+This program is free software: you can redistribute it and/or modify it under
+the terms of the GNU General Public License as published by the Free Software
+Foundation, either version 3 of the License, or (at your option) any later
+version.
+
+This program is distributed in the hope that it will be useful, but WITHOUT
+ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with
+this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+class Measurement(object):
+
+    """ Lightweight measurement holding the raw observation in SI units, its
+    unit and the observation timestamp. The measurement supports the
+    positional [value, unit] protocol read by the derived variable functions,
+    so it can be passed to them without copying
+
+    INPUTS:
+        Value               Raw observation value
+        Unit                Raw observation unit
+        Time                Observation timestamp                             [s]
+    """
+
+    __slots__ = ('Value','Unit','Time')
+
+    def __init__(self,Value,Unit,Time=None):
+        self.Value = Value
+        self.Unit  = Unit
+        self.Time  = Time
+
+    def __getitem__(self,Index):
+        return (self.Value,self.Unit)[Index]
+
+    def __len__(self):
+        return 2
+
+    def __iter__(self):
+        yield self.Value
+        yield self.Unit
+
+    def __add__(self,Other):
+        return [self.Value,self.Unit] + list(Other)
+
+    def __repr__(self):
+        return 'Measurement({!r},{!r})'.format(self.Value,self.Unit)
+
+    def key(self):
+
+        """ Returns a hashable key representing the measurement value and unit.
+        NaN values are mapped onto a single marker
+        """
+
+        Value = self.Value
+        return ('NaN' if Value != Value else Value, self.Unit)
+
+def record(Name,Fields,Display=None):
+
+    """ Creates a list type whose positions can also be read as named fields.
+    Derived variables with stored state are returned as records, so that the
+    positional layout formatted for display is unchanged while the stored
+    state read back by the derived variable functions is accessed by name.
+    Fields that are not shown on the console are listed in the Hidden
+    attribute of the record type, and are excluded from its display key
+
+    INPUTS:
+        Name                Name of the record type
+        Fields              List of field names in positional order
+        Display             List of field names shown on the console. All
+                            fields are shown if not specified
+
+    OUTPUT:
+        Record              List type with a read-only property for each field
+    """
+
+    Properties = {Field: property(lambda self,ii=ii: self[ii]) for ii,Field in enumerate(Fields)}
+    Properties['Hidden']    = tuple(ii for ii,Field in enumerate(Fields) if Display is not None and Field not in Display)
+    Properties['__slots__'] = ()
+    return type(Name,(list,),Properties)
+
+# Define record types of the derived variables with stored state
+Extreme = record('Extreme', ['Value','Unit','Clock','Raw','Updated'],         ['Value','Unit','Clock'])
+Running = record('Running', ['Value','Unit','Raw','Updated'],                 ['Value','Unit'])
+Average = record('Average', ['Value','Unit','Raw','Samples','Updated'],       ['Value','Unit'])
+Elapsed = record('Elapsed', ['Value','Unit','Seconds'])
+Solar   = record('Solar',   ['Value','Unit','Raw','Updated','Potential'],     ['Value','Unit','Potential'])
@@ -0,0 +1,226 @@
+""" Decodes the METAR reports required by the Raspberry Pi Python console for
+WeatherFlow Tempest and Smart Home Weather stations.
+Copyright (C) 2018-2021 Peter Davis
+
+This program is free software: you can redistribute it and/or modify it under
+the terms of the GNU General Public License as published by the Free Software
+Foundation, either version 3 of the License, or (at your option) any later
+version.
+
+This program is distributed in the hope that it will be useful, but WITHOUT
+ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with
+this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+# Import required Python modules
+import functools
+import re
+
+# ==============================================================================
+# DEFINE METAR GROUP PATTERNS
+# ==============================================================================
+# Define METAR group patterns. Each report is split into whitespace separated
+# groups, and each group is matched once against the compiled tokenizer
+Groups = [('Type',        r'(?P<ReportType>METAR|SPECI)'),
+          ('Modifier',    r'(?P<ModifierCode>AUTO|COR|NIL)'),
+          ('Time',        r'(?P<Day>\d{2})(?P<Hour>\d{2})(?P<Minute>\d{2})Z'),
+          ('Wind',        r'(?P<WindDir>\d{3}|VRB|///)(?P<WindSpd>P?\d{2,3}|//)(?:G(?P<WindGust>P?\d{2,3}))?(?P<WindUnits>KT|MPS|KMH)'),
+          ('WindVar',     r'(?P<WindFrom>\d{3})V(?P<WindTo>\d{3})'),
+          ('Visibility',  r'(?P<VisCode>CAVOK)|(?P<VisMetres>\d{4})(?:NDV|[NSEW]{1,2})?|(?P<VisMiles>[PM]?(?:\d+_)?\d+(?:/\d+)?)SM'),
+          ('Sky',         r'(?P<SkyCode>CLR|SKC|NSC|NCD)'),
+          ('Cloud',       r'(?P<Cover>FEW|SCT|BKN|OVC|VV)(?P<Height>\d{3}|///)?(?P<CloudType>CB|TCU|///)?'),
+          ('Weather',     r'(?P<Intensity>[-+]|VC)?(?P<Descriptor>MI|PR|BC|DR|BL|SH|TS|FZ)?(?P<Phenomena>(?:DZ|RA|SN|SG|IC|PL|GR|GS|UP|BR|FG|FU|VA|DU|SA|HZ|PY|PO|SQ|FC|SS|DS)*)'),
+          ('Temperature', r'(?P<Temp>M?\d{2})/(?P<DewPoint>M?\d{2})?'),
+          ('Pressure',    r'(?P<PresUnits>[QA])(?P<Pres>\d{4})')]
+Tokenizer = re.compile('|'.join('(?P<{}>{})'.format(Name,Pattern) for Name,Pattern in Groups))
+
+# Define groups that end the body of the report, station identifier pattern,
+# and precipitation phenomena
+endGroups     = {'RMK','TEMPO','BECMG','NOSIG'}
+stationID     = re.compile(r'[A-Z][A-Z0-9]{3}')
+Precipitation = {'DZ','RA','SN','SG','IC','PL','GR','GS','UP'}
+
+# ==============================================================================
+# DEFINE DECODED METAR REPORT
+# ==============================================================================
+class Report(object):
+
+    """ Decoded METAR report. Only the body of the report is decoded; remarks
+    and trend forecasts are ignored
+
+    INPUTS:
+        Raw                 Raw METAR report
+
+    ATTRIBUTES:
+        Type                Report type (METAR or SPECI)
+        Station             ICAO station identifier
+        Time                Observation (day,hour,minute) in UTC
+        WindDir             Wind direction, 'VRB' if variable        [degrees]
+        WindSpd             Wind speed                           [WindUnits]
+        WindGust            Wind gust                            [WindUnits]
+        WindUnits           Wind speed units (KT, MPS or KMH)
+        WindVar             Range of variable wind direction (from,to)
+        Visibility          Prevailing visibility                      [m]
+        Weather             Tuple of weather groups as (Code,Intensity,
+                            Descriptor,Phenomena) tuples
+        Clouds              Tuple of cloud layers as (Cover,Height,Type) tuples
+                            with Height in feet
+        Sky                 Tuple of sky condition codes in report order,
+                            including CAVOK and the cloud cover codes
+        Temp                Temperature                                [C]
+        DewPoint            Dew point                                  [C]
+        Pres                Altimeter setting                        [hPa]
+    """
+
+    __slots__ = ('Raw','Type','Station','Time','WindDir','WindSpd','WindGust',
+                 'WindUnits','WindVar','Visibility','Weather','Clouds','Sky',
+                 'Temp','DewPoint','Pres')
+
+    def __init__(self,Raw):
+        for Field in self.__slots__:
+            setattr(self,Field,None)
+        self.Raw = Raw
+        Weather, Clouds, Sky = [], [], []
+
+        # Join split visibility groups (e.g. '1 1/2SM') into a single group
+        Tokens = re.sub(r'\b(\d+) (\d+/\d+SM)\b',r'\1_\2',Raw).split()
+
+        # Decode each group in the body of the report
+        for Token in Tokens:
+            if Token in endGroups:
+                break
+            Match = Tokenizer.fullmatch(Token)
+            Group = Match.lastgroup if Match else None
+            if Group is None or (Group == 'Weather' and not (Match['Descriptor'] or Match['Phenomena'])):
+                if self.Station is None and self.Time is None and stationID.fullmatch(Token):
+                    self.Station = Token
+                continue
+            if Group == 'Type':
+                self.Type = Match['ReportType']
+            elif Group == 'Time':
+                self.Time = (int(Match['Day']),int(Match['Hour']),int(Match['Minute']))
+            elif Group == 'Wind':
+                self.WindDir   = int(Match['WindDir']) if Match['WindDir'].isdigit() else (Match['WindDir'] if Match['WindDir'] == 'VRB' else None)
+                self.WindSpd   = int(Match['WindSpd'].lstrip('P')) if Match['WindSpd'] != '//' else None
+                self.WindGust  = int(Match['WindGust'].lstrip('P')) if Match['WindGust'] else None
+                self.WindUnits = Match['WindUnits']
+            elif Group == 'WindVar':
+                self.WindVar = (int(Match['WindFrom']),int(Match['WindTo']))
+            elif Group == 'Visibility' and self.Visibility is None:
+                if Match['VisCode']:
+                    self.Visibility = 10000
+                    Sky.append('CAVOK')
+                elif Match['VisMetres']:
+                    self.Visibility = 10000 if Match['VisMetres'] == '9999' else int(Match['VisMetres'])
+                else:
+                    self.Visibility = round(statuteMiles(Match['VisMiles']) * 1609.344)
+            elif Group == 'Sky':
+                Sky.append(Match['SkyCode'])
+            elif Group == 'Cloud':
+                Height = int(Match['Height'])*100 if Match['Height'] and Match['Height'].isdigit() else None
+                Type   = Match['CloudType'] if Match['CloudType'] != '///' else None
+                Clouds.append((Match['Cover'],Height,Type))
+                Sky.append(Match['Cover'])
+            elif Group == 'Weather':
+                Phenomena = tuple(re.findall('..',Match['Phenomena']))
+                Weather.append((Token,Match['Intensity'],Match['Descriptor'],Phenomena))
+            elif Group == 'Temperature':
+                self.Temp     = temperature(Match['Temp'])
+                self.DewPoint = temperature(Match['DewPoint'])
+            elif Group == 'Pressure':
+                if Match['PresUnits'] == 'Q':
+                    self.Pres = float(Match['Pres'])
+                else:
+                    self.Pres = round(int(Match['Pres'])/100 * 33.8639,1)
+
+        # Store decoded weather groups, cloud layers and sky conditions
+        self.Weather = tuple(Weather)
+        self.Clouds  = tuple(Clouds)
+        self.Sky     = tuple(Sky)
+
+    def __repr__(self):
+        return 'Report({!r})'.format(self.Raw)
+
+    def skyCode(self):
+
+        """ Returns the first sky condition code in the report, or None if the
+        report contains no sky condition
+        """
+
+        return self.Sky[0] if self.Sky else None
+
+    def precipitationCode(self):
+
+        """ Returns the first weather group in the report that reports
+        precipitation, or showers or thunderstorms in the vicinity. Returns None
+        if no precipitation is reported
+        """
+
+        for Code,Intensity,Descriptor,Phenomena in self.Weather:
+            if Precipitation.intersection(Phenomena):
+                return Code
+            if Intensity == 'VC' and Descriptor in ['SH','TS']:
+                return Code
+        return None
+
+# ==============================================================================
+# DEFINE METAR DECODING FUNCTIONS
+# ==============================================================================
+def decode(Raw):
+
+    """ Decodes the METAR report. Decoded reports are cached by the raw report
+    so that the Sager Weathercaster and any METAR display share one decode
+
+    INPUTS:
+        Raw                 Raw METAR report
+
+    OUTPUT:
+        Report              Decoded METAR report, or None if Raw is not a
+                            string
+    """
+
+    if not isinstance(Raw,str):
+        return None
+    return cachedDecode(Raw)
+
+@functools.lru_cache(maxsize=64)
+def cachedDecode(Raw):
+
+    """ Returns the memoised decoded METAR report
+    """
+
+    return Report(Raw)
+
+def statuteMiles(Value):
+
+    """ Converts a METAR visibility in statute miles into a number, including
+    whole and fractional parts (e.g. '1_1/2') and the P/M qualifiers
+
+    INPUTS:
+        Value               Visibility group without the SM suffix
+    """
+
+    Value = Value.lstrip('PM')
+    Miles = 0
+    for Part in Value.split('_'):
+        if '/' in Part:
+            Num,Den = Part.split('/')
+            Miles  += int(Num)/int(Den)
+        else:
+            Miles  += int(Part)
+    return Miles
+
+def temperature(Value):
+
+    """ Converts a METAR temperature group into degrees Celsius
+
+    INPUTS:
+        Value               Temperature group (e.g. 'M05'), or None
+    """
+
+    if not Value:
+        return None
+    return -int(Value[1:]) if Value.startswith('M') else int(Value)
@@ -17,8 +17,166 @@ this program. If not, see <http://www.gnu.org/licenses/>.
 
 # Import required modules
 from lib  import derivedVariables as derive
+import numpy as np
+import functools
+import numbers
 import math
 
+# Define global variables
+NaN = float('NaN')
+
+# ==============================================================================
+# DEFINE UNIT CONVERSION REGISTRY
+# ==============================================================================
+class Converter(object):
+
+    """ Compiled conversion from a source unit into a target unit, defined
+    either by a scale/offset pair or by a direct callable
+
+    INPUTS:
+        Label           Output unit label
+        Scale           Multiplicative scale factor
+        Offset          Additive offset applied after scaling
+        Func            Callable used for non-linear conversions
+        ArrayFunc       Callable used for non-linear conversions of arrays
+        Null            Value/label pair returned when the value is None
+    """
+
+    __slots__ = ('Label','Scale','Offset','Func','ArrayFunc','Null')
+
+    def __init__(self,Label,Scale=None,Offset=0,Func=None,ArrayFunc=None,Null=None):
+        self.Label     = Label
+        self.Scale     = Scale
+        self.Offset    = Offset
+        self.Func      = Func
+        self.ArrayFunc = ArrayFunc
+        self.Null      = Null
+
+    def __call__(self,Value):
+        if self.Func is not None:
+            return self.Func(Value)
+        elif self.Scale is None:
+            return Value
+        return Value * self.Scale + self.Offset
+
+    def array(self,Values):
+        if self.ArrayFunc is not None:
+            return self.ArrayFunc(Values)
+        Values = np.asarray(Values,dtype=np.float64)
+        if self.Scale is None:
+            return Values
+        return Values * self.Scale + self.Offset
+
+# Define unit conversion registry. For each target unit in the [Units] section
+# of the station configuration, the registry maps each source unit label onto
+# the compiled conversion. Wind direction is set to 'Calm' when the wind speed
+# is zero
+Registry = {'c':        {'c':       Converter('c')},
+            'f':        {'c':       Converter('f',9/5,32)},
+            'mb':       {'mb':      Converter(' mb'),
+                         'mb/hr':   Converter(' mb/hr')},
+            'hpa':      {'mb':      Converter(' hPa'),
+                         'mb/hr':   Converter(' hPa/hr')},
+            'inhg':     {'mb':      Converter(' inHg',0.0295301),
+                         'mb/hr':   Converter(' inHg/hr',0.0295301)},
+            'mmhg':     {'mb':      Converter(' mmHg',0.750063),
+                         'mb/hr':   Converter(' mmHg/hr',0.750063)},
+            'mps':      {'mps':     Converter('m/s')},
+            'mph':      {'mps':     Converter('mph',2.2369362920544)},
+            'lfm':      {'mps':     Converter('mph',2.2369362920544)},
+            'kts':      {'mps':     Converter('kts',1.9438)},
+            'kph':      {'mps':     Converter('km/h',3.6)},
+            'bft':      {'mps':     Converter('bft',Func=lambda Value: derive.BeaufortScale([Value,'mps'])[2],
+                                              ArrayFunc=lambda Values: derive.BeaufortForceArray(Values))},
+            'degrees':  {'degrees': Converter('degrees',Null=('Calm',''))},
+            'cardinal': {'degrees': Converter('',Func=lambda Value: derive.CardinalWindDirection([Value,'degrees'])[2],
+                                              ArrayFunc=lambda Values: derive.CardinalWindDirectionArray(Values),
+                                              Null=('Calm',''))},
+            'mm':       {'mm':      Converter(' mm'),
+                         'mm/hr':   Converter(' mm/hr')},
+            'cm':       {'mm':      Converter(' cm',0.1),
+                         'mm/hr':   Converter(' cm/hr',0.1)},
+            'in':       {'mm':      Converter(' in',0.0393701),
+                         'mm/hr':   Converter(' in/hr',0.0393701)},
+            'km':       {},
+            'mi':       {'km':      Converter('miles',0.62137)}}
+
+class Pipeline(object):
+
+    """ Unit conversion pipeline compiled from the [Units] section of the
+    station configuration. The pipeline is rebuilt by compilePipeline when the
+    [Units] section is changed
+
+    INPUTS:
+        Config          Station configuration
+    """
+
+    def __init__(self,Config):
+        self.Tables = {Type: Registry.get(Unit,{}) for Type,Unit in Config['Units'].items()}
+
+    def convert(self,Obs,Type):
+
+        """ Converts an observation into the units configured for the
+        specified [Units] key
+        """
+
+        return convert(Obs,self.Tables.get(Type,{}))
+
+# Define cached unit conversion pipeline
+unitPipeline = None
+
+def compilePipeline(Config):
+
+    """ Compiles the unit conversion pipeline from the [Units] section of the
+    station configuration
+
+    INPUTS:
+        Config          Station configuration
+
+    OUTPUT:
+        Pipeline        Unit conversion pipeline
+    """
+
+    global unitPipeline
+    unitPipeline = Pipeline(Config)
+    return unitPipeline
+
+def getPipeline(Config):
+
+    """ Returns the cached unit conversion pipeline, compiling it if required
+
+    INPUTS:
+        Config          Station configuration
+
+    OUTPUT:
+        Pipeline        Unit conversion pipeline
+    """
+
+    return unitPipeline if unitPipeline is not None else compilePipeline(Config)
+
+def convert(Obs,Table):
+
+    """ Converts each value/unit pair in an observation using the specified
+    conversion table
+
+    INPUTS:
+        Obs             Observations with current units
+        Table           Dictionary of compiled conversions keyed by source unit
+
+    OUTPUT:
+        cObs            Observation converted into required unit
+    """
+
+    cObs = Obs.__class__(Obs)
+    for ii in range(1,len(Obs)):
+        if Obs[ii].__class__ is str and Obs[ii] in Table:
+            Conversion = Table[Obs[ii]]
+            if Obs[ii-1] is None and Conversion.Null:
+                cObs[ii-1], cObs[ii] = Conversion.Null
+            else:
+                cObs[ii-1], cObs[ii] = Conversion(Obs[ii-1]), Conversion.Label
+    return cObs
+
 def Units(Obs,Unit):
 
     """ Sets the required observation units
@@ -31,117 +189,125 @@ def Units(Obs,Unit):
         cObs            Observation converted into required unit
     """
 
-    # Convert temperature observations
-    cObs = Obs[:]
-    if Unit in ['f','c']:
-        for ii,T in enumerate(Obs):
-            if T == 'c':
-                if Unit == 'f':
-                    cObs[ii-1] = Obs[ii-1] * 9/5 + 32
-                    cObs[ii] = 'f'
-                else:
-                    cObs[ii-1] = Obs[ii-1]
-                    cObs[ii] = 'c'
+    return convert(Obs,Registry.get(Unit,{}))
 
-    # Convert pressure and pressure trend observations
-    elif Unit in ['inhg','mmhg','hpa','mb']:
-        for ii,P in enumerate(Obs):
-            if P in ['mb','mb/hr']:
-                if Unit == 'inhg':
-                    cObs[ii-1] = Obs[ii-1] * 0.0295301
-                    if P == 'mb':
-                        cObs[ii] = ' inHg'
-                    else:
-                        cObs[ii] = ' inHg/hr'
-                elif Unit == 'mmhg':
-                    cObs[ii-1] = Obs[ii-1] * 0.750063
-                    if P == 'mb':
-                        cObs[ii] = ' mmHg'
-                    else:
-                        cObs[ii] = ' mmHg/hr'
-                elif Unit == 'hpa':
-                    cObs[ii-1] = Obs[ii-1]
-                    if P == 'mb':
-                        cObs[ii] = ' hPa'
-                    else:
-                        cObs[ii] = ' hPa/hr'
-                else:
-                    cObs[ii-1] = Obs[ii-1]
-                    if P == 'mb':
-                        cObs[ii] = ' mb'
-                    else:
-                        cObs[ii] = ' mb/hr'
+def unitsArray(Values,Source,Unit):
 
-    # Convert windspeed observations
-    elif Unit in ['mph','lfm','kts','kph','bft','mps']:
-        for ii,W in enumerate(Obs):
-            if W == 'mps':
-                if Unit == 'mph' or Unit == 'lfm':
-                    cObs[ii-1] = Obs[ii-1] * 2.2369362920544
-                    cObs[ii] = 'mph'
-                elif Unit == 'kts':
-                    cObs[ii-1] = Obs[ii-1] * 1.9438
-                    cObs[ii] = 'kts'
-                elif Unit == 'kph':
-                    cObs[ii-1] = Obs[ii-1] * 3.6
-                    cObs[ii] = 'km/h'
-                elif Unit == 'bft':
-                    cObs[ii-1] = derive.BeaufortScale(Obs[ii-1:ii+1])[2]
-                    cObs[ii] = 'bft'
-                else:
-                    cObs[ii-1] = Obs[ii-1]
-                    cObs[ii] = 'm/s'
+    """ Converts an array of observations into the required units
 
-    # Convert wind direction observations
-    elif Unit in ['degrees','cardinal']:
-        for ii,W in enumerate(Obs):
-            if W == 'degrees':
-                if cObs[ii-1] is None:
-                    cObs[ii-1] = 'Calm'
-                    cObs[ii] = ''
-                elif Unit == 'cardinal':
-                    cObs[ii-1] = derive.CardinalWindDirection(Obs[ii-1:ii+1])[2]
-                    cObs[ii] = ''
-                else:
-                    cObs[ii-1] = Obs[ii-1]
-                    cObs[ii] = 'degrees'
+    INPUTS:
+        Values          Array of observations in the source unit
+        Source          Source unit label
+        Unit            Required output unit
 
-    # Convert rain accumulation and rain rate observations
-    elif Unit in ['in','cm','mm']:
-        for ii,Prcp in enumerate(Obs):
-            if Prcp in ['mm','mm/hr']:
-                if Unit == 'in':
-                    cObs[ii-1] = Obs[ii-1] * 0.0393701
-                    if Prcp == 'mm':
-                        cObs[ii] = ' in'
-                    else:
-                        cObs[ii] = ' in/hr'
-                elif Unit == 'cm':
-                    cObs[ii-1] = Obs[ii-1] * 0.1
-                    if Prcp == 'mm':
-                        cObs[ii] = ' cm'
-                    else:
-                        cObs[ii] = ' cm/hr'
-                else:
-                    cObs[ii-1] = Obs[ii-1]
-                    if Prcp == 'mm':
-                        cObs[ii] = ' mm'
-                    else:
-                        cObs[ii] = ' mm/hr'
+    OUTPUT:
+        cValues         Array of observations in the required unit
+        Label           Output unit label
+    """
 
-    # Convert distance observations
-    elif Unit in ['km','mi']:
-        for ii,Dist in enumerate(Obs):
-            if Dist == 'km':
-                if Unit == 'mi':
-                    cObs[ii-1] = Obs[ii-1] * 0.62137
-                    cObs[ii] = 'miles'
+    Conversion = Registry.get(Unit,{}).get(Source)
+    if Conversion is None:
+        return np.asarray(Values), Source
+    return Conversion.array(Values), Conversion.Label
+
+# Define display precision of each observation type, either as the number of
+# decimal places or as a dictionary keyed by unit. Precipitation is held to
+# additional decimal places so that the Trace and <0.1 thresholds are unchanged
+Precision = {'Temp':            1,
+             'forecastTemp':    0,
+             'Pressure':        {'inHg': 3, 'inHg/hr': 3, 'mmHg': 2, 'mmHg/hr': 2,
+                                 'hPa':  1, 'hPa/hr':  1, 'mb':   1, 'mb/hr':   1},
+             'Wind':            1,
+             'forecastWind':    0,
+             'Direction':       0,
+             'Precip':          {'mm': 3, 'mm/hr': 3, 'in': 4, 'in/hr': 4, 'cm': 4, 'cm/hr': 4},
+             'Humidity':        0,
+             'Radiation':       0,
+             'clearSky':        0,
+             'UV':              1,
+             'peakSun':         2,
+             'Battery':         2,
+             'StrikeCount':     0,
+             'StrikeDistance':  1}
+
+def displayValue(Value,Type,Unit):
+
+    """ Rounds an observation value to the precision at which it is displayed
+    on the console. NaN values are mapped onto a single NaN object, and values
+    that round to zero are left unchanged so that Trace amounts and the sign
+    of small values are formatted as before
 
-    # Return converted observations
-    return cObs
+    INPUTS:
+        Value           Observation value
+        Type            Observation type
+        Unit            Observation unit
+
+    OUTPUT:
+        Value           Observation value rounded to its display precision
+    """
+
+    if Value.__class__ is bool or not isinstance(Value,numbers.Real):
+        return Value
+    if math.isnan(Value):
+        return NaN
+    Digits = Precision.get(Type)
+    if isinstance(Digits,dict):
+        Digits = Digits.get(Unit)
+    if Digits is None:
+        return Value
+    Rounded = round(float(Value),Digits)
+    return Rounded if Rounded != 0 or Value == 0 else Value
+
+def displayKey(Obs,Type):
+
+    """ Returns the hashable key of an observation from the fields that are
+    shown on the console. Fields listed in the Hidden attribute of a record
+    are replaced by None, and each value preceding a unit is rounded to its
+    display precision, so observations that display identically share a key
+
+    INPUTS:
+        Obs             Observations with units
+        Type            Observation type
+
+    OUTPUT:
+        Key             Tuple of the displayed observation fields
+    """
+
+    Hidden = getattr(Obs,'Hidden',())
+    Key = [None if ii in Hidden else Field for ii,Field in enumerate(Obs)]
+    for ii in range(1,len(Key)):
+        if Key[ii].__class__ is str:
+            Key[ii-1] = displayValue(Key[ii-1],Type,Key[ii].strip())
+    return tuple(Key)
 
 def Format(Obs,Type):
 
+    """ Formats the observation for display on the console. Formatted
+    observations are memoised in a bounded LRU cache keyed by the observation
+    type and the display key of the observation, so observations that display
+    identically are not formatted again
+
+    INPUTS:
+        Obs             Observations with units
+        Type            Observation type
+
+    OUTPUT:
+        cObs            Formatted observation based on specified type
+    """
+
+    return list(cachedFormat(displayKey(Obs,Type),Type))
+
+@functools.lru_cache(maxsize=1024)
+def cachedFormat(Key,Type):
+
+    """ Returns the memoised formatted observation for the specified display
+    key as a tuple
+    """
+
+    return tuple(formatObs(list(Key),Type))
+
+def formatObs(Obs,Type):
+
     """ Formats the observation for display on the console
 
     INPUTS:
@@ -304,6 +470,15 @@ def Format(Obs,Type):
                 else:
                     cObs[ii-1] = '{:.0f}'.format(cObs[ii-1])
 
+    # Format percent of clear-sky solar radiation observations
+    elif Type == 'clearSky':
+        for ii,Pct in enumerate(Obs):
+            if isinstance(Pct,str) and Pct.strip() == '%':
+                if math.isnan(cObs[ii-1]):
+                    cObs[ii-1] = '-'
+                else:
+                    cObs[ii-1] = '{:.0f}'.format(cObs[ii-1])
+
     # Format UV observations
     elif Type == 'UV':
         for ii,UV in enumerate(Obs):
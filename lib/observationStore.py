@@ -0,0 +1,136 @@
+""" Defines the observation store holding the display fields required by the
+Raspberry Pi Python console for WeatherFlow Tempest and Smart Home Weather
+stations.
+Copyright (C) 2018-2021 Peter Davis
+
+This program is free software: you can redistribute it and/or modify it under
+the terms of the GNU General Public License as published by the Free Software
+Foundation, either version 3 of the License, or (at your option) any later
+version.
+
+This program is distributed in the hope that it will be useful, but WITHOUT
+ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with
+this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+# Import required modules
+from kivy.event      import EventDispatcher
+from kivy.properties import ObjectProperty
+from kivy.clock      import Clock
+from lib             import profiler
+import threading
+
+def create(Fields):
+
+    """ Creates an observation store with a separate Kivy property for each
+    display field
+
+    INPUTS:
+        Fields              List of (Key,Default) display fields
+
+    OUTPUT:
+        Store               Observation store
+    """
+
+    Properties = {Key: ObjectProperty(Default,rebind=False) for Key,Default in Fields}
+    return type('observationStore',(Store,),Properties)(Fields)
+
+class Store(EventDispatcher):
+
+    """ Observation store holding the display fields shown on the console and
+    the latest raw Websocket messages. Each display field is a separate Kivy
+    property, so that kv rules bound to app.Obs.<Key> are only re-evaluated
+    when that field changes. Raw messages and any other keys that are not
+    display fields are stored without a property and never dispatch.
+
+    Values can be written from any thread and are immediately visible to every
+    reader through Obs[Key]. The Kivy properties are only ever set on the UI
+    thread: writes made on other threads are batched and applied at the start
+    of the next frame
+
+    INPUTS:
+        Fields              List of (Key,Default) display fields
+    """
+
+    def __init__(self,Fields,**kwargs):
+        super().__init__(**kwargs)
+        self.Fields  = frozenset(Key for Key,Default in Fields)
+        self.Values  = dict(Fields)
+        self.Pending = {}
+        self.Lock    = threading.Lock()
+        self.Trigger = Clock.create_trigger(self.flush)
+
+    def __getitem__(self,Key):
+        with self.Lock:
+            return self.Values[Key]
+
+    def __setitem__(self,Key,Value):
+        self.update({Key: Value})
+
+    def __contains__(self,Key):
+        with self.Lock:
+            return Key in self.Values
+
+    def get(self,Key,Default=None):
+
+        """ Returns the latest value of the specified key, or Default if the
+        key has not been set
+        """
+
+        with self.Lock:
+            return self.Values.get(Key,Default)
+
+    def update(self,Values):
+
+        """ Stores new values in the observation store. Display fields are set
+        immediately when called on the UI thread, and are otherwise queued for
+        the UI thread
+
+        INPUTS:
+            Values          Dictionary of new values
+        """
+
+        # Store latest values and extract display fields
+        onUIThread = threading.current_thread() is threading.main_thread()
+        with self.Lock:
+            self.Values.update(Values)
+            Display = {Key: Value for Key,Value in Values.items() if Key in self.Fields}
+            if not Display:
+                return
+
+            # Queue display fields set on other threads. Display fields set on
+            # the UI thread supersede any queued value for the same field
+            if onUIThread:
+                for Key in Display:
+                    self.Pending.pop(Key,None)
+            else:
+                self.Pending.update(Display)
+
+        # Set display fields on UI thread, or schedule queued display fields
+        if onUIThread:
+            self.apply(Display)
+        else:
+            self.Trigger()
+
+    @profiler.timed
+    def flush(self,*largs):
+
+        """ Sets all display fields queued by other threads. Runs on the UI
+        thread
+        """
+
+        with self.Lock:
+            Pending, self.Pending = self.Pending, {}
+        self.apply(Pending)
+
+    def apply(self,Display):
+
+        """ Sets the Kivy property for each display field. Properties only
+        dispatch when their value changes. Must be called on the UI thread
+        """
+
+        for Key,Value in Display.items():
+            setattr(self,Key,Value)
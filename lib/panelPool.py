@@ -0,0 +1,138 @@
+""" Maintains the pool of reusable panels and buttons displayed on the current
+conditions screen of the Raspberry Pi Python console for WeatherFlow Tempest
+and Smart Home Weather stations.
+Copyright (C) 2018-2021 Peter Davis
+
+This program is free software: you can redistribute it and/or modify it under
+the terms of the GNU General Public License as published by the Free Software
+Foundation, either version 3 of the License, or (at your option) any later
+version.
+
+This program is distributed in the hope that it will be useful, but WITHOUT
+ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with
+this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+# Import required modules
+from kivy.uix.screenmanager import Screen
+from kivy.factory           import Factory
+from kivy.clock             import mainthread
+from lib                    import profiler
+import threading
+
+# Define global variables
+Pools    = {}
+Dirty    = {}
+poolLock = threading.Lock()
+
+def acquire(Name):
+
+    """ Returns a panel or button of the specified class that is not currently
+    displayed, constructing a new instance only if every pooled instance is
+    already displayed
+
+    INPUTS:
+        Name                Class name of panel or button, e.g. 'WindSpeedPanel'
+
+    OUTPUT:
+        Panel               Panel or button instance without a parent
+    """
+
+    with poolLock:
+        Pool = Pools.setdefault(Name,[])
+        for Panel in Pool:
+            if Panel.parent is None:
+                return Panel
+    Panel = Factory.get(Name)()
+    with poolLock:
+        Pool.append(Panel)
+    return Panel
+
+def show(Container,Name):
+
+    """ Replaces the contents of the container with a pooled panel or button of
+    the specified class. Panels removed from the container are returned to the
+    pool, and the displayed panel is refreshed from the latest observations
+
+    INPUTS:
+        Container           Widget holding the panel or button
+        Name                Class name of panel or button, e.g. 'WindSpeedPanel'
+
+    OUTPUT:
+        Panel               Displayed panel or button instance
+    """
+
+    Container.clear_widgets()
+    Panel = acquire(Name)
+    Container.add_widget(Panel)
+    Dirty.pop(Panel,None)
+    if hasattr(Panel,'refresh'):
+        Panel.refresh()
+    return Panel
+
+def active(Name):
+
+    """ Returns the panels of the specified class that are currently displayed.
+    Pooled panels that are not displayed do not receive updates
+
+    INPUTS:
+        Name                Class name of panel, e.g. 'WindSpeedPanel'
+
+    OUTPUT:
+        Panels              List of displayed panel instances
+    """
+
+    with poolLock:
+        return [Panel for Panel in Pools.get(Name,[]) if Panel.parent is not None]
+
+def onScreen(Panel):
+
+    """ Returns True if the panel is displayed on the screen that is currently
+    shown by its screen manager
+
+    INPUTS:
+        Panel               Panel instance
+    """
+
+    Widget = Panel.parent
+    while Widget is not None:
+        if isinstance(Widget,Screen):
+            return Widget.manager is not None and Widget.manager.current_screen is Widget
+        Widget = Widget.parent
+    return False
+
+@mainthread
+def update(Name,Method,onShow=None):
+
+    """ Calls the specified method of each displayed panel of the specified
+    class that is currently on screen. Displayed panels that are on a hidden
+    screen are instead marked dirty, and the method named by onShow is called
+    once when the screen is next shown. Runs on the UI thread
+
+    INPUTS:
+        Name                Class name of panel, e.g. 'WindSpeedPanel'
+        Method              Name of panel method to call
+        onShow              Name of panel method to call when a hidden panel
+                            is next shown. Defaults to Method
+    """
+
+    for Panel in active(Name):
+        if onScreen(Panel):
+            with profiler.section(Name + '.' + Method):
+                getattr(Panel,Method)()
+        else:
+            Dirty.setdefault(Panel,set()).add(onShow or Method)
+
+def refreshDirty():
+
+    """ Calls the outstanding methods of every dirty panel that is now on
+    screen. Called when a screen holding panels is about to be shown
+    """
+
+    for Panel in [Panel for Panel in Dirty if onScreen(Panel)]:
+        for Method in Dirty.pop(Panel):
+            with profiler.section(type(Panel).__name__ + '.' + Method):
+                getattr(Panel,Method)()
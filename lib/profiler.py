@@ -0,0 +1,229 @@
+""" Measures the frame times and main thread stalls of the Raspberry Pi Python
+console for WeatherFlow Tempest and Smart Home Weather stations, and displays
+them in a diagnostic overlay.
+Copyright (C) 2018-2021 Peter Davis
+
+This program is free software: you can redistribute it and/or modify it under
+the terms of the GNU General Public License as published by the Free Software
+Foundation, either version 3 of the License, or (at your option) any later
+version.
+
+This program is distributed in the hope that it will be useful, but WITHOUT
+ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with
+this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+# Import required modules
+from kivy.graphics import Color, Rectangle
+from kivy.uix.label import Label
+from kivy.clock     import Clock
+from kivy.metrics   import dp
+from collections    import deque
+import numpy as np
+import contextlib
+import functools
+import threading
+import json
+import time
+
+# Define global variables
+File         = 'profiler.log'
+frameCount   = 600
+stallTime    = 0.05
+maxStalls    = 5
+maxCauses    = 3
+maxRecords   = 2000
+saveInterval = 10
+Enabled      = False
+fileLock     = threading.Lock()
+State        = {'Frames':    deque(maxlen=frameCount),
+                'Records':   deque(maxlen=maxRecords),
+                'Stalls':    [],
+                'Calls':     [],
+                'Depth':     0,
+                'lastFrame': None,
+                'Events':    [],
+                'Overlay':   None}
+
+def timed(Func):
+
+    """ Decorator that attributes the time spent in a function on the main
+    thread to the frame in which it ran while the profiler is enabled. Nested
+    timed functions are attributed to the outermost timed function. Apply
+    below @mainthread so that the time is measured on the main thread
+
+    INPUTS:
+        Func                Function to be timed
+    """
+
+    Name = Func.__module__.replace('lib.','',1).replace('__main__','main') + '.' + Func.__qualname__
+    @functools.wraps(Func)
+    def Wrapper(*args,**kwargs):
+        if not Enabled:
+            return Func(*args,**kwargs)
+        with section(Name):
+            return Func(*args,**kwargs)
+    return Wrapper
+
+@contextlib.contextmanager
+def section(Name):
+
+    """ Context manager that attributes the time spent in the enclosed block
+    on the main thread to the frame in which it ran while the profiler is
+    enabled
+
+    INPUTS:
+        Name                Name of the enclosed block shown in the overlay
+    """
+
+    if not Enabled or threading.current_thread() is not threading.main_thread():
+        yield
+        return
+    State['Depth'] += 1
+    Start = time.perf_counter()
+    try:
+        yield
+    finally:
+        State['Depth'] -= 1
+        if State['Depth'] == 0:
+            State['Calls'].append((Name,time.perf_counter() - Start))
+
+def toggle():
+
+    """ Enables the profiler and displays the diagnostic overlay, or disables
+    the profiler, removes the overlay and saves the ring buffer to disk
+    """
+
+    global Enabled
+    if not Enabled:
+        Enabled = True
+        State['Frames'].clear()
+        State['Stalls'], State['Calls'], State['Depth'] = [], [], 0
+        State['lastFrame'] = time.perf_counter()
+        State['Events'] = [Clock.schedule_interval(frame,0),
+                           Clock.schedule_interval(overlay,1),
+                           Clock.schedule_interval(save,saveInterval)]
+        show()
+    else:
+        Enabled = False
+        for Event in State['Events']:
+            Event.cancel()
+        State['Events'] = []
+        hide()
+        save()
+
+def frame(dt):
+
+    """ Records the duration of the frame that has just finished. Frames that
+    exceed the stall time are recorded as stalls together with the timed
+    functions that ran during the frame, longest first
+    """
+
+    # Record frame time and extract timed functions that ran during frame
+    Now = time.perf_counter()
+    Frame, State['lastFrame'] = Now - State['lastFrame'], Now
+    Calls, State['Calls'] = State['Calls'], []
+    State['Frames'].append(Frame)
+    if Frame < stallTime:
+        return
+
+    # Sum the time spent in each timed function during the stalled frame. Time
+    # not spent in a timed function is attributed to untracked work such as
+    # kv rules, layout, drawing and garbage collection
+    Causes = {}
+    for Name,Duration in Calls:
+        Causes[Name] = Causes.get(Name,0) + Duration
+    Causes['untracked'] = max(Frame - sum(Causes.values()),0)
+    Causes = sorted(Causes.items(),key=lambda Cause: -Cause[1])[:maxCauses]
+
+    # Store stall in ring buffer and in the list of longest stalls
+    Stall = {'Type':   'Stall',
+             'Time':   round(time.time(),3),
+             'Frame':  round(Frame*1000,1),
+             'Causes': [[Name,round(Duration*1000,1)] for Name,Duration in Causes]}
+    State['Records'].append(Stall)
+    State['Stalls'] = sorted(State['Stalls'] + [Stall],key=lambda Stall: -Stall['Frame'])[:maxStalls]
+
+def summary():
+
+    """ Returns the frame rate and frame time percentiles over the last
+    frameCount frames
+    """
+
+    Frames = np.array(State['Frames'])*1000
+    if Frames.size == 0:
+        return None
+    p50,p95,p99 = np.percentile(Frames,[50,95,99])
+    return {'Type': 'Summary',
+            'Time': round(time.time(),3),
+            'FPS':  round(Clock.get_fps(),1),
+            'p50':  round(p50,1),
+            'p95':  round(p95,1),
+            'p99':  round(p99,1),
+            'Max':  round(Frames.max(),1)}
+
+def overlay(dt):
+
+    """ Updates the diagnostic overlay with the frame rate, frame time
+    percentiles and longest main thread stalls
+    """
+
+    Summary = summary()
+    if Summary is None or State['Overlay'] is None:
+        return
+    Lines = ['FPS {FPS}   frame p50 {p50}  p95 {p95}  p99 {p99}  max {Max} ms'.format(**Summary),
+             'Longest stalls:']
+    for Stall in State['Stalls']:
+        Causes = ', '.join('{} {}'.format(Name,Duration) for Name,Duration in Stall['Causes'])
+        Lines.append('{:>7} ms  {}  {}'.format(Stall['Frame'],
+                                                time.strftime('%H:%M:%S',time.localtime(Stall['Time'])),
+                                                Causes))
+    State['Overlay'].text = '\n'.join(Lines)
+
+def save(*largs):
+
+    """ Adds a frame time summary to the ring buffer and writes the ring buffer
+    to disk on a background thread, so that file access does not stall the
+    main thread
+    """
+
+    Summary = summary()
+    if Summary is not None:
+        State['Records'].append(Summary)
+    Records = list(State['Records'])
+    def Write():
+        with fileLock:
+            with open(File,'w') as f:
+                for Record in Records:
+                    f.write(json.dumps(Record) + '\n')
+    threading.Thread(target=Write,name='profiler',daemon=True).start()
+
+def show():
+
+    """ Adds the diagnostic overlay to the top of the console window
+    """
+
+    from kivy.core.window import Window
+    Overlay = Label(text='Profiling...',font_size=dp(12),halign='left',valign='top',
+                    size_hint=(None,None),size=(Window.width,dp(110)),text_size=(Window.width,dp(110)),
+                    pos=(0,Window.height - dp(110)),padding=(dp(6),dp(4)))
+    with Overlay.canvas.before:
+        Color(0,0,0,0.75)
+        Background = Rectangle(pos=Overlay.pos,size=Overlay.size)
+    Overlay.bind(pos=lambda Instance,Value: setattr(Background,'pos',Value),
+                 size=lambda Instance,Value: setattr(Background,'size',Value))
+    Window.add_widget(Overlay)
+    State['Overlay'] = Overlay
+
+def hide():
+
+    """ Removes the diagnostic overlay from the console window
+    """
+
+    from kivy.core.window import Window
+    if State['Overlay'] is not None:
+        Window.remove_widget(State['Overlay'])
+        State['Overlay'] = None
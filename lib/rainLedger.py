@@ -0,0 +1,287 @@
+""" Maintains the daily, monthly and yearly rainfall accumulation ledger required
+by the Raspberry Pi Python console for WeatherFlow Tempest and Smart Home
+Weather stations.
+Copyright (C) 2018-2021 Peter Davis
+
+This program is free software: you can redistribute it and/or modify it under
+the terms of the GNU General Public License as published by the Free Software
+Foundation, either version 3 of the License, or (at your option) any later
+version.
+
+This program is distributed in the hope that it will be useful, but WITHOUT
+ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with
+this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+# Import required library modules
+from lib import requestAPI
+from lib.measurement import Running
+
+# Import required Python modules
+from kivy.clock  import Clock
+from datetime    import datetime, date, timedelta
+import threading
+import json
+import math
+import pytz
+import os
+
+# Define global variables
+NaN        = float('NaN')
+File       = 'rainLedger.json'
+Ledgers    = {}
+ledgerLock = threading.Lock()
+fileLock   = threading.Lock()
+
+def get(Device,Config):
+
+    """ Returns the rainfall ledger for the specified device, loading it from
+    disk and scheduling the midnight rollover the first time it is requested
+
+    INPUTS:
+        Device              Device ID
+        Config              Station configuration
+
+    OUTPUT:
+        Ledger              Rainfall ledger for the specified device
+    """
+
+    with ledgerLock:
+        if Device not in Ledgers:
+            Ledgers[Device] = Ledger(Device,Config)
+            Ledgers[Device].scheduleRollover()
+        return Ledgers[Device]
+
+class Ledger(object):
+
+    """ Rainfall ledger holding the rain accumulation for the current day, the
+    total for yesterday, and the totals for all closed days in the current
+    month and year. Closed days are added to the monthly and yearly totals by a
+    scheduled midnight rollover, so that the monthly and yearly totals only
+    need to be downloaded from the WeatherFlow API when the ledger is first
+    synchronised
+
+    INPUTS:
+        Device              Device ID
+        Config              Station configuration
+    """
+
+    def __init__(self,Device,Config):
+        self.Device    = str(Device)
+        self.Config    = Config
+        self.Lock      = threading.RLock()
+        self.Synced    = False
+        self.Date      = None
+        self.Today     = 0
+        self.Yesterday = NaN
+        self.Month     = NaN
+        self.Year      = NaN
+        self.Days      = {}
+        self.load()
+
+    def now(self):
+
+        """ Returns the current time in the station timezone
+        """
+
+        Tz = pytz.timezone(self.Config['Station']['Timezone'])
+        return datetime.now(pytz.utc).astimezone(Tz)
+
+    def load(self):
+
+        """ Loads the rainfall ledger from disk. The ledger is only trusted if
+        it was last updated today, otherwise it is resynchronised from the
+        WeatherFlow API
+        """
+
+        with fileLock:
+            if not os.path.isfile(File):
+                return
+            try:
+                with open(File,'r') as f:
+                    Stored = json.load(f).get(self.Device)
+            except (OSError,ValueError):
+                return
+        if not Stored or Stored['Date'] != self.now().date().isoformat():
+            return
+        with self.Lock:
+            self.Date      = date.fromisoformat(Stored['Date'])
+            self.Yesterday = Stored['Yesterday'] if Stored['Yesterday'] is not None else NaN
+            self.Month     = Stored['Month']     if Stored['Month']     is not None else NaN
+            self.Year      = Stored['Year']      if Stored['Year']      is not None else NaN
+            self.Days      = Stored['Days']
+            self.Synced    = True
+
+    def save(self):
+
+        """ Saves the closed-day totals in the rainfall ledger to disk
+        """
+
+        with self.Lock:
+            Entry = {'Date':      self.Date.isoformat(),
+                     'Yesterday': None if math.isnan(self.Yesterday) else self.Yesterday,
+                     'Month':     None if math.isnan(self.Month)     else self.Month,
+                     'Year':      None if math.isnan(self.Year)      else self.Year,
+                     'Days':      self.Days}
+        with fileLock:
+            Stored = {}
+            if os.path.isfile(File):
+                try:
+                    with open(File,'r') as f:
+                        Stored = json.load(f)
+                except (OSError,ValueError):
+                    Stored = {}
+            Stored[self.Device] = Entry
+            with open(File,'w') as f:
+                json.dump(Stored,f)
+
+    def sync(self):
+
+        """ Synchronises the closed-day totals for yesterday, the current month
+        and the current year with the WeatherFlow API
+        """
+
+        # Define current time in station timezone
+        Now = self.now()
+
+        # Define index of rainfall accumulation in API data based on device
+        # type
+        if self.Config['Station']['SkyID']:
+            Index, yearIndex = 3, 3
+        else:
+            Index, yearIndex = 12, 28
+
+        # Download rainfall data for yesterday and calculate total daily
+        # rainfall. Set to NaN if API call has failed
+        Data = requestAPI.weatherflow.Yesterday(self.Device,self.Config)
+        if requestAPI.weatherflow.verifyResponse(Data,'obs'):
+            Yesterday = sum(item[Index] for item in Data.json()['obs'] if item[Index] != None)
+        else:
+            Yesterday = NaN
+
+        # Download rainfall data for closed days in the current month and
+        # calculate monthly rainfall total. Set to NaN if API call has failed
+        if Now.day == 1:
+            Month = 0
+        else:
+            Data = requestAPI.weatherflow.Month(self.Device,self.Config)
+            if requestAPI.weatherflow.verifyResponse(Data,'obs'):
+                Month = sum(item[Index] for item in Data.json()['obs'] if item[Index] != None)
+            else:
+                Month = NaN
+
+        # Download rainfall data for closed days in the current year and
+        # calculate yearly rainfall total. The API request ends the day before
+        # yesterday, so add yesterday's total. Set to NaN if API call has failed
+        if Now.timetuple().tm_yday == 1:
+            Year = 0
+        elif Now.month == 1:
+            Year = Month
+        else:
+            Data = requestAPI.weatherflow.Year(self.Device,self.Config)
+            if requestAPI.weatherflow.verifyResponse(Data,'obs'):
+                Year = sum(item[yearIndex] for item in Data.json()['obs'] if item[yearIndex] != None) + Yesterday
+            else:
+                Year = NaN
+
+        # Store closed-day totals and save ledger to disk. Totals that could
+        # not be downloaded are retried after the next midnight rollover
+        with self.Lock:
+            self.Date      = Now.date()
+            self.Yesterday = Yesterday
+            self.Month     = Month
+            self.Year      = Year
+            self.Days      = {}
+            self.Synced    = True
+        self.save()
+
+    def rollover(self,*largs):
+
+        """ Closes the current day, adding its rainfall accumulation to the
+        monthly and yearly totals and resetting these totals at the start of a
+        new month or year
+        """
+
+        # Define current time in station timezone
+        Now = self.now()
+
+        # Close the current day if midnight has passed. If more than one day
+        # has passed, the ledger must be resynchronised
+        with self.Lock:
+            if self.Date is None or Now.date() <= self.Date:
+                return
+            Closed = self.Date
+            Total  = self.Today if not math.isnan(self.Today) else 0
+            self.Days[Closed.isoformat()] = Total
+            self.Yesterday = Total
+            self.Month    += Total
+            self.Year     += Total
+            self.Date      = Closed + timedelta(days=1)
+            self.Today     = 0
+            if self.Date.year != Closed.year:
+                self.Month = 0
+                self.Year  = 0
+                self.Days  = {}
+            elif self.Date.month != Closed.month:
+                self.Month = 0
+            if self.Date != Now.date() or math.isnan(self.Month) or math.isnan(self.Year):
+                self.Synced = False
+        self.save()
+
+    def scheduleRollover(self,*largs):
+
+        """ Schedules the rollover of the rainfall ledger for midnight station
+        time
+        """
+
+        # Run rollover if called at midnight
+        if largs:
+            self.rollover()
+
+        # Schedule next rollover for one second after midnight station time
+        Now = self.now()
+        Midnight = Now.tzinfo.localize(datetime(Now.year,Now.month,Now.day) + timedelta(days=1))
+        Clock.schedule_once(self.scheduleRollover,(Midnight - Now).total_seconds() + 1)
+
+    def update(self,dailyRain):
+
+        """ Updates the rainfall ledger with the latest daily rainfall
+        accumulation
+
+        INPUTS:
+            dailyRain           Daily rain accumulation                 [mm]
+
+        OUTPUT:
+            rainAccum           Dictionary containing fields:
+                Today               Rain accumulation for the current day       [mm]
+                Yesterday           Rain accumulation yesterday                 [mm]
+                Month               Rain accumulation for the current month     [mm]
+                Year                Rain accumulation for the current year      [mm]
+        """
+
+        # Define current time in station timezone
+        Now = self.now()
+
+        # Synchronise ledger with the WeatherFlow API only if it has not been
+        # synchronised today. Closed-day totals cannot change, so Websocket
+        # reconnections do not trigger a new download. Close the previous day
+        # if the midnight rollover has not yet run
+        if not self.Synced:
+            self.sync()
+        elif Now.date() != self.Date:
+            self.rollover()
+            if not self.Synced:
+                self.sync()
+
+        # Update rainfall accumulation for the current day and return daily,
+        # monthly, and yearly rainfall accumulation totals
+        with self.Lock:
+            self.Today = dailyRain[0]
+            dailyAccum = dailyRain[0] if not math.isnan(dailyRain[0]) else 0
+            return {'Today':     Running([dailyRain[0],'mm',dailyRain[0],Now]),
+                    'Yesterday': Running([self.Yesterday,'mm',self.Yesterday,Now]),
+                    'Month':     Running([self.Month + dailyAccum,'mm',self.Month,Now]),
+                    'Year':      Running([self.Year  + dailyAccum,'mm',self.Year, Now])}
@@ -78,32 +78,31 @@ def Last3h(Device,endTime,Config):
     # Return observations from the last three hours
     return Data
 
-def Last6h(Device,endTime,Config):
+def Range(Device,startTime,endTime,Config):
 
-    """ API Request for last six hours of data from a WeatherFlow Smart Home
-    Weather Station device
+    """ API Request for data from a WeatherFlow Smart Home Weather Station
+    device between the specified start and end times
 
     INPUTS:
         Device              Device ID
-        endTime             End time of six hour window as a UNIX timestamp
+        startTime           Start time of window as a UNIX timestamp
+        endTime             End time of window as a UNIX timestamp
         Config              Station configuration
 
     OUTPUT:
-        Response            API response containing latest three-hourly forecast
+        Response            API response containing observations between the
+                            start and end times
     """
 
-    # Calculate timestamp three hours past
-    startTime = endTime - int(3600*6)
-
-    # Download WeatherFlow data for last three hours
+    # Download WeatherFlow data between start and end times
     Template = 'https://swd.weatherflow.com/swd/rest/observations/device/{}?time_start={}&time_end={}&token={}'
-    URL = Template.format(Device,startTime,endTime,Config['Keys']['WeatherFlow'])
+    URL = Template.format(Device,int(startTime),int(endTime),Config['Keys']['WeatherFlow'])
     try:
         Data = requests.get(URL,timeout=int(Config['System']['Timeout']))
     except:
         Data = None
 
-    # Return observations from the last three hours
+    # Return observations between start and end times
     return Data
 
 def Last24h(Device,endTime,Config):
@@ -308,22 +307,34 @@ def stationMetaData(Station,Config):
     # Return station meta data
     return Data
 
-def Forecast(Config):
+def Forecast(Config,ETag=None,Modified=None):
 
-    """ API Request for a weather forecast from WeatherFlow's BetterForecast API
+    """ API Request for a weather forecast from WeatherFlow's BetterForecast API.
+    If the validators of the previously downloaded forecast are specified, the
+    request is made conditional so that an unchanged forecast can be returned
+    as '304 Not Modified'
 
     INPUTS:
         Config              Station configuration
+        ETag                ETag of previously downloaded forecast
+        Modified            Last-Modified time of previously downloaded forecast
 
     OUTPUT:
         Response            API response containing latest WeatherFlow forecast
     """
 
+    # Define conditional request headers
+    Headers = {}
+    if ETag:
+        Headers['If-None-Match'] = ETag
+    if Modified:
+        Headers['If-Modified-Since'] = Modified
+
     # Download WeatherFlow forecast
     Template = 'https://swd.weatherflow.com/swd/rest/better_forecast?token={}&station_id={}&lat={}&lon={}'
     URL = Template.format(Config['Keys']['WeatherFlow'],Config['Station']['StationID'],Config['Station']['Latitude'],Config['Station']['Longitude'])
     try:
-        Data = requests.get(URL,timeout=int(Config['System']['Timeout']))
+        Data = requests.get(URL,headers=Headers,timeout=int(Config['System']['Timeout']))
     except:
         Data = None
 
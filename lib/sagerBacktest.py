@@ -0,0 +1,316 @@
+""" Backtests the Sager Weathercaster forecast used by the Raspberry Pi Python
+console for WeatherFlow Tempest and Smart Home Weather stations against stored
+or replayed station history.
+Copyright (C) 2018-2021 Peter Davis
+
+This program is free software: you can redistribute it and/or modify it under
+the terms of the GNU General Public License as published by the Free Software
+Foundation, either version 3 of the License, or (at your option) any later
+version.
+
+This program is distributed in the hope that it will be useful, but WITHOUT
+ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with
+this program. If not, see <http://www.gnu.org/licenses/>.
+
+Usage:
+    python -m lib.sagerBacktest history.csv [--config wfpiconsole.ini]
+                                            [--interval 3600] [--lead 12]
+
+The history file is a CSV file with a header row and the columns Time (UNIX
+timestamp), WindSpd (m/s), WindDir (degrees), Pres (station pressure, hPa),
+Temp (C) and Rain (mm per sample). An optional Weather column holds the present
+weather ('Clear', 'Partly Cloudy', 'Mostly Cloudy', 'Overcast' or
+'Precipitation') at each sample.
+"""
+
+# Disable the Kivy command line parser so that command line options are passed
+# to this script
+import os
+os.environ['KIVY_NO_ARGS'] = '1'
+
+# Import required library modules
+from lib import derivedVariables as derive
+from lib import sager
+
+# Import required Python modules
+import configparser
+import argparse
+import numpy as np
+import time
+import csv
+
+# Define global variables
+Window         = 15
+Period         = 6*3600
+PrecipExpected = frozenset(range(6,19))
+windBands      = {1: (13,25), 2: (25,39), 3: (39,55), 4: (55,74), 5: (74,np.inf)}
+windUnchanged  = 3
+
+# ==============================================================================
+# DEFINE HISTORY LOADING AND WINDOW FUNCTIONS
+# ==============================================================================
+def loadHistory(File):
+
+    """ Loads the station history from a CSV file
+
+    INPUTS:
+        File                Path to CSV file
+
+    OUTPUT:
+        History             Dictionary of Numpy arrays sorted by time
+    """
+
+    # Read CSV file, treating empty fields as missing
+    Columns = {}
+    with open(File,'r',newline='') as f:
+        for Row in csv.DictReader(f):
+            for Key,Value in Row.items():
+                Columns.setdefault(Key,[]).append(Value)
+
+    # Convert columns to Numpy arrays
+    History = {}
+    for Key in ['Time','WindSpd','WindDir','Pres','Temp','Rain']:
+        History[Key] = np.array([float(Value) if Value not in ('',None) else np.nan for Value in Columns[Key]],dtype=np.float64)
+    if 'Weather' in Columns:
+        History['Weather'] = np.array([Value if Value else None for Value in Columns['Weather']],dtype=object)
+
+    # Return history sorted by time
+    Order = np.argsort(History['Time'],kind='stable')
+    return {Key: Values[Order] for Key,Values in History.items()}
+
+def windowSum(Values,Start,End):
+
+    """ Returns the sum and the number of valid samples of Values over the
+    sample ranges [Start,End)
+
+    INPUTS:
+        Values              Array of samples
+        Start               Array of range start indices
+        End                 Array of range end indices
+    """
+
+    Valid = ~np.isnan(Values)
+    Sum   = np.concatenate(([0],np.cumsum(np.where(Valid,Values,0))))
+    Count = np.concatenate(([0],np.cumsum(Valid)))
+    return Sum[End] - Sum[Start], Count[End] - Count[Start]
+
+def windowMean(Values,Start,End):
+
+    """ Returns the mean of Values over the sample ranges [Start,End), ignoring
+    missing samples. Ranges with no valid samples are set to NaN
+    """
+
+    Sum,Count = windowSum(Values,Start,End)
+    with np.errstate(invalid='ignore',divide='ignore'):
+        return np.where(Count > 0,Sum/Count,np.nan)
+
+def windowCircularMean(Angles,Start,End):
+
+    """ Returns the circular mean of Angles in degrees over the sample ranges
+    [Start,End), ignoring missing samples
+    """
+
+    Radians   = np.radians(Angles)
+    Sin,Count = windowSum(np.sin(Radians),Start,End)
+    Cos,_     = windowSum(np.cos(Radians),Start,End)
+    return np.where(Count > 0,np.mod(np.degrees(np.arctan2(Sin,Cos)),360),np.nan)
+
+def windowMax(Values,Start,End):
+
+    """ Returns the maximum of Values over the sample ranges [Start,End) using a
+    sparse table, ignoring missing samples. Empty ranges are set to NaN
+    """
+
+    # Build sparse table of maxima over ranges of length 2^k, up to the
+    # longest query range
+    Length = End - Start
+    Table  = [np.asarray(Values,dtype=np.float64)]
+    while 2**len(Table) <= min(Length.max(initial=0),Values.size):
+        Previous = Table[-1]
+        Step     = 2**(len(Table)-1)
+        Table.append(np.fmax(Previous[:-Step],Previous[Step:]))
+
+    # Combine two overlapping power-of-two ranges for each query range
+    Max    = np.full(Length.shape,np.nan)
+    for Level in np.unique(np.floor(np.log2(Length[Length > 0])).astype(np.int64)):
+        Rows  = (Length > 0) & (np.floor(np.log2(np.maximum(Length,1))).astype(np.int64) == Level)
+        Max[Rows] = np.fmax(Table[Level][Start[Rows]],Table[Level][End[Rows] - 2**Level])
+    return Max
+
+# ==============================================================================
+# DEFINE BACKTEST FUNCTIONS
+# ==============================================================================
+def dialHistory(History,Config,Interval=3600,defaultWeather='Partly Cloudy'):
+
+    """ Evaluates the Sager Weathercaster Dial at regular issue times across the
+    station history, replicating the inputs used by sager.Generate
+
+    INPUTS:
+        History             Dictionary of Numpy arrays from loadHistory
+        Config              Station configuration
+        Interval            Interval between forecast issue times           [s]
+        defaultWeather      Present weather used when History has no Weather
+                            column
+
+    OUTPUT:
+        Issued              Dictionary of Numpy arrays describing each forecast
+    """
+
+    # Define forecast issue times and the index of the latest sample at each
+    Time   = History['Time']
+    Issue  = np.arange(Time[0] + Period,Time[-1] + 1,Interval)
+    Index  = np.searchsorted(Time,Issue,side='right') - 1
+    Start6 = np.searchsorted(Time,Issue - Period,side='left')
+
+    # Define current and 6 hour old sample windows
+    Now  = (np.maximum(Index + 1 - Window,0),Index + 1)
+    Then = (Start6,np.minimum(Start6 + Window,Time.size))
+
+    # Average wind, pressure and temperature over each window. Convert wind
+    # speed to miles per hour and pressure to sea level pressure
+    Geometry = derive.stationGeometry.fromConfig(Config)
+    WindSpd  = History['WindSpd']*2.23694
+    Issued = {'Time':     Issue,
+              'Index':    Index,
+              'WindDir6': windowCircularMean(History['WindDir'],*Then),
+              'WindDir':  windowCircularMean(History['WindDir'],*Now),
+              'WindSpd6': windowMean(WindSpd,*Then),
+              'WindSpd':  windowMean(WindSpd,*Now),
+              'Pres6':    Geometry.SLPArray(windowMean(History['Pres'],*Then)),
+              'Pres':     Geometry.SLPArray(windowMean(History['Pres'],*Now)),
+              'Temp':     windowMean(History['Temp'],*Now)}
+
+    # Calculate minutes since last rain at each issue time
+    Samples  = np.arange(Time.size)
+    lastRain = np.maximum.accumulate(np.where(History['Rain'] > 0,Samples,-1))[Index]
+    Issued['LastRain'] = np.where(lastRain >= 0,(Issue - Time[np.maximum(lastRain,0)])/60,np.inf)
+
+    # Define present weather at each issue time
+    if 'Weather' in History:
+        Weather = History['Weather'][Index]
+    else:
+        Weather = np.full(Issue.shape,defaultWeather,dtype=object)
+
+    # Evaluate Sager Weathercaster Dial for all issue times
+    Issued['DialSet'] = sager.dialSettingArray(float(Config['Station']['Latitude']),
+                                               Issued['WindDir6'],Issued['WindDir'],
+                                               Issued['WindSpd6'],Issued['WindSpd'],
+                                               Issued['Pres'],Issued['Pres6'],
+                                               Issued['LastRain'],Weather)
+    return Issued
+
+def verify(History,Issued,Lead=12):
+
+    """ Compares the Sager Weathercaster forecasts with the observed outcomes
+    over the lead time following each issue time
+
+    INPUTS:
+        History             Dictionary of Numpy arrays from loadHistory
+        Issued              Dictionary of Numpy arrays from dialHistory
+        Lead                Forecast lead time                          [hours]
+
+    OUTPUT:
+        Skill               Dictionary of forecast skill scores
+    """
+
+    # Look up the Expected Weather and Wind Velocity of each forecast
+    Key   = sager.compileForecastKey()
+    ID    = np.array([Key.Index.get(Dial,-1) for Dial in Issued['DialSet']],dtype=np.int64)
+    Parts = np.array(Key.Parts,dtype=object)
+    Valid = ID >= 0
+    Expected = np.array([Part[0] for Part in Parts[ID[Valid]]],dtype=np.int64)
+    Wind     = np.array([Part[1] for Part in Parts[ID[Valid]]],dtype=np.int64)
+
+    # Define lead time sample window following each forecast
+    Time  = History['Time']
+    Start = Issued['Index'][Valid] + 1
+    End   = np.searchsorted(Time,Issued['Time'][Valid] + Lead*3600,side='right')
+
+    # Verify precipitation forecasts against rainfall during lead time
+    Rain,_   = windowSum(History['Rain'],Start,End)
+    Forecast = np.isin(Expected,list(PrecipExpected))
+    Observed = Rain > 0
+    Hits        = int(np.sum(Forecast & Observed))
+    Misses      = int(np.sum(~Forecast & Observed))
+    FalseAlarms = int(np.sum(Forecast & ~Observed))
+    Correct     = int(np.sum(~Forecast & ~Observed))
+
+    # Verify wind velocity forecasts against the maximum and mean wind speed
+    # during the lead time
+    WindSpd  = History['WindSpd']*2.23694
+    Rolling  = windowMean(WindSpd,np.maximum(np.arange(Time.size) + 1 - Window,0),np.arange(Time.size) + 1)
+    maxWind  = windowMax(Rolling,Start,np.maximum(End,Start))
+    meanWind = windowMean(WindSpd,Start,np.maximum(End,Start))
+    Current  = Issued['WindSpd'][Valid]
+    windVerified = np.select([Wind == 0,Wind == 6,Wind == 7],
+                             [maxWind > Current,meanWind < Current,np.abs(meanWind - Current) <= windUnchanged],
+                             False)
+    for Band,(Lower,Upper) in windBands.items():
+        windVerified = np.where(Wind == Band,(maxWind >= Lower) & (maxWind < Upper),windVerified)
+
+    # Return forecast skill scores
+    Total = Hits + Misses + FalseAlarms + Correct
+    Skill = {'Forecasts':   int(Issued['DialSet'].size),
+             'Unavailable': int(np.sum(~Valid)),
+             'Hits':        Hits,
+             'Misses':      Misses,
+             'FalseAlarms': FalseAlarms,
+             'CorrectNegatives': Correct}
+    Skill['POD']      = Hits/(Hits + Misses)               if Hits + Misses               else np.nan
+    Skill['FAR']      = FalseAlarms/(Hits + FalseAlarms)   if Hits + FalseAlarms          else np.nan
+    Skill['CSI']      = Hits/(Hits + Misses + FalseAlarms) if Hits + Misses + FalseAlarms else np.nan
+    Skill['Accuracy'] = (Hits + Correct)/Total             if Total                       else np.nan
+    Chance = ((Hits + Misses)*(Hits + FalseAlarms) + (Correct + Misses)*(Correct + FalseAlarms))/Total if Total else np.nan
+    Skill['HSS']      = (Hits + Correct - Chance)/(Total - Chance) if Total and Total != Chance else np.nan
+    Skill['WindVerified'] = float(np.mean(windVerified)) if windVerified.size else np.nan
+    return Skill
+
+def run(History,Config,Interval=3600,Lead=12,defaultWeather='Partly Cloudy'):
+
+    """ Backtests the Sager Weathercaster forecast across the station history
+
+    INPUTS:
+        History             Dictionary of Numpy arrays from loadHistory, or
+                            replayed from any other source
+        Config              Station configuration
+        Interval            Interval between forecast issue times           [s]
+        Lead                Forecast lead time                          [hours]
+        defaultWeather      Present weather used when History has no Weather
+                            column
+
+    OUTPUT:
+        Skill               Dictionary of forecast skill scores
+    """
+
+    Issued = dialHistory(History,Config,Interval,defaultWeather)
+    return verify(History,Issued,Lead)
+
+# ==============================================================================
+# RUN BACKTEST FROM COMMAND LINE
+# ==============================================================================
+if __name__ == '__main__':
+
+    # Parse command line arguments
+    Parser = argparse.ArgumentParser(description='Backtest the Sager Weathercaster forecast')
+    Parser.add_argument('history',help='CSV file of station history')
+    Parser.add_argument('--config',default='wfpiconsole.ini',help='Station configuration file')
+    Parser.add_argument('--interval',type=int,default=3600,help='Interval between forecasts [s]')
+    Parser.add_argument('--lead',type=float,default=12,help='Forecast lead time [hours]')
+    Parser.add_argument('--weather',default='Partly Cloudy',help='Present weather if not in history')
+    Args = Parser.parse_args()
+
+    # Load station configuration and history
+    Config = configparser.ConfigParser(allow_no_value=True)
+    Config.optionxform = str
+    Config.read(Args.config)
+    History = loadHistory(Args.history)
+
+    # Run backtest and print forecast skill scores
+    Start = time.time()
+    Skill = run(History,Config,Args.interval,Args.lead,Args.weather)
+    for Key,Value in Skill.items():
+        print('{:<18}{}'.format(Key,round(Value,3) if isinstance(Value,float) else Value))
+    print('{:<18}{:.2f} s'.format('Runtime',time.time() - Start))
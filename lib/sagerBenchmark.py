@@ -0,0 +1,235 @@
+""" Benchmarks the compiled Sager Weather Prediction Key used by the Raspberry
+Pi Python console for WeatherFlow Tempest and Smart Home Weather stations, and
+checks that it produces the same forecasts as the original implementation.
+Copyright (C) 2018-2021 Peter Davis
+
+This program is free software: you can redistribute it and/or modify it under
+the terms of the GNU General Public License as published by the Free Software
+Foundation, either version 3 of the License, or (at your option) any later
+version.
+
+This program is distributed in the hope that it will be useful, but WITHOUT
+ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with
+this program. If not, see <http://www.gnu.org/licenses/>.
+
+Usage:
+    python -m lib.sagerBenchmark [--number 2000]
+
+The original implementation built a dictionary of every forecast for all 4991
+Weather Dial settings each time a forecast was requested. The reference
+digests below were generated from that dictionary for each combination of
+precipitation type, wind speed units and latitude zone. Each digest is the
+SHA-256 hash of the sorted "Dial<TAB>Forecast<NEWLINE>" lines of the
+dictionary. The equivalence check renders the same lines through getForecast
+and compares them against the reference digests.
+"""
+
+# Disable the Kivy command line parser so that command line options are passed
+# to this script
+import os
+os.environ['KIVY_NO_ARGS'] = '1'
+
+# Import required library modules
+from lib import sager
+
+# Import required Python modules
+import argparse
+import hashlib
+import timeit
+import sys
+
+# Define global variables
+Temps = {'Snow': -5, 'Mixed': 0, 'Rain': 10}
+Lats  = {'North Tropical': 10, 'North Temperate': 45, 'South Tropical': -10, 'South Temperate': -45}
+Units = ['mph','lfm','kph','kts','bft','mps']
+
+# Define SHA-256 digests of the original Sager Weather Prediction Key for each
+# (Precipitation type, Wind speed units, Latitude zone) combination
+referenceDigests = {('Snow','mph','North Tropical'):      'ab503651ab38d2519794b946ca9aaedf00f76a004e955c3f7888417d38d974aa',
+                    ('Snow','mph','North Temperate'):     'd8d53c94aa4ed8d803560fae3eb13ac714459599ebf28f06bc2be1e49709a74d',
+                    ('Snow','mph','South Tropical'):      '0017f23483b0693b7bdd4d85d5938f3d14b10fadcdc6088addb914fdf034c64b',
+                    ('Snow','mph','South Temperate'):     '3497127006e4df363a166c9866afdd576e34d9dbf340f8b4dfd27ede97137305',
+                    ('Snow','lfm','North Tropical'):      'ab503651ab38d2519794b946ca9aaedf00f76a004e955c3f7888417d38d974aa',
+                    ('Snow','lfm','North Temperate'):     'd8d53c94aa4ed8d803560fae3eb13ac714459599ebf28f06bc2be1e49709a74d',
+                    ('Snow','lfm','South Tropical'):      '0017f23483b0693b7bdd4d85d5938f3d14b10fadcdc6088addb914fdf034c64b',
+                    ('Snow','lfm','South Temperate'):     '3497127006e4df363a166c9866afdd576e34d9dbf340f8b4dfd27ede97137305',
+                    ('Snow','kph','North Tropical'):      'f5389437cc13c4c5870286d6897cdc4d3888b9a66a00a15ccc3a4408cb142ef9',
+                    ('Snow','kph','North Temperate'):     'd8d6ff00b287604a83d198aa1542ab858f590e1c502f08f3966992474096566a',
+                    ('Snow','kph','South Tropical'):      '5ba82113d480c6516f696b250a7ef9d2ec50858e44c0f5b819c5e991280cad82',
+                    ('Snow','kph','South Temperate'):     '77bc1116086951a41ae4ef119875b7c6ed4ab0e6cd72e52b6c00764aabc75197',
+                    ('Snow','kts','North Tropical'):      '29a7f774993bb5a717e5a5e100d3ddcffe5a89229bdb785131bee91d5fe3e1e0',
+                    ('Snow','kts','North Temperate'):     'bcae5acb94a67056ffb9f0d86bad555792756a1d028adc8ed8149c320e28adba',
+                    ('Snow','kts','South Tropical'):      '1593f954ca60f7f0d1748d04d452241def2f1013b0b9f1e4e748bd150ece8b87',
+                    ('Snow','kts','South Temperate'):     '8f99fe67861c39c344d9a1903eb84bd419655134c6270ba8b14b97931db4ab93',
+                    ('Snow','bft','North Tropical'):      'be4e13f12ed03a0404b541b0667e782ccbdf293cb7631d6099115a60ce236050',
+                    ('Snow','bft','North Temperate'):     'b93517d75dc3b1628a00501c467e85fde88d2f4048b4e22caf66a284c90f4e5b',
+                    ('Snow','bft','South Tropical'):      '55f366186ad8afd0c9e200df7b624f16022429421c1d091ecedc55ce1e76e0b6',
+                    ('Snow','bft','South Temperate'):     '6f85596f06ade6366fc31df1bbe9589a8032512dc93ede1f0f3b097a3232c07b',
+                    ('Snow','mps','North Tropical'):      'dae63bfabe4c50d56e48e636b30a6dbdf4f6410dacf3b1686666f9c70571bb30',
+                    ('Snow','mps','North Temperate'):     '333f8a36364982f96aca31d6eec5417f3d45e39d8b53ec0369481ae42ea97906',
+                    ('Snow','mps','South Tropical'):      '4e0b01427cf73b12ece9fec95f3233ed6f224ed461fedb58eb76418ed52a9da2',
+                    ('Snow','mps','South Temperate'):     'f0ed60e9c466ed03dec4762bf70058fc13c8de1b443a552bd3508ee9dbddd813',
+                    ('Mixed','mph','North Tropical'):     'a5fb7f999fbab171fa576e1fa0b54d0e9a79108512c0bc50937eced2f67292b3',
+                    ('Mixed','mph','North Temperate'):    '23ed81b9f7291a5da5046fb064469b315ca5e0e2099c73c802c8e6b3c9dc4d8c',
+                    ('Mixed','mph','South Tropical'):     '51c3f3c1ce5b9db4bfceb372a7d9429e3ea2ed4bc2c3a94cea5afe94272573d4',
+                    ('Mixed','mph','South Temperate'):    'a0cc05d688856b74f80b2a983a0fe64a5af8f4716a97737d0d79d5086b3c1874',
+                    ('Mixed','lfm','North Tropical'):     'a5fb7f999fbab171fa576e1fa0b54d0e9a79108512c0bc50937eced2f67292b3',
+                    ('Mixed','lfm','North Temperate'):    '23ed81b9f7291a5da5046fb064469b315ca5e0e2099c73c802c8e6b3c9dc4d8c',
+                    ('Mixed','lfm','South Tropical'):     '51c3f3c1ce5b9db4bfceb372a7d9429e3ea2ed4bc2c3a94cea5afe94272573d4',
+                    ('Mixed','lfm','South Temperate'):    'a0cc05d688856b74f80b2a983a0fe64a5af8f4716a97737d0d79d5086b3c1874',
+                    ('Mixed','kph','North Tropical'):     'dc60dcbfac1b2efa1a361dbbfe68bdacc800290760b1dbf6d0a0c584aee46fc6',
+                    ('Mixed','kph','North Temperate'):    'd8a12b6d2db9550200089c274f8092c81772cf031a2a4a4462fbc0f29adcca38',
+                    ('Mixed','kph','South Tropical'):     '473a8dc90bbf82b8e6c37c5903519cee4ed7cb8f19498c5bb0045a8c4dc5bb44',
+                    ('Mixed','kph','South Temperate'):    '7acfc6460670e021d48ca491cb2154b6f22bf07fc5c039736f66249450ffe113',
+                    ('Mixed','kts','North Tropical'):     '63f96ee16888f04648c5547b44ee17b553e65dea2ce8278e570bd6b25dec307b',
+                    ('Mixed','kts','North Temperate'):    '124057c0419b4ab73be8094c80ea54050e52eb53588796ae62d7ed7de2195187',
+                    ('Mixed','kts','South Tropical'):     '565be77f42a5182f2a7b0026251ef3ec866f9ea347e7726d2495fc13dc57b1a7',
+                    ('Mixed','kts','South Temperate'):    'af277c754e6820e22a4514ac358b502103c080c6424c52c3abb3d73140ff996e',
+                    ('Mixed','bft','North Tropical'):     'd8a773843352c8a1b1be7dda1c7ee20feb5b847237a85cac62b24ffd12809b30',
+                    ('Mixed','bft','North Temperate'):    'c7d566fcaa065d4edb6df36062e576da5d66e958da02afc9f4aa84b23061da29',
+                    ('Mixed','bft','South Tropical'):     '4c8c97f34999a79843661476de45623aec8d896d7534b77e0852cd9f7d1f259d',
+                    ('Mixed','bft','South Temperate'):    '7da8ff4a8ff178824f176ee7fe8ba62ca5487ecc098f026fc2120488a4d63640',
+                    ('Mixed','mps','North Tropical'):     '400013db43f44f79306d3a7ca9302617bb754ce4a13bad436445566f44a21447',
+                    ('Mixed','mps','North Temperate'):    '9fdbd80d5a8ba39dfa71928a18e91a7096efa86454cc9931cbbf83fbcffefcfd',
+                    ('Mixed','mps','South Tropical'):     '6dcde1d0edc564237de62cfa8a011952786b70f320061ac11842776cba14fdc6',
+                    ('Mixed','mps','South Temperate'):    'd2e37ec282428f7484cf61beb304b1db5ff85ca1d10af67bb1162b8a08313012',
+                    ('Rain','mph','North Tropical'):      '2e89845a69a748e9d37ca4291681aac1cf78dac3baf3280a2605f47643af1ac1',
+                    ('Rain','mph','North Temperate'):     '45cd13a946532226003095c461a92bd51d2e967fa7c6d0af8f90cb329a23971b',
+                    ('Rain','mph','South Tropical'):      'b99ff58e7bc279e2056d2cf194426ecb2a86363b8604e4a834782579e6963016',
+                    ('Rain','mph','South Temperate'):     '8b683e657dc39520dcfbf5a1b01cf2c8019ad01ddd7d00229bdb06d8334037af',
+                    ('Rain','lfm','North Tropical'):      '2e89845a69a748e9d37ca4291681aac1cf78dac3baf3280a2605f47643af1ac1',
+                    ('Rain','lfm','North Temperate'):     '45cd13a946532226003095c461a92bd51d2e967fa7c6d0af8f90cb329a23971b',
+                    ('Rain','lfm','South Tropical'):      'b99ff58e7bc279e2056d2cf194426ecb2a86363b8604e4a834782579e6963016',
+                    ('Rain','lfm','South Temperate'):     '8b683e657dc39520dcfbf5a1b01cf2c8019ad01ddd7d00229bdb06d8334037af',
+                    ('Rain','kph','North Tropical'):      '4c499d4d883b8d38530f87831dab27b1729ee90d6b42ac711a98588207913757',
+                    ('Rain','kph','North Temperate'):     '3762e12127952ee0636d869aa650b3db655d4ba338a53c13c49a58fcfd76b6d5',
+                    ('Rain','kph','South Tropical'):      '946721b73371b68ac2b5b8587a9d806664e47b0cdbbb54db976d06f3b7e79c1c',
+                    ('Rain','kph','South Temperate'):     'da9aaac5c74a95cda429cf129f9480d8bc6eae1731f36e839635582331e74047',
+                    ('Rain','kts','North Tropical'):      'b47ba800fe85cf0e0d991233a6af0b3aa6b7a48eb84297103043e1673933fe48',
+                    ('Rain','kts','North Temperate'):     'f0a0a2fd3bffb6a7407d220799f29052d660d685bdbbccc0610dd9e1668e6ad5',
+                    ('Rain','kts','South Tropical'):      'bc5001a8a7b1cbfee6a946c14c810c40405d8dad25b95a76a80729ba91bab6f7',
+                    ('Rain','kts','South Temperate'):     '36883b1f00c829b54a8fe1a5b5480bdf790837d24bbf49b13e84ac1c07634775',
+                    ('Rain','bft','North Tropical'):      '20ed12f7cc1cb8e94733111e3107e39b1f2c3d7a7eefbc2a8bc92b21e5472b3a',
+                    ('Rain','bft','North Temperate'):     '0d9a2625c74e704a2ac567479819e3ee41df5a6b30526190423e60b2e70503f0',
+                    ('Rain','bft','South Tropical'):      '1998bd92e86b32f0d9681d9772fd6c8eb4b700b2beb719368aa380ddf62da4ec',
+                    ('Rain','bft','South Temperate'):     '8bf392615d8f8f0caa411d6118df45f341c092edbd2beb74ce2e5077249e2668',
+                    ('Rain','mps','North Tropical'):      '9cffd447f7b5ca9ee2f02081234b5707277ea05f686d3834ff3e16cdc7f80d58',
+                    ('Rain','mps','North Temperate'):     '4c2774658fc34c0560eed79d9dd5bd159aef2513a66b45c3b580d3c49a6fa83f',
+                    ('Rain','mps','South Tropical'):      'd7d72aac6c261eeb1715aaa3199f8c9ab133102ecdcce81a7bfdf52fc8adbf2a',
+                    ('Rain','mps','South Temperate'):     '53a148ce869ddd88085777460bf8d42db5b8c54954f673d1b49ba911c4d9ff85'}
+
+# ==============================================================================
+# DEFINE EQUIVALENCE CHECK AND BENCHMARK FUNCTIONS
+# ==============================================================================
+def digest(Forecasts):
+
+    """ Returns the SHA-256 digest of a Sager Weather Prediction Key
+
+    INPUTS:
+        Forecasts           Dictionary mapping each Weather Dial setting onto
+                            its forecast text
+
+    OUTPUT:
+        Digest              Hexadecimal SHA-256 digest
+    """
+
+    Lines = ''.join('{}\t{}\n'.format(Dial,Forecasts[Dial]) for Dial in sorted(Forecasts))
+    return hashlib.sha256(Lines.encode('utf-8')).hexdigest()
+
+def legacyForecast(Sager):
+
+    """ Reproduces the per-call work of the original implementation, which
+    rendered every forecast and built the dictionary for all Weather Dial
+    settings each time a forecast was requested. Used as the benchmark
+    baseline
+
+    INPUTS:
+        Sager               Dictionary containing the DialSet, Lat, Temp and
+                            Units fields
+
+    OUTPUT:
+        Forecast            Sager Weathercaster forecast text
+    """
+
+    Forecasts = sager.renderForecasts.__wrapped__(sager.precipitationType(Sager['Temp']),
+                                                  Sager['Units'],
+                                                  sager.latitudeZone(Sager['Lat']))
+    WeatherPredictionKey = {Dial: Forecasts[ID] for Dial,ID in sager.compileForecastKey().Index.items()}
+    return WeatherPredictionKey.get(Sager['DialSet'],'Forecast Unavailable')
+
+def checkEquivalence():
+
+    """ Checks that getForecast returns the forecast of the original
+    implementation for every Weather Dial setting in every combination of
+    precipitation type, wind speed units and latitude zone
+
+    OUTPUT:
+        Mismatches          List of combinations whose forecasts differ
+    """
+
+    Dials = list(sager.compileForecastKey().Index)
+    Mismatches = []
+    for Precip,Temp in Temps.items():
+        for Unit in Units:
+            for Zone,Lat in Lats.items():
+                Forecasts = {Dial: sager.getForecast({'DialSet': Dial, 'Lat': Lat, 'Temp': Temp, 'Units': Unit}) for Dial in Dials}
+                if digest(Forecasts) != referenceDigests[(Precip,Unit,Zone)]:
+                    Mismatches.append((Precip,Unit,Zone))
+
+    # Unknown Weather Dial settings return the unavailable forecast
+    if sager.getForecast({'DialSet': '', 'Lat': 45, 'Temp': 10, 'Units': 'mph'}) != 'Forecast Unavailable':
+        Mismatches.append(('Unknown dial',))
+    return Mismatches
+
+def benchmark(Func,Number):
+
+    """ Returns the mean time taken to return a forecast, cycling through every
+    Weather Dial setting and combination of precipitation type, wind speed
+    units and latitude zone
+
+    INPUTS:
+        Func                Function returning a forecast from a Sager
+                            dictionary
+        Number              Number of forecasts to time
+
+    OUTPUT:
+        Time                Mean time per forecast                         [us]
+    """
+
+    Dials = list(sager.compileForecastKey().Index)
+    Cases = [{'DialSet': Dials[ii % len(Dials)],
+              'Lat':     list(Lats.values())[ii % len(Lats)],
+              'Temp':    list(Temps.values())[ii % len(Temps)],
+              'Units':   Units[ii % len(Units)]} for ii in range(Number)]
+    Func(Cases[0])
+    Iterator = iter(Cases)
+    return timeit.timeit(lambda: Func(next(Iterator)),number=Number)/Number*1e6
+
+# ==============================================================================
+# RUN EQUIVALENCE CHECK AND BENCHMARK FROM COMMAND LINE
+# ==============================================================================
+if __name__ == '__main__':
+
+    # Parse command line arguments
+    Parser = argparse.ArgumentParser(description='Benchmark the compiled Sager Weather Prediction Key')
+    Parser.add_argument('--number',type=int,default=2000,help='Number of forecasts to time')
+    Args = Parser.parse_args()
+
+    # Check compiled Sager Weather Prediction Key against original forecasts
+    Mismatches = checkEquivalence()
+    for Mismatch in Mismatches:
+        print('Mismatch: {}'.format(', '.join(Mismatch)))
+    print('{:<18}{}'.format('Equivalent',not Mismatches))
+
+    # Benchmark original and compiled forecast lookup
+    Legacy   = benchmark(legacyForecast,Args.number)
+    Compiled = benchmark(sager.getForecast,Args.number)
+    print('{:<18}{:.1f} us'.format('Original',Legacy))
+    print('{:<18}{:.1f} us'.format('Compiled',Compiled))
+    print('{:<18}{:.0f}x'.format('Speedup',Legacy/Compiled))
+
+    # Exit with error status if forecasts differ
+    sys.exit(1 if Mismatches else 0)
@@ -0,0 +1,168 @@
+""" Lazily loads the Sager Weathercaster forecast required by the Raspberry Pi
+Python console for WeatherFlow Tempest and Smart Home Weather stations.
+Copyright (C) 2018-2021 Peter Davis
+
+This program is free software: you can redistribute it and/or modify it under
+the terms of the GNU General Public License as published by the Free Software
+Foundation, either version 3 of the License, or (at your option) any later
+version.
+
+This program is distributed in the hope that it will be useful, but WITHOUT
+ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with
+this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+# Import required modules
+from concurrent.futures import ThreadPoolExecutor
+from lib                import profiler
+from lib                import deviceHistory
+from kivy.clock         import Clock, mainthread
+from functools          import partial
+from threading          import Lock
+import importlib
+
+# Define global variables
+Module      = None
+Executor    = None
+Started     = False
+serviceLock = Lock()
+errorText   = '[color=f05e40ff]ERROR:[/color] Forecast will be regenerated in 60 minutes'
+
+def required(Config):
+
+    """ Returns True if the Sager Weathercaster panel is displayed as either a
+    primary or secondary panel
+
+    INPUTS:
+        Config              Station configuration
+    """
+
+    for Section in ['PrimaryPanels','SecondaryPanels']:
+        if 'Sager' in Config[Section].values():
+            return True
+    return False
+
+def load():
+
+    """ Returns the Sager Weathercaster module, importing it the first time it
+    is requested
+    """
+
+    global Module
+    with serviceLock:
+        if Module is None:
+            Module = importlib.import_module('lib.sager')
+        return Module
+
+def getExecutor():
+
+    """ Returns the single worker thread used to generate the Sager
+    Weathercaster forecast, creating it the first time it is requested
+    """
+
+    global Executor
+    with serviceLock:
+        if Executor is None:
+            Executor = ThreadPoolExecutor(max_workers=1,thread_name_prefix='Sager')
+        return Executor
+
+def run(Config):
+
+    """ Imports the Sager Weathercaster module and generates the Sager
+    Weathercaster forecast. Runs on the worker thread
+
+    INPUTS:
+        Config              Station configuration
+
+    OUTPUT:
+        Result              Dictionary containing the Sager Weathercaster
+                            forecast and the time until the next forecast
+    """
+
+    Result = {}
+    load().Generate(Result,Config)
+    return Result
+
+@profiler.timed
+def submit(Sager,Config,*largs):
+
+    """ Submits the generation of the Sager Weathercaster forecast to the worker
+    thread. Only submission runs on the calling thread, so this function can be
+    scheduled with the Kivy clock without blocking the UI thread
+
+    INPUTS:
+        Sager               Dictionary holding the Sager Weathercaster forecast
+        Config              Station configuration
+    """
+
+    Future = getExecutor().submit(run,Config)
+    Future.add_done_callback(partial(post,Sager,Config))
+
+@mainthread
+@profiler.timed
+def post(Sager,Config,Future):
+
+    """ Posts the Sager Weathercaster forecast generated by the worker thread
+    back to the console on the UI thread, and schedules the next forecast
+
+    INPUTS:
+        Sager               Dictionary holding the Sager Weathercaster forecast
+        Config              Station configuration
+        Future              Completed forecast generation
+    """
+
+    # Extract generated forecast. If generation has failed, display error
+    # message and retry in 60 minutes
+    try:
+        Result = Future.result()
+    except Exception:
+        Result = {'Forecast': errorText, 'Schedule': 3600}
+    Schedule = Result.pop('Schedule',3600)
+
+    # Update Sager Weathercaster forecast displayed on console
+    for Key,Value in Result.items():
+        Sager[Key] = Value
+
+    # Schedule generation of next Sager Weathercaster forecast
+    Clock.schedule_once(partial(submit,Sager,Config),Schedule)
+
+def start(Sager,Config):
+
+    """ Starts the Sager Weathercaster forecast on the worker thread if the
+    Sager Weathercaster panel is displayed and the forecast has not already been
+    started. The Sager Weathercaster module is imported on the worker thread so
+    that it is not loaded on the UI thread. Device observations are only
+    buffered in the observation history once the forecast has been started
+
+    INPUTS:
+        Sager               Dictionary holding the Sager Weathercaster forecast
+        Config              Station configuration
+
+    OUTPUT:
+        Started             True if the forecast has been started
+    """
+
+    global Started
+    with serviceLock:
+        if Started or not required(Config):
+            return False
+        Started = True
+    deviceHistory.enable()
+    submit(Sager,Config)
+    return True
+
+def getForecast(Dial):
+
+    """ Returns the Sager Weathercaster forecast for the specified Sager
+    Weathercaster Dial position
+
+    INPUTS:
+        Dial                Dictionary holding the Sager Weathercaster Dial
+                            position, station latitude, temperature and wind
+                            speed units
+    """
+
+    return load().getForecast(Dial)
@@ -0,0 +1,278 @@
+""" Integrates the solar radiation observations into the daily solar energy and
+peak sun hours required by the Raspberry Pi Python console for WeatherFlow
+Tempest and Smart Home Weather stations.
+Copyright (C) 2018-2021 Peter Davis
+
+This program is free software: you can redistribute it and/or modify it under
+the terms of the GNU General Public License as published by the Free Software
+Foundation, either version 3 of the License, or (at your option) any later
+version.
+
+This program is distributed in the hope that it will be useful, but WITHOUT
+ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with
+this program. If not, see <http://www.gnu.org/licenses/>.
+"""
+
+# Import required library modules
+from lib import requestAPI
+
+# Import required Python modules
+from datetime import datetime
+import numpy  as np
+import threading
+import json
+import math
+import pytz
+import os
+
+# Define global variables
+NaN             = float('NaN')
+File            = 'solarIntegrator.json'
+MaxGap          = 1800
+CheckpointEvery = 300
+Integrators     = {}
+integratorLock  = threading.Lock()
+fileLock        = threading.Lock()
+
+def get(Device,Config):
+
+    """ Returns the solar energy integrator for the specified device, loading
+    its checkpoint from disk the first time it is requested
+
+    INPUTS:
+        Device              Device ID
+        Config              Station configuration
+
+    OUTPUT:
+        Integrator          Solar energy integrator for the specified device
+    """
+
+    with integratorLock:
+        if Device not in Integrators:
+            Integrators[Device] = Integrator(Device,Config)
+        return Integrators[Device]
+
+def trapezoidEnergy(Time,Radiation):
+
+    """ Integrates solar radiation over the sample times using the trapezoidal
+    rule. Missing samples are removed so that the integration bridges the gap
+    between the neighbouring valid samples
+
+    INPUTS:
+        Time                Sample times                                  [s]
+        Radiation           Solar radiation                           [W/m^2]
+
+    OUTPUT:
+        Energy              Solar energy                             [Wh/m^2]
+    """
+
+    # Remove missing samples
+    Time      = np.asarray(Time,dtype=np.float64)
+    Radiation = np.asarray(Radiation,dtype=np.float64)
+    Valid     = ~(np.isnan(Time) | np.isnan(Radiation))
+    Time      = Time[Valid]
+    Radiation = Radiation[Valid]
+
+    # Integrate solar radiation and convert to watt-hours
+    if Time.size < 2:
+        return 0.0
+    return float(np.sum((Radiation[1:] + Radiation[:-1]) * np.diff(Time)) / 2 / 3600)
+
+class Integrator(object):
+
+    """ Streaming trapezoidal integrator of the solar energy received since
+    midnight station time. The integrator state is checkpointed to disk so that
+    the console can be restarted without downloading the data for the current
+    day, provided the restart does not leave a gap longer than MaxGap
+
+    INPUTS:
+        Device              Device ID
+        Config              Station configuration
+    """
+
+    def __init__(self,Device,Config):
+        self.Device    = str(Device)
+        self.Config    = Config
+        self.Lock      = threading.RLock()
+        self.Date      = None
+        self.Time      = NaN
+        self.Radiation = NaN
+        self.Energy    = NaN
+        self.Saved     = 0
+        self.load()
+
+    def midnight(self,Time):
+
+        """ Returns the date and the UNIX timestamp of midnight station time for
+        the specified sample time
+
+        INPUTS:
+            Time            Sample time                                   [s]
+        """
+
+        Tz   = pytz.timezone(self.Config['Station']['Timezone'])
+        Date = datetime.fromtimestamp(Time,Tz).date()
+        return Date, Tz.localize(datetime(Date.year,Date.month,Date.day)).timestamp()
+
+    def load(self):
+
+        """ Loads the integrator state from the checkpoint on disk
+        """
+
+        with fileLock:
+            if not os.path.isfile(File):
+                return
+            try:
+                with open(File,'r') as f:
+                    Stored = json.load(f).get(self.Device)
+            except (OSError,ValueError):
+                return
+        if Stored:
+            with self.Lock:
+                self.Date      = datetime.strptime(Stored['Date'],'%Y-%m-%d').date()
+                self.Time      = Stored['Time']
+                self.Radiation = Stored['Radiation']
+                self.Energy    = Stored['Energy']
+                self.Saved     = Stored['Time']
+
+    def save(self):
+
+        """ Saves the integrator state to the checkpoint on disk
+        """
+
+        with self.Lock:
+            Entry = {'Date':      self.Date.isoformat(),
+                     'Time':      self.Time,
+                     'Radiation': self.Radiation,
+                     'Energy':    self.Energy}
+            self.Saved = self.Time
+        with fileLock:
+            Stored = {}
+            if os.path.isfile(File):
+                try:
+                    with open(File,'r') as f:
+                        Stored = json.load(f)
+                except (OSError,ValueError):
+                    Stored = {}
+            Stored[self.Device] = Entry
+            with open(File,'w') as f:
+                json.dump(Stored,f)
+
+    def backfill(self,Time,Radiation):
+
+        """ Resets the integrator using the solar radiation observations from
+        a historical range, integrating only the samples since midnight station
+        time on the day of the last sample
+
+        INPUTS:
+            Time            Sample times                                  [s]
+            Radiation       Solar radiation                           [W/m^2]
+        """
+
+        Time      = np.asarray(Time,dtype=np.float64)
+        Radiation = np.asarray(Radiation,dtype=np.float64)
+        Valid     = ~(np.isnan(Time) | np.isnan(Radiation))
+        with self.Lock:
+            if not Valid.any():
+                self.Date, self.Time, self.Radiation, self.Energy = None, NaN, NaN, NaN
+                return
+            Date, Midnight = self.midnight(Time[Valid][-1])
+            Today = Valid & (Time >= Midnight)
+            self.Date      = Date
+            self.Time      = float(Time[Today][-1])
+            self.Radiation = float(Radiation[Today][-1])
+            self.Energy    = trapezoidEnergy(Time[Today],Radiation[Today])
+        self.save()
+
+    def download(self):
+
+        """ Backfills the integrator with the solar radiation observations for
+        the current day from the WeatherFlow API. The integrator state is left
+        unchanged if the API call fails
+
+        OUTPUT:
+            Success         True if the integrator has been backfilled
+        """
+
+        # Download solar radiation data for current day
+        Data = requestAPI.weatherflow.Today(self.Device,self.Config)
+
+        # Backfill integrator if API call has succeeded
+        if requestAPI.weatherflow.verifyResponse(Data,'obs'):
+            Data  = Data.json()['obs']
+            Index = 10 if self.Config['Station']['SkyID'] else 11
+            Obs   = np.array([[item[0],item[Index] if item[Index] != None else NaN] for item in Data],dtype=np.float64).reshape(-1,2)
+            self.backfill(Obs[:,0],Obs[:,1])
+            return True
+        return False
+
+    def add(self,Time,Radiation):
+
+        """ Adds the latest solar radiation observation to the integrator
+
+        INPUTS:
+            Time            Sample time                                   [s]
+            Radiation       Solar radiation                           [W/m^2]
+
+        OUTPUT:
+            Energy          Solar energy since midnight station time [Wh/m^2]
+        """
+
+        # Backfill integrator from the WeatherFlow API if it has no state, or if
+        # the gap since the last sample is too long to integrate across
+        if math.isnan(self.Time) or Time[0] - self.Time > MaxGap:
+            Success = self.download()
+            with self.Lock:
+                Date, _ = self.midnight(Time[0])
+
+                # If the API call has failed but the integrator holds the energy
+                # received earlier today, resume integrating from the latest
+                # sample without integrating across the gap
+                if not Success and self.Date == Date and not math.isnan(self.Energy):
+                    self.Time      = Time[0]
+                    self.Radiation = Radiation[0] if not math.isnan(Radiation[0]) else 0
+
+                # Else if the API call has failed and there is no state for
+                # today, the energy received today is unknown. The download is
+                # retried with the next sample
+                elif not Success:
+                    self.Date, self.Time, self.Radiation, self.Energy = None, NaN, NaN, NaN
+
+                # Else if no solar radiation has been recorded today, start
+                # integrating from the latest sample
+                elif math.isnan(self.Time) or self.Date != Date:
+                    self.Date      = Date
+                    self.Time      = Time[0]
+                    self.Radiation = Radiation[0] if not math.isnan(Radiation[0]) else 0
+                    self.Energy    = 0.0
+            return self.Energy
+
+        # Ignore missing and duplicate samples
+        if math.isnan(Radiation[0]) or Time[0] <= self.Time:
+            return self.Energy
+
+        # Integrate solar radiation since last sample. If midnight has passed,
+        # only integrate the part of the interval after midnight
+        with self.Lock:
+            Date, Midnight = self.midnight(Time[0])
+            if Date != self.Date:
+                if self.Time < Midnight:
+                    Fraction = (Midnight - self.Time)/(Time[0] - self.Time)
+                    Start    = self.Radiation + Fraction*(Radiation[0] - self.Radiation)
+                    self.Energy = trapezoidEnergy([Midnight,Time[0]],[Start,Radiation[0]])
+                else:
+                    self.Energy = trapezoidEnergy([self.Time,Time[0]],[self.Radiation,Radiation[0]])
+                self.Date = Date
+            else:
+                self.Energy += trapezoidEnergy([self.Time,Time[0]],[self.Radiation,Radiation[0]])
+            self.Time      = Time[0]
+            self.Radiation = Radiation[0]
+            Checkpoint     = self.Time - self.Saved >= CheckpointEvery
+
+        # Checkpoint integrator state to disk
+        if Checkpoint:
+            self.save()
+        return self.Energy
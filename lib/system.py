@@ -17,6 +17,7 @@ this program. If not, see <http://www.gnu.org/licenses/>.
 
 # Import required library modules
 from lib import requestAPI
+from lib import profiler
 
 # Import required Python modules
 from kivy.clock import Clock
@@ -29,6 +30,7 @@ import pytz
 # Define global variables
 NaN = float('NaN')
 
+@profiler.timed
 def realtimeClock(System,Config,*largs):
 
     """ Realtime clock in station timezone
@@ -66,6 +68,7 @@ def realtimeClock(System,Config,*largs):
     # Return system information
     return System
 
+@profiler.timed
 def checkVersion(verData,Config,updateNotif,*largs):
 
     """ Checks current version of the PiConsole against the latest available
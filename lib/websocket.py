@@ -20,10 +20,116 @@ from kivy.clock     import mainthread
 from lib            import derivedVariables   as derive
 from lib            import observationFormat  as observation
 from lib            import requestAPI
+from lib            import deviceHistory
+from lib            import panelPool
+from lib            import profiler
+from lib.derivedGraph import Graph, Node, Output
+from lib.measurement  import Measurement
 import time
 
 # Define global variables
 NaN = float('NaN')
+rapidLatest = {}
+strikeLatest = {}
+
+# ==============================================================================
+# DEFINE DERIVED VARIABLE DEPENDENCY GRAPHS
+# ==============================================================================
+# Define derived variables calculated from the latest device observations.
+# Volatile derived variables depend on stored state, the current time, or API
+# requests and are recalculated for every message. Derived variables with
+# stored state read back their own previous value from the dependency graph,
+# which is None until they are first calculated
+DewPoint     = Node('DewPoint',     lambda V,C: derive.DewPoint(V['Temp'],V['Humidity']),
+                    Inputs=['Temp','Humidity'])
+SLP          = Node('SLP',          lambda V,C: derive.SLP(V['Pres'],C),
+                    Inputs=['Pres'],
+                    Config=[('Station','Elevation'),('Station','OutAirHeight'),('Station','TempestHeight')])
+FeelsLike    = Node('FeelsLike',    lambda V,C: derive.FeelsLike(V['Temp'],V['Humidity'],V['WindSpd'],C),
+                    Inputs=['Temp','Humidity','WindSpd'],
+                    Config=[('Units','Temp'),('FeelsLike',None)])
+RainRate     = Node('RainRate',     lambda V,C: derive.RainRate(V['minutRain']),
+                    Inputs=['minutRain'])
+Beaufort     = Node('Beaufort',     lambda V,C: derive.BeaufortScale(V['WindSpd']),
+                    Inputs=['WindSpd'])
+CardinalDir  = Node('CardinalDir',  lambda V,C: derive.CardinalWindDirection(V['WindDir'],V['Beaufort']),
+                    Inputs=['WindDir','Beaufort'])
+UVIndex      = Node('UVIndex',      lambda V,C: derive.UVIndex(V['UV']),
+                    Inputs=['UV'])
+ClearSky     = Node('ClearSky',     lambda V,C: derive.clearSkyIndex(V['Time'],V['Radiation'],C),
+                    Inputs=['Time','Radiation'],
+                    Config=[('Station','Latitude'),('Station','Longitude')])
+PresTrend    = Node('PresTrend',    lambda V,C: derive.SLPTrend(V['Pres'],V['Time'],V['Data3h'],C),
+                    Volatile=True)
+TempMaxMin   = Node('TempMaxMin',   lambda V,C: derive.TempMaxMin(V['Time'],V['Temp'],*V.get('TempMaxMin',(None,None)),V['Device'],C,V['flagAPI']),
+                    Volatile=True)
+SLPMaxMin    = Node('SLPMaxMin',    lambda V,C: derive.SLPMaxMin(V['Time'],V['Pres'],*V.get('SLPMaxMin',(None,None)),V['Device'],C,V['flagAPI']),
+                    Volatile=True)
+StrikeCount  = Node('StrikeCount',  lambda V,C: derive.StrikeCount(V['Strikes'],V.get('StrikeCount'),V['Device'],C,V['flagAPI']),
+                    Volatile=True)
+StrikeFreq   = Node('StrikeFreq',   lambda V,C: derive.StrikeFrequency(V['Time'],V['Data3h'],C),
+                    Volatile=True)
+StrikeDeltaT = Node('StrikeDeltaT', lambda V,C: derive.StrikeDeltaT(V['StrikeTime']),
+                    Volatile=True)
+RainAccum    = Node('RainAccum',    lambda V,C: derive.RainAccumulation(V['dailyRain'],V['Device'],C),
+                    Volatile=True)
+AvgWind      = Node('AvgWind',      lambda V,C: derive.MeanWindSpeed(V['WindSpd'],V.get('AvgWind'),V['Device'],C,V['flagAPI']),
+                    Volatile=True)
+MaxGust      = Node('MaxGust',      lambda V,C: derive.MaxWindGust(V['WindGust'],V.get('MaxGust'),V['Device'],C,V['flagAPI']),
+                    Volatile=True)
+PeakSun      = Node('PeakSun',      lambda V,C: derive.peakSunHours(V['Time'],V['Radiation'],V['Astro'],V['Device'],C),
+                    Volatile=True)
+
+# Define display fields populated from the temperature, pressure and lightning
+# derived variables
+airOutputs  = [Output('outTemp',       'Temp',         'Temp',            Units='Temp'),
+               Output('outTempMax',    'TempMaxMin',   'Temp',            Units='Temp',     Index=0),
+               Output('outTempMin',    'TempMaxMin',   'Temp',            Units='Temp',     Index=1),
+               Output('DewPoint',      'DewPoint',     'Temp',            Units='Temp'),
+               Output('FeelsLike',     'FeelsLike',    'Temp',            Units='Temp'),
+               Output('Pres',          'SLP',          'Pressure',        Units='Pressure'),
+               Output('MaxPres',       'SLPMaxMin',    'Pressure',        Units='Pressure', Index=0),
+               Output('MinPres',       'SLPMaxMin',    'Pressure',        Units='Pressure', Index=1),
+               Output('PresTrend',     'PresTrend',    'Pressure',        Units='Pressure'),
+               Output('StrikeDeltaT',  'StrikeDeltaT', 'TimeDelta'),
+               Output('StrikeDist',    'StrikeDist',   'StrikeDistance',  Units='Distance'),
+               Output('StrikeFreq',    'StrikeFreq',   'StrikeFrequency'),
+               Output('Strikes3hr',    'Strikes3hr',   'StrikeCount'),
+               Output('StrikesToday',  'StrikeCount',  'StrikeCount',     Index='Today'),
+               Output('StrikesMonth',  'StrikeCount',  'StrikeCount',     Index='Month'),
+               Output('StrikesYear',   'StrikeCount',  'StrikeCount',     Index='Year'),
+               Output('Humidity',      'Humidity',     'Humidity')]
+
+# Define display fields populated from the wind, rain and solar derived
+# variables
+skyOutputs  = [Output('FeelsLike',     'FeelsLike',    'Temp',            Units='Temp'),
+               Output('RainRate',      'RainRate',     'Precip',          Units='Precip'),
+               Output('TodayRain',     'RainAccum',    'Precip',          Units='Precip',   Index='Today'),
+               Output('YesterdayRain', 'RainAccum',    'Precip',          Units='Precip',   Index='Yesterday'),
+               Output('MonthRain',     'RainAccum',    'Precip',          Units='Precip',   Index='Month'),
+               Output('YearRain',      'RainAccum',    'Precip',          Units='Precip',   Index='Year'),
+               Output('WindSpd',       'Beaufort',     'Wind',            Units='Wind'),
+               Output('WindGust',      'WindGust',     'Wind',            Units='Wind'),
+               Output('AvgWind',       'AvgWind',      'Wind',            Units='Wind'),
+               Output('MaxGust',       'MaxGust',      'Wind',            Units='Wind'),
+               Output('WindDir',       'CardinalDir',  'Direction',       Units='Direction'),
+               Output('Radiation',     'Radiation',    'Radiation'),
+               Output('ClearSky',      'ClearSky',     'clearSky'),
+               Output('peakSun',       'PeakSun',      'peakSun'),
+               Output('UVIndex',       'UVIndex',      'UV')]
+
+# Define dependency graph for each device type
+Graphs = {'Tempest':    Graph([DewPoint,SLP,PresTrend,FeelsLike,TempMaxMin,SLPMaxMin,StrikeCount,StrikeFreq,
+                               StrikeDeltaT,RainRate,RainAccum,AvgWind,MaxGust,Beaufort,CardinalDir,ClearSky,PeakSun,UVIndex],
+                              airOutputs + skyOutputs[1:]),
+          'Sky':        Graph([FeelsLike,RainRate,RainAccum,AvgWind,MaxGust,Beaufort,CardinalDir,ClearSky,PeakSun,UVIndex],
+                              skyOutputs),
+          'outdoorAir': Graph([DewPoint,SLP,PresTrend,FeelsLike,TempMaxMin,SLPMaxMin,StrikeCount,StrikeFreq,StrikeDeltaT],
+                              airOutputs),
+          'indoorAir':  Graph([TempMaxMin],
+                              [Output('inTemp',    'Temp',       'Temp', Units='Temp'),
+                               Output('inTempMax', 'TempMaxMin', 'Temp', Units='Temp', Index=0),
+                               Output('inTempMin', 'TempMaxMin', 'Temp', Units='Temp', Index=1)])}
 
 def updateDisplay(derivedObs,wfpiconsole,Type):
 
@@ -36,40 +142,75 @@ def updateDisplay(derivedObs,wfpiconsole,Type):
         Type                Derived variable module type
     """
 
-    # Update display with new derived observations
-    for Key,Value in derivedObs.items():
-        wfpiconsole.Obs[Key] = Value
+    # Update display with new derived observations in a single batch, skipping
+    # observations whose rendered output is identical to the output already on
+    # screen
+    Changed = {Key: Value for Key,Value in derivedObs.items() if wfpiconsole.Obs.get(Key) != Value}
+    wfpiconsole.Obs.update(Changed)
 
     # Set "Feels Like" icon if TemperaturePanel is active
-    if Type in ['Tempest','outdoorAir']  and hasattr(wfpiconsole,'TemperaturePanel'):
-        for panel in getattr(wfpiconsole,'TemperaturePanel'):
-            panel.setFeelsLikeIcon()
+    if 'FeelsLike' in Changed:
+        panelPool.update('TemperaturePanel','setFeelsLikeIcon')
 
     # Set wind speed and direction icons if WindSpeedPanel panel is active
-    if Type in ['Tempest','Sky'] and hasattr(wfpiconsole,'WindSpeedPanel'):
-        for panel in getattr(wfpiconsole,'WindSpeedPanel'):
-            panel.setWindIcons()
+    if Changed.keys() & {'WindSpd','WindDir'}:
+        panelPool.update('WindSpeedPanel','setWindIcons')
 
     # Set current UV index background color if SunriseSunsetPanel is active
-    if Type in ['Tempest','Sky'] and hasattr(wfpiconsole,'SunriseSunsetPanel'):
-        for panel in getattr(wfpiconsole,'SunriseSunsetPanel'):
-            panel.setUVBackground()
+    if 'UVIndex' in Changed:
+        panelPool.update('SunriseSunsetPanel','setUVBackground')
 
     # Animate rain rate level if RainfallPanel is active
-    if Type in ['Tempest','Sky'] and hasattr(wfpiconsole,'RainfallPanel'):
-        for panel in getattr(wfpiconsole,'RainfallPanel'):
-            panel.animateRainRate()
+    if 'RainRate' in Changed:
+        panelPool.update('RainfallPanel','animateRainRate')
 
     # Set lightning bolt icon if LightningPanel is active
-    if Type in ['Tempest','outdoorAir']  and hasattr(wfpiconsole,'LightningPanel'):
-        for panel in getattr(wfpiconsole,'LightningPanel'):
-            panel.setLightningBoltIcon()
+    if 'StrikeDeltaT' in Changed:
+        panelPool.update('LightningPanel','setLightningBoltIcon')
 
     # Set barometer arrow to current sea level pressure if BarometerPanel is
     # active
-    if Type in ['Tempest','outdoorAir'] and hasattr(wfpiconsole,'BarometerPanel'):
-        for panel in getattr(wfpiconsole,'BarometerPanel'):
-            panel.setBarometerArrow()
+    if 'Pres' in Changed:
+        panelPool.update('BarometerPanel','setBarometerArrow')
+
+    # Return wfpiconsole object
+    return wfpiconsole
+
+def reRender(wfpiconsole):
+
+    """ Converts and formats the latest observations for every device into the
+    current units without waiting for the next Websocket message. Used when the
+    units are changed in the settings screen
+
+    INPUTS:
+        wfpiconsole         wfpiconsole object
+    """
+
+    # Re-render display fields from the latest raw observations and derived
+    # variables held in each dependency graph
+    for Type,graph in Graphs.items():
+        derivedObs = graph.render(wfpiconsole.config,Force=True)
+        if derivedObs:
+            updateDisplay(derivedObs,wfpiconsole,Type)
+
+    # Re-render latest Rapid Wind observations
+    if rapidLatest:
+        WindSpd = observation.Units(rapidLatest['WindSpd'],wfpiconsole.config['Units']['Wind'])
+        WindDir = observation.Units(rapidLatest['WindDir'],'degrees')
+        wfpiconsole.Obs['rapidSpd'] = observation.Format(WindSpd,'Wind')
+        wfpiconsole.Obs['rapidDir'] = observation.Format(WindDir,'Direction')
+
+    # Re-render latest lightning strike distance, which may have been updated
+    # by an evt_strike message since the last device observation
+    if 'Dist' in strikeLatest:
+        StrikeDist = observation.Units(list(strikeLatest['Dist']),wfpiconsole.config['Units']['Distance'])
+        wfpiconsole.Obs['StrikeDist'] = observation.Format(StrikeDist,'StrikeDistance')
+
+    # Re-render latest indoor temperature observations from the BME280 sensor
+    for Key,Field in [('Temp','inTemp'),('MaxTemp','inTempMax'),('MinTemp','inTempMin')]:
+        if Key in wfpiconsole.indoorLatest:
+            Temp = observation.Units(wfpiconsole.indoorLatest[Key],wfpiconsole.config['Units']['Temp'])
+            wfpiconsole.Obs[Field] = observation.Format(Temp,'Temp')
 
     # Return wfpiconsole object
     return wfpiconsole
@@ -97,124 +238,59 @@ def Tempest(Msg,wfpiconsole):
     flagAPI = wfpiconsole.flagAPI[0]
     Config  = wfpiconsole.config
 
+    # Add latest observation to device history buffer
+    deviceHistory.record(Device,Ob)
+
     # Extract required observations from latest TEMPEST Websocket JSON
-    Time      = [Ob[0],'s']
-    WindSpd   = [Ob[2],'mps']
-    WindGust  = [Ob[3],'mps']
-    WindDir   = [Ob[4],'degrees']
-    Pres      = [Ob[6],'mb']
-    Temp      = [Ob[7],'c']
-    Humidity  = [Ob[8],'%']
-    UV        = [Ob[10],'index']
-    Radiation = [Ob[11],'Wm2']
-    minutRain = [Ob[12],'mm']
-    Strikes   = [Ob[15],'count']
-    dailyRain = [Ob[18],'mm']
+    Time      = Measurement(Ob[0],'s',Ob[0])
+    WindSpd   = Measurement(Ob[2],'mps',Ob[0])
+    WindGust  = Measurement(Ob[3],'mps',Ob[0])
+    WindDir   = Measurement(Ob[4],'degrees',Ob[0])
+    Pres      = Measurement(Ob[6],'mb',Ob[0])
+    Temp      = Measurement(Ob[7],'c',Ob[0])
+    Humidity  = Measurement(Ob[8],'%',Ob[0])
+    UV        = Measurement(Ob[10],'index',Ob[0])
+    Radiation = Measurement(Ob[11],'Wm2',Ob[0])
+    minutRain = Measurement(Ob[12],'mm',Ob[0])
+    Strikes   = Measurement(Ob[15],'count',Ob[0])
+    dailyRain = Measurement(Ob[18],'mm',Ob[0])
 
     # Extract lightning strike data from the latest AIR Websocket JSON "Summary"
     # object
-    StrikeTime = [Msg['summary']['strike_last_epoch'] if 'strike_last_epoch' in Msg['summary'] else NaN,'s']
-    StrikeDist = [Msg['summary']['strike_last_dist']  if 'strike_last_dist'  in Msg['summary'] else NaN,'km']
-    Strikes3hr = [Msg['summary']['strike_count_3h']   if 'strike_count_3h'   in Msg['summary'] else NaN,'count']
+    StrikeTime = Measurement(Msg['summary']['strike_last_epoch'] if 'strike_last_epoch' in Msg['summary'] else NaN,'s',Ob[0])
+    StrikeDist = Measurement(Msg['summary']['strike_last_dist']  if 'strike_last_dist'  in Msg['summary'] else NaN,'km',Ob[0])
+    Strikes3hr = Measurement(Msg['summary']['strike_count_3h']   if 'strike_count_3h'   in Msg['summary'] else NaN,'count',Ob[0])
 
-    # Store latest TEMPEST Websocket message
+    # Store latest TEMPEST Websocket message and lightning strike time and
+    # distance in SI units
     wfpiconsole.Obs['TempestMsg'] = Msg
-
-    # Extract required derived observations
-    minPres     = wfpiconsole.Obs['MinPres']
-    maxPres     = wfpiconsole.Obs['MaxPres']
-    minTemp     = wfpiconsole.Obs['outTempMin']
-    maxTemp     = wfpiconsole.Obs['outTempMax']
-    StrikeCount = {'Today': wfpiconsole.Obs['StrikesToday'],
-                   'Month': wfpiconsole.Obs['StrikesMonth'],
-                   'Year':  wfpiconsole.Obs['StrikesYear']}
-    rainAccum   = {'Today':     wfpiconsole.Obs['TodayRain'],
-                   'Yesterday': wfpiconsole.Obs['YesterdayRain'],
-                   'Month':     wfpiconsole.Obs['MonthRain'],
-                   'Year':      wfpiconsole.Obs['YearRain']}
-    peakSun     = wfpiconsole.Obs['peakSun']
-    avgWind     = wfpiconsole.Obs['AvgWind']
-    maxGust     = wfpiconsole.Obs['MaxGust']
+    strikeLatest['Time'] = StrikeTime
+    strikeLatest['Dist'] = StrikeDist
 
     # Request TEMPEST data from the previous three hours
     Data3h = requestAPI.weatherflow.Last3h(Device,Time[0],Config)
 
-    # Calculate derived variables from TEMPEST observations
-    DewPoint         = derive.DewPoint(Temp,Humidity)
-    SLP              = derive.SLP(Pres,Config)
-    PresTrend        = derive.SLPTrend(Pres,Time,Data3h,Config)
-    FeelsLike        = derive.FeelsLike(Temp,Humidity,WindSpd,Config)
-    MaxTemp, MinTemp = derive.TempMaxMin(Time,Temp,maxTemp,minTemp,Device,Config,flagAPI)
-    MaxPres, MinPres = derive.SLPMaxMin(Time,Pres,maxPres,minPres,Device,Config,flagAPI)
-    StrikeCount      = derive.StrikeCount(Strikes,StrikeCount,Device,Config,flagAPI)
-    StrikeFreq       = derive.StrikeFrequency(Time,Data3h,Config)
-    StrikeDeltaT     = derive.StrikeDeltaT(StrikeTime)
-    FeelsLike        = derive.FeelsLike(Temp,Humidity,WindSpd,Config)
-    RainRate         = derive.RainRate(minutRain)
-    rainAccum        = derive.RainAccumulation(dailyRain,rainAccum,Device,Config,flagAPI)
-    AvgWind          = derive.MeanWindSpeed(WindSpd,avgWind,Device,Config,flagAPI)
-    MaxGust          = derive.MaxWindGust(WindGust,maxGust,Device,Config,flagAPI)
-    WindSpd          = derive.BeaufortScale(WindSpd)
-    WindDir          = derive.CardinalWindDirection(WindDir,WindSpd)
-    peakSun          = derive.peakSunHours(Radiation,peakSun,wfpiconsole.Astro,Device,Config,flagAPI)
-    UVIndex          = derive.UVIndex(UV)
-
-    # Convert observation units as required
-    Temp          = observation.Units(Temp,Config['Units']['Temp'])
-    MaxTemp       = observation.Units(MaxTemp,Config['Units']['Temp'])
-    MinTemp       = observation.Units(MinTemp,Config['Units']['Temp'])
-    DewPoint      = observation.Units(DewPoint,Config['Units']['Temp'])
-    FeelsLike     = observation.Units(FeelsLike,Config['Units']['Temp'])
-    SLP           = observation.Units(SLP,Config['Units']['Pressure'])
-    MaxPres       = observation.Units(MaxPres,Config['Units']['Pressure'])
-    MinPres       = observation.Units(MinPres,Config['Units']['Pressure'])
-    PresTrend     = observation.Units(PresTrend,Config['Units']['Pressure'])
-    StrikeDist    = observation.Units(StrikeDist,Config['Units']['Distance'])
-    RainRate      = observation.Units(RainRate,Config['Units']['Precip'])
-    TodayRain     = observation.Units(rainAccum['Today'],Config['Units']['Precip'])
-    YesterdayRain = observation.Units(rainAccum['Yesterday'],Config['Units']['Precip'])
-    MonthRain     = observation.Units(rainAccum['Month'],Config['Units']['Precip'])
-    YearRain      = observation.Units(rainAccum['Year'],Config['Units']['Precip'])
-    WindSpd       = observation.Units(WindSpd,Config['Units']['Wind'])
-    WindDir       = observation.Units(WindDir,Config['Units']['Direction'])
-    WindGust      = observation.Units(WindGust,Config['Units']['Wind'])
-    AvgWind       = observation.Units(AvgWind,Config['Units']['Wind'])
-    MaxGust       = observation.Units(MaxGust,Config['Units']['Wind'])
-    FeelsLike     = observation.Units(FeelsLike,Config['Units']['Temp'])
-
-    # Store derived TEMPEST observations in dictionary
-    derivedObs                  = {}
-    derivedObs['outTemp']       = observation.Format(Temp,'Temp')
-    derivedObs['outTempMax']    = observation.Format(MaxTemp,'Temp')
-    derivedObs['outTempMin']    = observation.Format(MinTemp,'Temp')
-    derivedObs['DewPoint']      = observation.Format(DewPoint,'Temp')
-    derivedObs['FeelsLike']     = observation.Format(FeelsLike,'Temp')
-    derivedObs['Pres']          = observation.Format(SLP,'Pressure')
-    derivedObs['MaxPres']       = observation.Format(MaxPres,'Pressure')
-    derivedObs['MinPres']       = observation.Format(MinPres,'Pressure')
-    derivedObs['PresTrend']     = observation.Format(PresTrend,'Pressure')
-    derivedObs['StrikeDeltaT']  = observation.Format(StrikeDeltaT,'TimeDelta')
-    derivedObs['StrikeDist']    = observation.Format(StrikeDist,'StrikeDistance')
-    derivedObs['StrikeFreq']    = observation.Format(StrikeFreq,'StrikeFrequency')
-    derivedObs['Strikes3hr']    = observation.Format(Strikes3hr,'StrikeCount')
-    derivedObs['StrikesToday']  = observation.Format(StrikeCount['Today'],'StrikeCount')
-    derivedObs['StrikesMonth']  = observation.Format(StrikeCount['Month'],'StrikeCount')
-    derivedObs['StrikesYear']   = observation.Format(StrikeCount['Year'], 'StrikeCount')
-    derivedObs['Humidity']      = observation.Format(Humidity,'Humidity')
-    derivedObs['FeelsLike']     = observation.Format(FeelsLike,'Temp')
-    derivedObs['RainRate']      = observation.Format(RainRate,'Precip')
-    derivedObs['TodayRain']     = observation.Format(TodayRain,'Precip')
-    derivedObs['YesterdayRain'] = observation.Format(YesterdayRain,'Precip')
-    derivedObs['MonthRain']     = observation.Format(MonthRain,'Precip')
-    derivedObs['YearRain']      = observation.Format(YearRain,'Precip')
-    derivedObs['WindSpd']       = observation.Format(WindSpd,'Wind')
-    derivedObs['WindGust']      = observation.Format(WindGust,'Wind')
-    derivedObs['AvgWind']       = observation.Format(AvgWind,'Wind')
-    derivedObs['MaxGust']       = observation.Format(MaxGust,'Wind')
-    derivedObs['WindDir']       = observation.Format(WindDir,'Direction')
-    derivedObs['Radiation']     = observation.Format(Radiation,'Radiation')
-    derivedObs['peakSun']       = observation.Format(peakSun,'peakSun')
-    derivedObs['UVIndex']       = observation.Format(UVIndex,'UV')
+    # Calculate derived variables from TEMPEST observations and stored derived
+    # observations
+    derivedObs = Graphs['Tempest'].update({'Time':        Time,
+                                           'WindSpd':     WindSpd,
+                                           'WindGust':    WindGust,
+                                           'WindDir':     WindDir,
+                                           'Pres':        Pres,
+                                           'Temp':        Temp,
+                                           'Humidity':    Humidity,
+                                           'UV':          UV,
+                                           'Radiation':   Radiation,
+                                           'minutRain':   minutRain,
+                                           'Strikes':     Strikes,
+                                           'dailyRain':   dailyRain,
+                                           'StrikeTime':  StrikeTime,
+                                           'StrikeDist':  StrikeDist,
+                                           'Strikes3hr':  Strikes3hr,
+                                           'Data3h':      Data3h,
+                                           'Astro':       wfpiconsole.Astro,
+                                           'Device':      Device,
+                                           'flagAPI':     flagAPI},Config)
 
     # Update wfpiconsole display with derived TEMPEST observations
     updateDisplay(derivedObs,wfpiconsole,'Tempest')
@@ -251,83 +327,52 @@ def Sky(Msg,wfpiconsole):
     flagAPI = wfpiconsole.flagAPI[1]
     Config  = wfpiconsole.config
 
+    # Add latest observation to device history buffer
+    deviceHistory.record(Device,Ob)
+
     # Extract required observations from latest SKY Websocket JSON
-    Time      = [Ob[0],'s']
-    UV        = [Ob[2],'index']
-    minutRain = [Ob[3],'mm']
-    WindSpd   = [Ob[5],'mps']
-    WindGust  = [Ob[6],'mps']
-    WindDir   = [Ob[7],'degrees']
-    Radiation = [Ob[10],'Wm2']
-    dailyRain = [Ob[11],'mm']
+    Time      = Measurement(Ob[0],'s',Ob[0])
+    UV        = Measurement(Ob[2],'index',Ob[0])
+    minutRain = Measurement(Ob[3],'mm',Ob[0])
+    WindSpd   = Measurement(Ob[5],'mps',Ob[0])
+    WindGust  = Measurement(Ob[6],'mps',Ob[0])
+    WindDir   = Measurement(Ob[7],'degrees',Ob[0])
+    Radiation = Measurement(Ob[10],'Wm2',Ob[0])
+    dailyRain = Measurement(Ob[11],'mm',Ob[0])
 
     # Extract required observations from latest AIR Websocket observations
     Retries = 0
     while Retries <= 10:
         if 'outAirMsg' in wfpiconsole.Obs:
             Ob       = [x if x != None else NaN for x in wfpiconsole.Obs['outAirMsg']['obs'][0]]
-            Temp     = [Ob[2],'c']
-            Humidity = [Ob[3],'%']
+            Temp     = Measurement(Ob[2],'c',Ob[0])
+            Humidity = Measurement(Ob[3],'%',Ob[0])
             break
         else:
-            Temp     = [NaN,'c']
-            Humidity = [NaN,'%']
+            Temp     = Measurement(NaN,'c',Ob[0])
+            Humidity = Measurement(NaN,'%',Ob[0])
             Retries += 1
             time.sleep(0.1)
 
     # Set wind direction to None if wind speed is zero
     if WindSpd[0] == 0:
-        WindDir = [None,'degrees']
-
-    # Extract required derived observations
-    rainAccum = {'Today':     wfpiconsole.Obs['TodayRain'],
-                 'Yesterday': wfpiconsole.Obs['YesterdayRain'],
-                 'Month':     wfpiconsole.Obs['MonthRain'],
-                 'Year':      wfpiconsole.Obs['YearRain']}
-    peakSun   = wfpiconsole.Obs['peakSun']
-    avgWind   = wfpiconsole.Obs['AvgWind']
-    maxGust   = wfpiconsole.Obs['MaxGust']
-
-    # Calculate derived variables from SKY observations
-    FeelsLike = derive.FeelsLike(Temp,Humidity,WindSpd,Config)
-    RainRate  = derive.RainRate(minutRain)
-    rainAccum = derive.RainAccumulation(dailyRain,rainAccum,Device,Config,flagAPI)
-    AvgWind   = derive.MeanWindSpeed(WindSpd,avgWind,Device,Config,flagAPI)
-    MaxGust   = derive.MaxWindGust(WindGust,maxGust,Device,Config,flagAPI)
-    WindSpd   = derive.BeaufortScale(WindSpd)
-    WindDir   = derive.CardinalWindDirection(WindDir,WindSpd)
-    peakSun   = derive.peakSunHours(Radiation,peakSun,wfpiconsole.Astro,Device,Config,flagAPI)
-    UVIndex   = derive.UVIndex(UV)
-
-    # Convert observation units as required
-    RainRate      = observation.Units(RainRate,Config['Units']['Precip'])
-    TodayRain     = observation.Units(rainAccum['Today'],Config['Units']['Precip'])
-    YesterdayRain = observation.Units(rainAccum['Yesterday'],Config['Units']['Precip'])
-    MonthRain     = observation.Units(rainAccum['Month'],Config['Units']['Precip'])
-    YearRain      = observation.Units(rainAccum['Year'],Config['Units']['Precip'])
-    WindSpd       = observation.Units(WindSpd,Config['Units']['Wind'])
-    WindDir       = observation.Units(WindDir,Config['Units']['Direction'])
-    WindGust      = observation.Units(WindGust,Config['Units']['Wind'])
-    AvgWind       = observation.Units(AvgWind,Config['Units']['Wind'])
-    MaxGust       = observation.Units(MaxGust,Config['Units']['Wind'])
-    FeelsLike     = observation.Units(FeelsLike,Config['Units']['Temp'])
-
-    # Store derived SKY observations in dictionary
-    derivedObs                  = {}
-    derivedObs['FeelsLike']     = observation.Format(FeelsLike,'Temp')
-    derivedObs['RainRate']      = observation.Format(RainRate,'Precip')
-    derivedObs['TodayRain']     = observation.Format(TodayRain,'Precip')
-    derivedObs['YesterdayRain'] = observation.Format(YesterdayRain,'Precip')
-    derivedObs['MonthRain']     = observation.Format(MonthRain,'Precip')
-    derivedObs['YearRain']      = observation.Format(YearRain,'Precip')
-    derivedObs['WindSpd']       = observation.Format(WindSpd,'Wind')
-    derivedObs['WindGust']      = observation.Format(WindGust,'Wind')
-    derivedObs['AvgWind']       = observation.Format(AvgWind,'Wind')
-    derivedObs['MaxGust']       = observation.Format(MaxGust,'Wind')
-    derivedObs['WindDir']       = observation.Format(WindDir,'Direction')
-    derivedObs['Radiation']     = observation.Format(Radiation,'Radiation')
-    derivedObs['peakSun']       = observation.Format(peakSun,'peakSun')
-    derivedObs['UVIndex']       = observation.Format(UVIndex,'UV')
+        WindDir = Measurement(None,'degrees',Time[0])
+
+    # Calculate derived variables from SKY observations and stored derived
+    # observations
+    derivedObs = Graphs['Sky'].update({'Time':      Time,
+                                       'UV':        UV,
+                                       'minutRain': minutRain,
+                                       'WindSpd':   WindSpd,
+                                       'WindGust':  WindGust,
+                                       'WindDir':   WindDir,
+                                       'Radiation': Radiation,
+                                       'dailyRain': dailyRain,
+                                       'Temp':      Temp,
+                                       'Humidity':  Humidity,
+                                       'Astro':     wfpiconsole.Astro,
+                                       'Device':    Device,
+                                       'flagAPI':   flagAPI},Config)
 
     # Update wfpiconsole display with derived SKY observations
     updateDisplay(derivedObs,wfpiconsole,'Sky')
@@ -365,27 +410,25 @@ def outdoorAir(Msg,wfpiconsole):
     flagAPI = wfpiconsole.flagAPI[2]
     Config  = wfpiconsole.config
 
+    # Add latest observation to device history buffer
+    deviceHistory.record(Device,Ob)
+
     # Extract required observations from latest outdoor AIR Websocket JSON
-    Time     = [Ob[0],'s']
-    Pres     = [Ob[1],'mb']
-    Temp     = [Ob[2],'c']
-    Humidity = [Ob[3],'%']
-    Strikes  = [Ob[4],'count']
+    Time     = Measurement(Ob[0],'s',Ob[0])
+    Pres     = Measurement(Ob[1],'mb',Ob[0])
+    Temp     = Measurement(Ob[2],'c',Ob[0])
+    Humidity = Measurement(Ob[3],'%',Ob[0])
+    Strikes  = Measurement(Ob[4],'count',Ob[0])
 
     # Extract lightning strike data from the latest outdoor AIR Websocket JSON
     # "Summary" object
-    StrikeTime = [Msg['summary']['strike_last_epoch'] if 'strike_last_epoch' in Msg['summary'] else NaN,'s']
-    StrikeDist = [Msg['summary']['strike_last_dist']  if 'strike_last_dist'  in Msg['summary'] else NaN,'km']
-    Strikes3hr = [Msg['summary']['strike_count_3h']   if 'strike_count_3h'   in Msg['summary'] else NaN,'count']
-
-    # Extract required derived observations
-    minPres      = wfpiconsole.Obs['MinPres']
-    maxPres      = wfpiconsole.Obs['MaxPres']
-    minTemp      = wfpiconsole.Obs['outTempMin']
-    maxTemp      = wfpiconsole.Obs['outTempMax']
-    StrikeCount  = {'Today': wfpiconsole.Obs['StrikesToday'],
-                    'Month': wfpiconsole.Obs['StrikesMonth'],
-                    'Year':  wfpiconsole.Obs['StrikesYear']}
+    StrikeTime = Measurement(Msg['summary']['strike_last_epoch'] if 'strike_last_epoch' in Msg['summary'] else NaN,'s',Ob[0])
+    StrikeDist = Measurement(Msg['summary']['strike_last_dist']  if 'strike_last_dist'  in Msg['summary'] else NaN,'km',Ob[0])
+    Strikes3hr = Measurement(Msg['summary']['strike_count_3h']   if 'strike_count_3h'   in Msg['summary'] else NaN,'count',Ob[0])
+
+    # Store latest lightning strike time and distance in SI units
+    strikeLatest['Time'] = StrikeTime
+    strikeLatest['Dist'] = StrikeDist
 
     # Request outdoor AIR data from the previous three hours
     Data3h = requestAPI.weatherflow.Last3h(Device,Time[0],Config)
@@ -395,55 +438,27 @@ def outdoorAir(Msg,wfpiconsole):
     while Retries <= 10:
         if 'SkyMsg' in wfpiconsole.Obs:
             Ob = [x if x != None else NaN for x in wfpiconsole.Obs['SkyMsg']['obs'][0]]
-            WindSpd = [Ob[5],'mps']
+            WindSpd = Measurement(Ob[5],'mps',Ob[0])
             break
         else:
-            WindSpd = [NaN,'mps']
+            WindSpd = Measurement(NaN,'mps',Ob[0])
             Retries += 1
             time.sleep(0.1)
 
-    # Calculate derived variables from AIR observations
-    DewPoint         = derive.DewPoint(Temp,Humidity)
-    SLP              = derive.SLP(Pres,Config)
-    PresTrend        = derive.SLPTrend(Pres,Time,Data3h,Config)
-    FeelsLike        = derive.FeelsLike(Temp,Humidity,WindSpd,Config)
-    MaxTemp, MinTemp = derive.TempMaxMin(Time,Temp,maxTemp,minTemp,Device,Config,flagAPI)
-    MaxPres, MinPres = derive.SLPMaxMin(Time,Pres,maxPres,minPres,Device,Config,flagAPI)
-    StrikeCount      = derive.StrikeCount(Strikes,StrikeCount,Device,Config,flagAPI)
-    StrikeFreq       = derive.StrikeFrequency(Time,Data3h,Config)
-    StrikeDeltaT     = derive.StrikeDeltaT(StrikeTime)
-
-    # Convert observation units as required
-    Temp        = observation.Units(Temp,Config['Units']['Temp'])
-    MaxTemp     = observation.Units(MaxTemp,Config['Units']['Temp'])
-    MinTemp     = observation.Units(MinTemp,Config['Units']['Temp'])
-    DewPoint    = observation.Units(DewPoint,Config['Units']['Temp'])
-    FeelsLike   = observation.Units(FeelsLike,Config['Units']['Temp'])
-    SLP         = observation.Units(SLP,Config['Units']['Pressure'])
-    MaxPres     = observation.Units(MaxPres,Config['Units']['Pressure'])
-    MinPres     = observation.Units(MinPres,Config['Units']['Pressure'])
-    PresTrend   = observation.Units(PresTrend,Config['Units']['Pressure'])
-    StrikeDist  = observation.Units(StrikeDist,Config['Units']['Distance'])
-
-    # Store derived outdoor AIR observations in dictionary
-    derivedObs                 = {}
-    derivedObs['outTemp']      = observation.Format(Temp,'Temp')
-    derivedObs['outTempMax']   = observation.Format(MaxTemp,'Temp')
-    derivedObs['outTempMin']   = observation.Format(MinTemp,'Temp')
-    derivedObs['DewPoint']     = observation.Format(DewPoint,'Temp')
-    derivedObs['FeelsLike']    = observation.Format(FeelsLike,'Temp')
-    derivedObs['Pres']         = observation.Format(SLP,'Pressure')
-    derivedObs['MaxPres']      = observation.Format(MaxPres,'Pressure')
-    derivedObs['MinPres']      = observation.Format(MinPres,'Pressure')
-    derivedObs['PresTrend']    = observation.Format(PresTrend,'Pressure')
-    derivedObs['StrikeDeltaT'] = observation.Format(StrikeDeltaT,'TimeDelta')
-    derivedObs['StrikeDist']   = observation.Format(StrikeDist,'StrikeDistance')
-    derivedObs['StrikeFreq']   = observation.Format(StrikeFreq,'StrikeFrequency')
-    derivedObs['Strikes3hr']   = observation.Format(Strikes3hr,'StrikeCount')
-    derivedObs['StrikesToday'] = observation.Format(StrikeCount['Today'],'StrikeCount')
-    derivedObs['StrikesMonth'] = observation.Format(StrikeCount['Month'],'StrikeCount')
-    derivedObs['StrikesYear']  = observation.Format(StrikeCount['Year'],'StrikeCount')
-    derivedObs['Humidity']     = observation.Format(Humidity,'Humidity')
+    # Calculate derived variables from outdoor AIR observations and stored
+    # derived observations
+    derivedObs = Graphs['outdoorAir'].update({'Time':        Time,
+                                              'Pres':        Pres,
+                                              'Temp':        Temp,
+                                              'Humidity':    Humidity,
+                                              'Strikes':     Strikes,
+                                              'WindSpd':     WindSpd,
+                                              'StrikeTime':  StrikeTime,
+                                              'StrikeDist':  StrikeDist,
+                                              'Strikes3hr':  Strikes3hr,
+                                              'Data3h':      Data3h,
+                                              'Device':      Device,
+                                              'flagAPI':     flagAPI},Config)
 
     # Update wfpiconsole display with derived outdoor AIR observations
     updateDisplay(derivedObs,wfpiconsole,'outdoorAir')
@@ -479,29 +494,18 @@ def indoorAir(Msg,wfpiconsole):
     Config  = wfpiconsole.config
 
     # Extract required observations from latest indoor AIR Websocket JSON
-    Time     = [Ob[0],'s']
-    Temp     = [Ob[2],'c']
+    Time     = Measurement(Ob[0],'s',Ob[0])
+    Temp     = Measurement(Ob[2],'c',Ob[0])
 
     # Store latest indoor AIR Websocket message
     wfpiconsole.Obs['inAirMsg'] = Msg
 
-    # Extract required derived observations
-    minTemp = wfpiconsole.Obs['inTempMin']
-    maxTemp = wfpiconsole.Obs['inTempMax']
-
-    # Calculate derived variables from indoor AIR observations
-    MaxTemp, MinTemp = derive.TempMaxMin(Time,Temp,maxTemp,minTemp,Device,Config,flagAPI)
-
-    # Convert observation units as required
-    Temp    = observation.Units(Temp,   Config['Units']['Temp'])
-    MaxTemp = observation.Units(MaxTemp,Config['Units']['Temp'])
-    MinTemp = observation.Units(MinTemp,Config['Units']['Temp'])
-
-    # Store derived indoor AIR observations in Data dictionary
-    derivedObs              = {}
-    derivedObs['inTemp']    = observation.Format(Temp,   'Temp')
-    derivedObs['inTempMax'] = observation.Format(MaxTemp,'Temp')
-    derivedObs['inTempMin'] = observation.Format(MinTemp,'Temp')
+    # Calculate derived variables from indoor AIR observations and stored
+    # derived observations
+    derivedObs = Graphs['indoorAir'].update({'Time':    Time,
+                                             'Temp':    Temp,
+                                             'Device':  Device,
+                                             'flagAPI': flagAPI},Config)
 
     # Update wfpiconsole display with derived indoor AIR observations
     updateDisplay(derivedObs,wfpiconsole,'indoorAir')
@@ -512,6 +516,7 @@ def indoorAir(Msg,wfpiconsole):
     # Return wfpiconsole object
     return wfpiconsole
 
+@profiler.timed
 def rapidWind(Msg,wfpiconsole):
 
     """ Handles RapidWind Websocket messages received from either SKY or TEMPEST
@@ -556,6 +561,10 @@ def rapidWind(Msg,wfpiconsole):
     # Calculate derived variables from Rapid Wind observations
     WindDir = derive.CardinalWindDirection(WindDir,WindSpd)
 
+    # Store latest Rapid Wind observations in SI units
+    rapidLatest['WindSpd'] = WindSpd
+    rapidLatest['WindDir'] = WindDir
+
     # Convert observation units as required
     WindSpd = observation.Units(WindSpd,wfpiconsole.config['Units']['Wind'])
     WindDir = observation.Units(WindDir,'degrees')
@@ -565,14 +574,14 @@ def rapidWind(Msg,wfpiconsole):
     wfpiconsole.Obs['rapidSpd']   = observation.Format(WindSpd,'Wind')
     wfpiconsole.Obs['rapidDir']   = observation.Format(WindDir,'Direction')
 
-    # Animate wind rose arrow if WindSpeedPanel panel is active
-    if hasattr(wfpiconsole,'WindSpeedPanel'):
-        for panel in getattr(wfpiconsole,'WindSpeedPanel'):
-            panel.animateWindRose()
+    # Animate wind rose arrow of each WindSpeedPanel on screen. Off-screen wind
+    # roses are not animated and are set to the latest direction when shown
+    panelPool.update('WindSpeedPanel','animateWindRose',onShow='refresh')
 
     # Return wfpiconsole object
     return wfpiconsole
 
+@profiler.timed
 def evtStrike(Msg,wfpiconsole):
 
     """ Handles lightning strike event Websocket messages received from either
@@ -599,6 +608,10 @@ def evtStrike(Msg,wfpiconsole):
     # Calculate derived variables from evt_strike observations
     StrikeDeltaT = derive.StrikeDeltaT(StrikeTime)
 
+    # Store latest lightning strike time and distance in SI units
+    strikeLatest['Time'] = StrikeTime
+    strikeLatest['Dist'] = StrikeDist
+
     # Convert observation units as required
     StrikeDist = observation.Units(StrikeDist,wfpiconsole.config['Units']['Distance'])
 
@@ -613,11 +626,10 @@ def evtStrike(Msg,wfpiconsole):
             if "Lightning" in Button[2]:
                 wfpiconsole.CurrentConditions.SwitchPanel([],Button)
 
-    # Set and animate lightning bolt icon if LightningPanel panel is active
-    if hasattr(wfpiconsole,'LightningPanel'):
-        for panel in getattr(wfpiconsole,'LightningPanel'):
-            panel.setLightningBoltIcon()
-            panel.animateLightningBoltIcon()
+    # Set and animate lightning bolt icon of each LightningPanel on screen.
+    # Off-screen lightning bolt icons are set but not animated when shown
+    panelPool.update('LightningPanel','setLightningBoltIcon')
+    panelPool.update('LightningPanel','animateLightningBoltIcon',onShow='setLightningBoltIcon')
 
     # Return wfpiconsole object
     return wfpiconsole
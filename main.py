@@ -187,15 +187,20 @@ from kivy.app         import App
 # IMPORT REQUIRED LIBRARY MODULES
 # ==============================================================================
 from lib import astronomical       as astro
+from lib import astroCalendar
 from lib import derivedVariables   as derive
 from lib import observationFormat  as observation
-from lib import sager              as sagerForecast
+from lib import observationStore
+from lib import panelPool
+from lib import profiler
+from lib import sagerService
 from lib import requestAPI
 from lib import websocket
 from lib import settings
 from lib import forecast
 from lib import station
 from lib import system
+from lib.measurement import Extreme
 
 # ==============================================================================
 # IMPORT REQUIRED SYSTEM MODULES
@@ -206,6 +211,7 @@ from threading        import Thread
 from datetime         import datetime, date, time, timedelta
 import subprocess
 import requests
+import numpy as np
 import pytz
 import math
 import json
@@ -228,26 +234,31 @@ from kivy.uix.button         import Button
 from kivy.uix.widget         import Widget
 from kivy.uix.popup          import Popup
 from kivy.uix.label          import Label
+from kivy.core.text          import Label as CoreLabel
+from kivy.graphics           import Color, Mesh, Rectangle
+from kivy                    import utils
 
 # ==============================================================================
 # DEFINE 'WeatherFlowPiConsole' APP CLASS
 # ==============================================================================
 class wfpiconsole(App):
 
-    # Define App class observation dictionary properties
-    Obs     = DictProperty  ([('rapidSpd','--'),       ('rapidDir','----'),    ('rapidShift','-'),
-                              ('WindSpd','-----'),     ('WindGust','--'),      ('WindDir','---'),
-                              ('AvgWind','--'),        ('MaxGust','--'),       ('RainRate','---'),
-                              ('TodayRain','--'),      ('YesterdayRain','--'), ('MonthRain','--'),
-                              ('YearRain','--'),       ('Radiation','----'),   ('UVIndex','----'),
-                              ('peakSun','-----'),     ('outTemp','--'),       ('outTempMin','---'),
-                              ('outTempMax','---'),    ('inTemp','--'),        ('inTempMin','---'),
-                              ('inTempMax','---'),     ('Humidity','--'),      ('DewPoint','--'),
-                              ('Pres','---'),          ('MaxPres','---'),      ('MinPres','---'),
-                              ('PresTrend','----'),    ('FeelsLike','----'),   ('StrikeDeltaT','-----'),
-                              ('StrikeDist','--'),     ('StrikeFreq','----'),  ('Strikes3hr','-'),
-                              ('StrikesToday','-'),    ('StrikesMonth','-'),   ('StrikesYear','-')
-                             ])
+    # Define App class observation store. Each display field is a separate
+    # property so that kv rules only update when the field they render changes
+    Obs     = ObjectProperty(observationStore.create([('rapidSpd','--'),       ('rapidDir','----'),    ('rapidShift','-'),
+                                                      ('WindSpd','-----'),     ('WindGust','--'),      ('WindDir','---'),
+                                                      ('AvgWind','--'),        ('MaxGust','--'),       ('RainRate','---'),
+                                                      ('TodayRain','--'),      ('YesterdayRain','--'), ('MonthRain','--'),
+                                                      ('YearRain','--'),       ('Radiation','----'),   ('UVIndex','----'),
+                                                      ('peakSun','-----'),     ('outTemp','--'),       ('outTempMin','---'),
+                                                      ('outTempMax','---'),    ('inTemp','--'),        ('inTempMin','---'),
+                                                      ('inTempMax','---'),     ('Humidity','--'),      ('DewPoint','--'),
+                                                      ('Pres','---'),          ('MaxPres','---'),      ('MinPres','---'),
+                                                      ('PresTrend','----'),    ('FeelsLike','----'),   ('StrikeDeltaT','-----'),
+                                                      ('StrikeDist','--'),     ('StrikeFreq','----'),  ('Strikes3hr','-'),
+                                                      ('StrikesToday','-'),    ('StrikesMonth','-'),   ('StrikesYear','-'),
+                                                      ('ClearSky','---')
+                                                     ]))
     Astro   = DictProperty  ([('Sunrise',['-','-',0]), ('Sunset',['-','-',0]), ('Dawn',['-','-',0]),
                               ('Dusk',['-','-',0]),    ('sunEvent','----'),    ('sunIcon',['-',0,0]),
                               ('Moonrise',['-','-']),  ('Moonset',['-','-']),  ('NewMoon','--'),
@@ -292,19 +303,21 @@ class wfpiconsole(App):
         # Initialise real time clock
         Clock.schedule_interval(partial(system.realtimeClock,self.System,self.config),1.0)
 
-        # Initialise Sunrise, Sunset, Moonrise and Moonset times
-        astro.SunriseSunset(self.Astro,self.config)
-        astro.MoonriseMoonset(self.Astro,self.config)
+        # Precompute astronomical event calendar in the background and then
+        # initialise Sunrise, Sunset, Moonrise and Moonset times
+        astroCalendar.start(self.Astro,self.config)
 
         # Fetch WeatherFlow weather forecast
         Clock.schedule_once(partial(forecast.Download,self.MetData,self.config))
 
-        # Generate Sager Weathercaster forecast
-        Thread(target=sagerForecast.Generate, args=(self.Sager,self.config), name="Sager", daemon=True).start()
+        # Generate Sager Weathercaster forecast if the Sager Weathercaster panel
+        # is displayed
+        sagerService.start(self.Sager,self.config)
 
         # Initialise websocket connection
         self.WebsocketConnect()
 
+        self.indoorLatest = {}
         bus = SMBus(1)
         self.bme280 = BME280(i2c_dev = bus)
         try:
@@ -327,9 +340,10 @@ class wfpiconsole(App):
         self.Station = Station()
         Clock.schedule_interval(self.Station.getDeviceStatus,1.0)
 
-        # Schedule sunTransit and moonPhase functions to be called each second
-        Clock.schedule_interval(partial(astro.sunTransit,self.Astro,self.config),1.0)
-        Clock.schedule_interval(partial(astro.moonPhase ,self.Astro,self.config),1.0)
+        # Schedule sunTransit and moonPhase functions to be called when the
+        # displayed sun transit and moon phase next change
+        Clock.schedule_once(partial(astro.scheduleSunTransit,self.Astro,self.config))
+        Clock.schedule_once(partial(astro.scheduleMoonPhase ,self.Astro,self.config))
 
     # SET DISPLAY SCALE FACTOR BASED ON SCREEN DIMENSIONS
     # --------------------------------------------------------------------------
@@ -363,13 +377,19 @@ class wfpiconsole(App):
     # --------------------------------------------------------------------------
     def on_config_change(self,config,section,key,value):
 
-        # Update current weather forecast and Sager Weathercaster forecast when
-        # temperature or wind speed units are changed
-        if section == 'Units' and key in ['Temp','Wind']:
-            forecast.Download(self.MetData, self.config, None)
-            if key == 'Wind' and 'Dial' in self.Sager:
-                self.Sager['Dial']['Units'] = value
-                self.Sager['Forecast'] = sagerForecast.getForecast(self.Sager['Dial'])
+        # Recompile unit conversion pipeline and re-render current observations
+        # and weather forecast from cached values when units are changed
+        if section == 'Units':
+            observation.compilePipeline(self.config)
+            websocket.reRender(self)
+            forecast.Extract(self.MetData, self.config)
+            forecast.ExtractDaily(self)
+            forecast.ExtractHourly(self)
+
+        # Update Sager Weathercaster forecast when wind speed units are changed
+        if section == 'Units' and key == 'Wind' and 'Dial' in self.Sager:
+            self.Sager['Dial']['Units'] = value
+            self.Sager['Forecast'] = sagerService.getForecast(self.Sager['Dial'])
 
         # Update "Feels Like" temperature cutoffs in wfpiconsole.ini and the
         # settings screen when temperature units are changed
@@ -399,13 +419,17 @@ class wfpiconsole(App):
             self.config.set('System','BarometerMax',Max[Units.index(value)])
             self.config.set('System','BarometerMin',Min[Units.index(value)])
 
+        # Start Sager Weathercaster forecast when the Sager Weathercaster panel
+        # is first displayed
+        if section in ['PrimaryPanels','SecondaryPanels'] and value == 'Sager':
+            sagerService.start(self.Sager,self.config)
+
         # Update primary and secondary panels displayed on CurrentConditions
         # screen
         if section in ['PrimaryPanels','SecondaryPanels']:
             for Panel,Type in App.get_running_app().config['PrimaryPanels'].items():
                 if Panel == key:
-                    self.CurrentConditions.ids[Panel].clear_widgets()
-                    self.CurrentConditions.ids[Panel].add_widget(eval(Type + 'Panel')())
+                    panelPool.show(self.CurrentConditions.ids[Panel],Type + 'Panel')
                     break
 
         # Update button layout displayed on CurrentConditions screen
@@ -417,11 +441,11 @@ class wfpiconsole(App):
                 self.CurrentConditions.ids[Button].clear_widgets()
             for Panel, Type in App.get_running_app().config['SecondaryPanels'].items():
                 if Type and Type != 'None':
-                    self.CurrentConditions.ids[buttonList[ii]].add_widget(eval(Type + 'Button')())
+                    panelPool.show(self.CurrentConditions.ids[buttonList[ii]],Type + 'Button')
                     self.CurrentConditions.buttonList.append([buttonList[ii],Panel,Type,'Primary'])
                     ii += 1
 
-            self.CurrentConditions.ids['ButtonSix'].add_widget(DailyForecastButton())
+            self.CurrentConditions.ids['ButtonSix'].add_widget(panelPool.acquire('DailyForecastButton'))
 
             # Change 'None' for secondary panel selection to blank in config
             # file
@@ -524,6 +548,7 @@ def get_cpu_temperature():
         temp = int(temp) / 1000.0
     return temp
 
+@profiler.timed
 def mwUpdateIndoorCond(app, *largs):
     Tz = pytz.timezone(app.config['Station']['Timezone'])
     Now = datetime.now(pytz.utc).astimezone(Tz)
@@ -543,28 +568,35 @@ def mwUpdateIndoorCond(app, *largs):
     raw_temp = app.bme280.get_temperature()
     comp_temp = raw_temp - ((app.avg_cpu_temp - raw_temp) / factor)
 
-    inTemp = app.Obs['inTemp'][0]
-    if inTemp == None or inTemp == '--' or inTemp == '-':
+    # Smooth the compensated temperature with the previous indoor temperature
+    # stored in SI units
+    inTemp = app.indoorLatest.get('Temp')
+    if inTemp == None or math.isnan(inTemp[0]):
         Temp = [ comp_temp, 'c' ]
     else:
-        Temp = [ (float(inTemp) * 4.0 + comp_temp) / 5.0, 'c' ]
+        Temp = [ (inTemp[0] * 4.0 + comp_temp) / 5.0, 'c' ]
 
     # Pressure = (app.Obs['inPressure'] * 4.0 + app.bme280.get_pressure()) / 5.0
     # Humidity = (app.Obs['inHumidity'] * 4.0 + app.bme280.humidity()) / 5.0
 
-    # Extract required derived observations
-    minTemp = app.Obs['inTempMin']
-    maxTemp = app.Obs['inTempMax']
+    # Extract maximum and minimum temperature stored by the previous update
+    minTemp = app.indoorLatest.get('MinTemp')
+    maxTemp = app.indoorLatest.get('MaxTemp')
 
-    if minTemp == None or minTemp == '---':
-        minTemp = [ 100.0, 'c', None, 100.0, datetime(1970, 1, 1, tzinfo = pytz.utc) ]
+    if minTemp == None:
+        minTemp = Extreme([ 100.0, 'c', None, 100.0, datetime(1970, 1, 1, tzinfo = pytz.utc) ])
 
-    if maxTemp == None or maxTemp == '---':
-        maxTemp = [ -10.0, 'c', None, -10.0, datetime(1970, 1, 1, tzinfo = pytz.utc) ]
+    if maxTemp == None:
+        maxTemp = Extreme([ -10.0, 'c', None, -10.0, datetime(1970, 1, 1, tzinfo = pytz.utc) ])
 
     # Calculate derived variables from indoor AIR observations
     MaxTemp, MinTemp = derive.TempMaxMin(Time, Temp, maxTemp, minTemp, None, app.config, False)
 
+    # Store latest indoor temperature observations in SI units
+    app.indoorLatest['Temp']    = Temp
+    app.indoorLatest['MaxTemp'] = MaxTemp
+    app.indoorLatest['MinTemp'] = MinTemp
+
     # Convert observation units as required
     Temp    = observation.Units(Temp,   app.config['Units']['Temp'])
     MaxTemp = observation.Units(MaxTemp,app.config['Units']['Temp'])
@@ -594,7 +626,7 @@ class CurrentConditions(Screen):
 
         # Add primary panels to CurrentConditions screen
         for Panel, Type in App.get_running_app().config['PrimaryPanels'].items():
-            self.manager.ids.CurrentConditions.ids[Panel].add_widget(eval(Type + 'Panel')())
+            panelPool.show(self.manager.ids.CurrentConditions.ids[Panel],Type + 'Panel')
 
         # Add secondary panel buttons to CurrentConditions screen
         self.buttonList = []
@@ -602,14 +634,20 @@ class CurrentConditions(Screen):
         buttonList = ['Button' + Num for Num in ['One','Two','Three','Four','Five','Six']]
         for Panel, Type in App.get_running_app().config['SecondaryPanels'].items():
             if Type:
-                self.manager.ids.CurrentConditions.ids[buttonList[ii]].add_widget(eval(Type + 'Button')())
+                panelPool.show(self.manager.ids.CurrentConditions.ids[buttonList[ii]],Type + 'Button')
                 self.buttonList.append([buttonList[ii],Panel,Type,'Primary'])
                 ii += 1
 
-        self.ids['ButtonSix'].add_widget(DailyForecastButton())
+        self.ids['ButtonSix'].add_widget(panelPool.acquire('DailyForecastButton'))
+
+    # REFRESH PANELS THAT WERE UPDATED WHILE CURRENT CONDITIONS SCREEN WAS HIDDEN
+    # --------------------------------------------------------------------------
+    def on_pre_enter(self):
+        panelPool.refreshDirty()
 
     # SWITCH BETWEEN DIFFERENT PANELS ON CURRENT CONDITIONS SCREEN
     # --------------------------------------------------------------------------
+    @profiler.timed
     def SwitchPanel(self,Instance,overideButton=None):
 
         # Determine ID of button that has been pressed
@@ -627,26 +665,13 @@ class CurrentConditions(Screen):
             if Button[0] == id:
                 break
 
-        # Extract panel object the corresponds to the button that has been
-        # pressed and determine new button type required
-        Panel = App.get_running_app().CurrentConditions.ids[Button[1]].children
+        # Determine new button type required
         newButton = App.get_running_app().config[Button[3] + 'Panels'][Button[1]]
 
-        # Destroy reference to old panel class attribute
-        if hasattr(App.get_running_app(),newButton + 'Panel'):
-            if len(getattr(App.get_running_app(), newButton + 'Panel')) > 1:
-                try:
-                    getattr(App.get_running_app(), newButton + 'Panel').remove(Panel[0])
-                except ValueError:
-                    log.msg('Unable to remove panel reference from wfpiconsole class')
-            else:
-                delattr(App.get_running_app(), newButton + 'Panel')
-
-        # Switch panel
-        App.get_running_app().CurrentConditions.ids[Button[1]].clear_widgets()
-        App.get_running_app().CurrentConditions.ids[Button[1]].add_widget(eval(Button[2] + 'Panel')())
-        App.get_running_app().CurrentConditions.ids[Button[0]].clear_widgets()
-        App.get_running_app().CurrentConditions.ids[Button[0]].add_widget(eval(newButton + 'Button')())
+        # Switch panel. The panel that is switched out is returned to the panel
+        # pool and reused the next time it is displayed
+        panelPool.show(App.get_running_app().CurrentConditions.ids[Button[1]],Button[2] + 'Panel')
+        panelPool.show(App.get_running_app().CurrentConditions.ids[Button[0]],newButton + 'Button')
 
         # Update button list
         if Button[3] == 'Primary':
@@ -694,20 +719,166 @@ class DailyForecastPanel(RelativeLayout):
 class DailyForecastButton(RelativeLayout):
     pass
 
-
 # ==============================================================================
-# ForecastPanel RELATIVE LAYOUT CLASS
+# HourlyForecast SCREEN CLASS
 # ==============================================================================
-class ForecastPanel(RelativeLayout):
+class HourlyForecast(Screen):
 
-    # Initialise 'ForecastPanel' relative layout class
+    # Initialise 'HourlyForecast' screen class
     def __init__(self,**kwargs):
-        super(ForecastPanel,self).__init__(**kwargs)
-        if not hasattr(App.get_running_app(),'ForecastPanel'):
-            App.get_running_app().ForecastPanel = []
-            App.get_running_app().ForecastPanel.append(self)
+        super(HourlyForecast,self).__init__(**kwargs)
+        App.get_running_app().HourlyForecast = self
+        Clock.schedule_once(lambda dt: forecast.ExtractHourly(App.get_running_app()))
+
+    # Update hourly forecast timeline and legend with new hourly forecast
+    # series
+    def setSeries(self,Series):
+        self.ids.Timeline.setSeries(Series)
+        if Series is None:
+            self.ids.Legend.text = 'Forecast currently unavailable...'
         else:
-            App.get_running_app().ForecastPanel.append(self)
+            self.ids.Legend.text = ('[color=f05e40ff]Temperature (' + Series['TempUnits'] + ')[/color]   '
+                                    + '[color=00a4b4ff]Precipitation (%)[/color]   '
+                                    + '[color=9aba2fff]Wind (' + Series['WindUnits'] + ')[/color]')
+
+    def on_enter(self):
+        Clock.schedule_once(self.change_screen_back, 60)
+
+    def change_screen_back(self, dt):
+        self.manager.current = 'CurrentConditions'
+
+# ==============================================================================
+# HourlyTimeline WIDGET CLASS
+# ==============================================================================
+class HourlyTimeline(Widget):
+
+    """ Scrollable hourly forecast timeline. The temperature and wind speed
+    lines and the precipitation probability bars are drawn as meshes computed
+    from the hourly forecast series in one pass, and the labels are cached
+    textures. The timeline is only redrawn when a new forecast arrives or the
+    height of the timeline changes, so scrolling is a translation of the
+    cached canvas
+    """
+
+    # Define HourlyTimeline class properties
+    hourWidth = NumericProperty(0)
+
+    # Initialise 'HourlyTimeline' widget class
+    def __init__(self,**kwargs):
+        self.Series   = None
+        self.Drawn    = None
+        self.Textures = {}
+        super(HourlyTimeline,self).__init__(**kwargs)
+
+    # Set new hourly forecast series and resize timeline to fit the series
+    def setSeries(self,Series):
+        self.Series = Series
+        self.Drawn  = None
+        self.width  = len(Series['Time'])*self.hourWidth if Series else 0
+        self.draw()
+
+    # Redraw timeline if its size has changed after the canvas has been
+    # created
+    def on_size(self,instance,size):
+        if self.canvas is not None:
+            self.draw()
+
+    # Return cached texture for label text
+    def texture(self,Text,Colour):
+        scaleFactor = App.get_running_app().scaleFactor
+        Key = (Text,Colour,scaleFactor)
+        if Key not in self.Textures:
+            Label = CoreLabel(text=Text,font_size=dp(11*scaleFactor),font_name='fonts/Inter-Regular.ttf',
+                              color=utils.rgba(Colour))
+            Label.refresh()
+            self.Textures[Key] = Label.texture
+        return self.Textures[Key]
+
+    # Return mesh vertices from arrays of x and y coordinates
+    def vertices(self,x,y):
+        Vertices = np.zeros((len(x),4))
+        Vertices[:,0], Vertices[:,1] = x, y
+        return Vertices.ravel().tolist()
+
+    # Return y coordinates of series scaled into a horizontal band of the
+    # timeline
+    def scale(self,Values,Bottom,Top):
+        Low, High = np.nanmin(Values), np.nanmax(Values)
+        Range = High - Low if High > Low else 1
+        return self.y + self.height*(Bottom + (Values - Low)/Range*(Top - Bottom))
+
+    # Draw hourly forecast timeline
+    @profiler.timed
+    def draw(self):
+
+        # Only redraw timeline when the series or size has changed
+        Key = (id(self.Series),tuple(self.pos),tuple(self.size))
+        if Key == self.Drawn:
+            return
+        self.Drawn = Key
+        self.canvas.clear()
+        if not self.Series or not len(self.Series['Time']) or not self.height:
+            return
+
+        # Define x coordinates of each hour
+        Series = self.Series
+        Width  = self.hourWidth
+        Hours  = len(Series['Time'])
+        x      = self.x + (np.arange(Hours) + 0.5)*Width
+
+        # Define y coordinates of temperature and wind speed lines
+        tempValid = ~np.isnan(Series['Temp'])
+        tempY     = self.scale(Series['Temp'],0.62,0.85)
+        windValid = ~np.isnan(Series['Wind'])
+        windY     = self.scale(Series['Wind'],0.38,0.52)
+
+        # Define vertices of precipitation probability bars
+        Bottom = self.y + self.height*0.12
+        Top    = Bottom + Series['Precip']/100*self.height*0.2
+        Left   = np.repeat(x - 0.35*Width,4) + np.tile([0,0.7*Width,0.7*Width,0],Hours)
+        Height = np.column_stack([np.full(Hours,Bottom),np.full(Hours,Bottom),Top,Top]).ravel()
+        Index  = (np.arange(Hours)[:,None]*4 + np.array([0,1,2,2,3,0])).ravel().tolist()
+
+        with self.canvas:
+
+            # Draw day separators
+            Color(rgba=utils.rgba('#646464ff'))
+            for ii,Day in enumerate(Series['Day']):
+                if Day:
+                    Rectangle(pos=(self.x + ii*Width,self.y),size=(1,self.height))
+                    Texture = self.texture(Day,'#c8c8c8ff')
+                    Rectangle(texture=Texture,size=Texture.size,pos=(self.x + ii*Width + dp(3),self.top - Texture.height))
+
+            # Draw precipitation probability bars
+            Color(rgba=utils.rgba('#00a4b4ff'))
+            Mesh(vertices=self.vertices(Left,Height),indices=Index,mode='triangles')
+
+            # Draw temperature and wind speed lines
+            Color(rgba=utils.rgba('#f05e40ff'))
+            Mesh(vertices=self.vertices(x[tempValid],tempY[tempValid]),indices=list(range(int(tempValid.sum()))),mode='line_strip')
+            Color(rgba=utils.rgba('#9aba2fff'))
+            Mesh(vertices=self.vertices(x[windValid],windY[windValid]),indices=list(range(int(windValid.sum()))),mode='line_strip')
+
+            # Draw hour, temperature, precipitation and wind speed labels for
+            # every third hour
+            Color(rgba=(1,1,1,1))
+            for ii in range(0,Hours,3):
+                Labels = [(Series['Hour'][ii],'#c8c8c8ff',self.y + self.height*0.01)]
+                if tempValid[ii]:
+                    Labels.append(('{:.0f}'.format(Series['Temp'][ii]),'#f05e40ff',tempY[ii] + dp(4)))
+                if windValid[ii]:
+                    Labels.append(('{:.0f}'.format(Series['Wind'][ii]),'#9aba2fff',windY[ii] + dp(4)))
+                Labels.append(('{:.0f}'.format(Series['Precip'][ii]),'#00a4b4ff',Top[ii] + dp(2)))
+                for Text,Colour,y in Labels:
+                    Texture = self.texture(Text,Colour)
+                    Rectangle(texture=Texture,size=Texture.size,pos=(x[ii] - Texture.width/2,y))
+
+
+# ==============================================================================
+# ForecastPanel RELATIVE LAYOUT CLASS
+# ==============================================================================
+class ForecastPanel(RelativeLayout):
+    pass
 
 class ForecastButton(RelativeLayout):
     pass
@@ -716,15 +887,7 @@ class ForecastButton(RelativeLayout):
 # SagerPanel RELATIVE LAYOUT CLASS
 # ==============================================================================
 class SagerPanel(RelativeLayout):
-
-    # Initialise 'SagerPanel' relative layout class
-    def __init__(self,**kwargs):
-        super(SagerPanel,self).__init__(**kwargs)
-        if not hasattr(App.get_running_app(),'SagerPanel'):
-            App.get_running_app().SagerPanel = []
-            App.get_running_app().SagerPanel.append(self)
-        else:
-            App.get_running_app().SagerPanel.append(self)
+    pass
 
 class SagerButton(RelativeLayout):
     pass
@@ -737,18 +900,14 @@ class TemperaturePanel(RelativeLayout):
     # Define TemperaturePanel class properties
     feelsLikeIcon = StringProperty('-')
 
-    # Initialise 'TemperaturePanel' relative layout class
-    def __init__(self,**kwargs):
-        super(TemperaturePanel,self).__init__(**kwargs)
-        if not hasattr(App.get_running_app(),'TemperaturePanel'):
-            App.get_running_app().TemperaturePanel = []
-            App.get_running_app().TemperaturePanel.append(self)
-        else:
-            App.get_running_app().TemperaturePanel.append(self)
+    # Refresh 'TemperaturePanel' relative layout class from the latest observations
+    # each time it is displayed
+    def refresh(self):
         self.setFeelsLikeIcon()
 
     # Set "Feels Like" icon
     @mainthread
+    @profiler.timed
     def setFeelsLikeIcon(self):
         self.feelsLikeIcon = App.get_running_app().Obs['FeelsLike'][3]
 
@@ -765,15 +924,11 @@ class WindSpeedPanel(RelativeLayout):
     windDirIcon  = StringProperty('-')
     windSpdIcon  = StringProperty('-')
 
-    # Initialise 'WindSpeedPanel' relative layout class
-    def __init__(self,**kwargs):
-        super(WindSpeedPanel,self).__init__(**kwargs)
-        if not hasattr(App.get_running_app(),'WindSpeedPanel'):
-            App.get_running_app().WindSpeedPanel = []
-            App.get_running_app().WindSpeedPanel.append(self)
-        else:
-            App.get_running_app().WindSpeedPanel.append(self)
+    # Refresh 'WindSpeedPanel' relative layout class from the latest observations
+    # each time it is displayed
+    def refresh(self):
         if App.get_running_app().Obs['rapidDir'][0] != '-':
+            Animation.cancel_all(self,'rapidWindDir')
             self.rapidWindDir = App.get_running_app().Obs['rapidDir'][0]
         self.setWindIcons()
 
@@ -807,6 +962,7 @@ class WindSpeedPanel(RelativeLayout):
 
     # Set mean windspeed and direction icons
     @mainthread
+    @profiler.timed
     def setWindIcons(self):
         self.windDirIcon = App.get_running_app().Obs['WindDir'][2]
         self.windSpdIcon = App.get_running_app().Obs['WindSpd'][3]
@@ -822,18 +978,14 @@ class SunriseSunsetPanel(RelativeLayout):
     # Define SunriseSunsetPanel class properties
     uvBackground = StringProperty('-')
 
-    # Initialise 'SunriseSunsetPanel' relative layout class
-    def __init__(self,**kwargs):
-        super(SunriseSunsetPanel,self).__init__(**kwargs)
-        if not hasattr(App.get_running_app(),'SunriseSunsetPanel'):
-            App.get_running_app().SunriseSunsetPanel = []
-            App.get_running_app().SunriseSunsetPanel.append(self)
-        else:
-            App.get_running_app().SunriseSunsetPanel.append(self)
+    # Refresh 'SunriseSunsetPanel' relative layout class from the latest observations
+    # each time it is displayed
+    def refresh(self):
         self.setUVBackground()
 
     # Set current UV index backgroud
     @mainthread
+    @profiler.timed
     def setUVBackground(self):
         self.uvBackground = App.get_running_app().Obs['UVIndex'][3]
 
@@ -844,15 +996,7 @@ class SunriseSunsetButton(RelativeLayout):
 # MoonPhasePanel RELATIVE LAYOUT CLASS
 # ==============================================================================
 class MoonPhasePanel(RelativeLayout):
-
-    # Initialise 'MoonPhasePanel' relative layout class
-    def __init__(self,**kwargs):
-        super(MoonPhasePanel,self).__init__(**kwargs)
-        if not hasattr(App.get_running_app(),'MoonPhasePanel'):
-            App.get_running_app().MoonPhasePanel = []
-            App.get_running_app().MoonPhasePanel.append(self)
-        else:
-            App.get_running_app().MoonPhasePanel.append(self)
+    pass
 
 class MoonPhaseButton(RelativeLayout):
     pass
@@ -866,18 +1010,14 @@ class RainfallPanel(RelativeLayout):
     rainRatePosX  = NumericProperty(+0)
     rainRatePosY  = NumericProperty(-1)
 
-    # Initialise 'RainfallPanel' relative layout class
-    def __init__(self,**kwargs):
-        super(RainfallPanel,self).__init__(**kwargs)
-        if not hasattr(App.get_running_app(),'RainfallPanel'):
-            App.get_running_app().RainfallPanel = []
-            App.get_running_app().RainfallPanel.append(self)
-        else:
-            App.get_running_app().RainfallPanel.append(self)
+    # Refresh 'RainfallPanel' relative layout class from the latest observations
+    # each time it is displayed
+    def refresh(self):
         self.animateRainRate()
 
     # Animate rain rate level
     @mainthread
+    @profiler.timed
     def animateRainRate(self):
 
         # Get current rain rate and convert to float
@@ -930,21 +1070,17 @@ class LightningPanel(RelativeLayout):
     lightningBoltPosX = NumericProperty(0)
     lightningBoltIcon = StringProperty('lightningBolt')
 
-    # Initialise 'LightningPanel' relative layout class
-    def __init__(self,**kwargs):
-        super(LightningPanel,self).__init__(**kwargs)
-        if not hasattr(App.get_running_app(),'LightningPanel'):
-            App.get_running_app().LightningPanel = []
-            App.get_running_app().LightningPanel.append(self)
-        else:
-            App.get_running_app().LightningPanel.append(self)
+    # Refresh 'LightningPanel' relative layout class from the latest observations
+    # each time it is displayed
+    def refresh(self):
         self.setLightningBoltIcon()
 
     # Set lightning bolt icon
     @mainthread
+    @profiler.timed
     def setLightningBoltIcon(self):
-        if App.get_running_app().Obs['StrikeDeltaT'][4] != '-':
-            if App.get_running_app().Obs['StrikeDeltaT'][4] < 360:
+        if 'Time' in websocket.strikeLatest:
+            if derive.StrikeDeltaT(websocket.strikeLatest['Time']).Seconds < 360:
                 self.lightningBoltIcon = 'lightningBoltStrike'
             else:
                 self.lightningBoltIcon = 'lightningBolt'
@@ -965,18 +1101,14 @@ class BarometerPanel(RelativeLayout):
     # Define BarometerPanel class properties
     barometerArrow = StringProperty('-')
 
-    # Initialise 'BarometerPanel' relative layout class
-    def __init__(self,**kwargs):
-        super(BarometerPanel,self).__init__(**kwargs)
-        if not hasattr(App.get_running_app(),'BarometerPanel'):
-            App.get_running_app().BarometerPanel = []
-            App.get_running_app().BarometerPanel.append(self)
-        else:
-            App.get_running_app().BarometerPanel.append(self)
+    # Refresh 'BarometerPanel' relative layout class from the latest observations
+    # each time it is displayed
+    def refresh(self):
         self.setBarometerArrow()
 
     # Set Barometer arrow to current sea level pressure
     @mainthread
+    @profiler.timed
     def setBarometerArrow(self):
         self.barometerArrow = App.get_running_app().Obs['Pres'][2]
 
@@ -1048,12 +1180,18 @@ class mainMenu(ModalView):
         Buttons.add_widget(MenuButton(text='Exit',     on_release=self.app.stop))
         Buttons.add_widget(MenuButton(text='Reboot',   on_release=self.rebootSystem))
         Buttons.add_widget(MenuButton(text='Shutdown', on_release=self.shutdownSystem))
+        Buttons.add_widget(MenuButton(text='Profiler', on_release=self.toggleProfiler))
         self.ids.statusPanel.add_widget(Buttons)
 
         # Populate status fields
         self.app.Station.getObservationCount()
         self.app.Station.getStationStatus()
 
+    # Toggle frame time and main thread stall profiler overlay
+    def toggleProfiler(self,instance):
+        profiler.toggle()
+        self.dismiss()
+
     # Exit console and shutdown system
     def shutdownSystem(self,instance):
         global SHUTDOWN